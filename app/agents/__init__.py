@@ -1,2 +1,17 @@
 from .components import *
-from .agents import *
\ No newline at end of file
+from .agents import *
+
+# The agent classes import System, which in turn imports app.agents.components,
+# so they are resolved lazily to avoid a circular import
+_AGENT_MODULES = {
+    "AgentInterface": "app.agents.agents.agent_interface",
+    "Agent_TP": "app.agents.agents.agent_tp",
+    "Agent_TPTS": "app.agents.agents.agent_tpts",
+    "Agent_Central": "app.agents.agents.agent_central"
+}
+
+def __getattr__(name: str):
+    if name in _AGENT_MODULES:
+        from importlib import import_module
+        return getattr(import_module(_AGENT_MODULES[name]), name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -1,5 +1,6 @@
+from time import perf_counter
+
 import numpy as np
-import pandas as pd
 from scipy.optimize import linear_sum_assignment
 
 from app.agents.agents.agent_interface import AgentInterface
@@ -7,32 +8,100 @@ from app.agents.components.agent_state import AgentState
 from app.agents.components.agent_path import AgentPath
 from app.components.system.system import System
 from app.components.environment.node import Node
+from app.components.environment.distance_oracle import UNREACHABLE
+from app.components.environment.node_state import NodeStatus, NODE_STATUS_CODES
 from app.components.task.task import Task
-from app.agents.components.search.a_star_search import A_Star_Search, heuristic
+from app.agents.components.search.a_star_search import A_Star_Search
 
 class Agent_Central(AgentInterface):
 
     # Class attribute to keep track of the Task IDs
     _id_counter = 0
-    _last_assigned_timestep = 0
 
-    def __init__(self, starting_state: AgentState):
+    def __init__(self, starting_state: AgentState, incremental: bool = False, window: int = None, replan_interval: int = None):
         self.id: int = self._assign_agent_id()
         self.state: AgentState = starting_state
         self.path: AgentPath = None
+        # Task the current path was planned for
+        self.task: Task | None = None
+        # Only reassign when the free agents or the unexecuted tasks change, keeping the paths of unchanged assignments
+        self.incremental: bool = incremental
+        self.set_window(window, replan_interval)
 
     def move(self, system: System) -> System:
-        if system.timestep > Agent_Central._last_assigned_timestep:
-            task_assignment = self.assign_tasks(system)
-            self.plan_paths(task_assignment, system)
-            Agent_Central._last_assigned_timestep = system.timestep
+        planner_state = self.get_planner_state(system)
+        if system.timestep > planner_state["last_assigned_timestep"]:
+            if self.incremental:
+                planned_agents = self.replan_incrementally(system)
+            else:
+                task_assignment = self.assign_tasks(system)
+                self.plan_paths(task_assignment, system)
+                planned_agents = task_assignment.keys()
+            if self.is_replan_timestep(system):
+                for agent in system.agents:
+                    if agent.id not in planned_agents:
+                        agent.replan_window(system)
+            if self.incremental:
+                self.wait_at_path_ends(system)
+            planner_state["last_assigned_timestep"] = system.timestep
         return system
+
+    def get_planner_state(self, system: System) -> dict:
+        # Shared by the agents of one System, so that the assignment is only made by the first agent to move every timestep
+        planner_state = system.planner_state.get("Agent_Central")
+        if planner_state is None:
+            planner_state = {
+                "last_assigned_timestep": 0,
+                # Assignments of the free agents and the (free agents, unexecuted tasks) they were made for, used in incremental mode
+                "assignments": {},
+                "last_assignment_key": None
+            }
+            system.planner_state["Agent_Central"] = planner_state
+        return planner_state
+
+    def replan_incrementally(self, system: System) -> set[int]:
+        # Returns the ids of the agents that were replanned
+        planner_state = self.get_planner_state(system)
+        free_agents = self.get_free_agents(system)
+        unexecuted_tasks = system.get_unexecuted_tasks()
+        assignment_key = (frozenset(free_agents), frozenset(task.id for task in unexecuted_tasks))
+        if assignment_key == planner_state["last_assignment_key"]:
+            return set()
+        # Task assignments of agents that are still free stay fixed, the rest are solved again
+        unexecuted_task_ids = assignment_key[1]
+        kept_assignments = {}
+        for agent_id, (assignment_type, assigned) in planner_state["assignments"].items():
+            if assignment_type == "Task" and agent_id in assignment_key[0] and assigned.id in unexecuted_task_ids and assigned.assigned_agent == agent_id:
+                kept_assignments[agent_id] = (assignment_type, assigned)
+        kept_tasks = [assigned for _, assigned in kept_assignments.values()]
+        unassigned_agents = [agent_id for agent_id in free_agents if agent_id not in kept_assignments]
+        task_assignment = self.assign_tasks(system, unassigned_agents, kept_tasks) if unassigned_agents else {}
+        changed_assignment = {agent_id: assignment for agent_id, assignment in task_assignment.items() if planner_state["assignments"].get(agent_id) != assignment}
+        self.plan_paths(changed_assignment, system)
+        planner_state["assignments"] = {**kept_assignments, **task_assignment}
+        planner_state["last_assignment_key"] = assignment_key
+        return set(changed_assignment)
+
+    def wait_at_path_ends(self, system: System):
+        # Agents that have reached their endpoint without being replanned wait there
+        for agent in system.agents:
+            if system.timestep not in agent.path:
+                agent.path += AgentPath({system.timestep: agent.path.last_state})
+                system.reservations.reserve_path(agent.id, agent.path, system.timestep)
     
     def plan_paths(self, task_assignment: dict, system: System):
+        stats = system.stats
+        if stats is not None:
+            start_time = perf_counter()
         reassigned_agents = task_assignment.keys()
         for agent_id in reassigned_agents:
             agent = system.get_agent(agent_id)
             agent.remove_future_moves(system.timestep)
+            system.reservations.release_path(agent_id, system.timestep)
+        # Tasks held by replanned agents have not been picked up yet, so they are released for the new assignment
+        for task in system.get_unexecuted_tasks():
+            if task.assigned_agent in reassigned_agents:
+                task.unassign()
         assignment_info = [(assignment_type, agent_id, assigned) for agent_id, (assignment_type, assigned) in task_assignment.items()]
         assignment_info.sort()
         for assignment_type, agent_id, assigned in assignment_info:
@@ -41,117 +110,144 @@ class Agent_Central(AgentInterface):
                 agent.plan_path_for_task(assigned, system)
             elif assignment_type == "Idle":
                 agent.plan_path_for_idling(assigned, system)
+        if stats is not None:
+            stats.add("plan_paths_time", perf_counter() - start_time)
+            stats.add("planned_agents", len(task_assignment))
 
     def plan_path_for_task(self, assigned: Task, system: System):
-        a_star = A_Star_Search(system)
-        path = self.path
-        curr_agent_state = path.path[system.timestep - 1]
-        assigned.assign(self.id)
-        path += a_star.search(system.timestep, curr_agent_state, assigned.pickup_node)
-        pickup_time = max(path.path.keys())
-        assigned.pickup(pickup_time, self.id)
-        pickup_agent_state = path.path[pickup_time]
-        path += a_star.search(pickup_time + 1, pickup_agent_state, assigned.delivery_node)
-        delivery_time = max(path.path.keys())
-        assigned.deliver(delivery_time, self.id)      
-        self.path = path
+        a_star = A_Star_Search(system, self.window)
+        task_path = self.search_task_path(a_star, self.path, system.timestep, assigned)
+        if task_path is None:
+            # The task is left unassigned for the next assignment, and the agent waits meanwhile
+            self.path += AgentPath({system.timestep: self.path.path[system.timestep - 1]})
+        else:
+            self.path, pickup_time = task_path
+            assigned.assign(self.id)
+            self.task = assigned
+            assigned.pickup(pickup_time, self.id)
+            assigned.deliver(self.path.end_timestep, self.id)
+        system.reservations.reserve_path(self.id, self.path, system.timestep)
 
     def plan_path_for_idling(self, assigned: Node, system: System):
-        a_star = A_Star_Search(system)
+        a_star = A_Star_Search(system, self.window)
         path = self.path
         curr_agent_state = path.path[system.timestep - 1]
-        if curr_agent_state.node == assigned:
-            path += AgentPath({system.timestep: curr_agent_state})
-        else:
-            path += a_star.search(system.timestep, curr_agent_state, assigned)
+        idle_path = None
+        if curr_agent_state.node != assigned:
+            idle_path = a_star.search(system.timestep, curr_agent_state, assigned)
+        # Also waits when the endpoint cannot be reached
+        path += AgentPath({system.timestep: curr_agent_state}) if idle_path is None else idle_path
         self.path = path
+        system.reservations.reserve_path(self.id, self.path, system.timestep)
         
     def remove_future_moves(self, timestep: int):
-        max_path_timestep = max(self.path.path.keys())
-        while max_path_timestep >= timestep:
-            del self.path.path[max_path_timestep]
-            max_path_timestep -= 1
+        self.path.truncate(timestep)
     
-    def assign_tasks(self, system: System):
-        free_agents = []
-        executed_tasks = system.get_executed_tasks()
-        executing_agents = list(map(lambda task: task.assigned_agent, executed_tasks))
-        for agent in system.agents:
-            if agent.id not in executing_agents:
-                free_agents.append(agent.id)
+    def get_free_agents(self, system: System) -> list[int]:
+        executing_agents = {task.assigned_agent for task in system.get_executed_tasks()}
+        return [agent.id for agent in system.agents if agent.id not in executing_agents]
+
+    def assign_tasks(self, system: System, free_agents: list[int] = None, kept_tasks: list[Task] = ()):
+        stats = system.stats
+        if stats is not None:
+            start_time = perf_counter()
+        if free_agents is None:
+            free_agents = self.get_free_agents(system)
 
-        endpoints, num_task_endpoints = self.get_endpoints(system, free_agents)
+        endpoints, num_task_endpoints = self.get_endpoints(system, free_agents, kept_tasks)
         c = len(free_agents)
-        pickup_locs = []
-        for endpoint in endpoints:
-            if type(endpoint) == Task:
-                pickup_locs.append(endpoint.pickup_node)
-            else:
-                pickup_locs.append(endpoint)
-        
-        h_costs = {}
-        max_h_cost = 0
-        for endpoint in pickup_locs:
-            h_costs[endpoint] = {}
-            for id in free_agents:
-                agent = system.get_agent(id)
-                agent_state = agent.path.path[system.timestep - 1]
-                curr_h_cost = heuristic(agent_state.node, endpoint)
-                h_costs[endpoint][id] = curr_h_cost
-                max_h_cost = max(max_h_cost, curr_h_cost)
-        C = max_h_cost + 1
-        
-        modified_cost = {}
-        for i in range(len(pickup_locs)):
-            endpoint = pickup_locs[i]
-            modified_cost[endpoint] = []
-            if i < num_task_endpoints:
-                for id in free_agents:
-                    modified_cost[endpoint].append(c * C * h_costs[endpoint][id])
-            else:
-                for id in free_agents:
-                    modified_cost[endpoint].append(c * C ** 2 + h_costs[endpoint][id])
-        modified_df = pd.DataFrame.from_dict(modified_cost, orient="index", columns=free_agents)
-        
-        row_ind, col_ind = linear_sum_assignment(modified_df)
+        pickup_locs = [endpoint.pickup_node if type(endpoint) == Task else endpoint for endpoint in endpoints]
+
+        h_costs = self.get_distances(system, free_agents, pickup_locs)
+        reachable = h_costs != UNREACHABLE
+        # Unreachable pairs are left out of the scale, so that they cannot swamp the distances of the reachable ones
+        C = int(h_costs.max(initial=0, where=reachable)) + 1
+        # Every task row costs less than any idle row, so tasks are always assigned first. The costs are integers well
+        # below 2 ** 53, so the distance in every idle row still breaks the ties between them.
+        modified_cost = np.empty(h_costs.shape, dtype=np.int64)
+        modified_cost[:num_task_endpoints] = c * C * h_costs[:num_task_endpoints]
+        modified_cost[num_task_endpoints:] = c * C * C + h_costs[num_task_endpoints:]
+        # Costs more than any assignment of only reachable pairs, so as few as possible are used, and those are dropped below
+        modified_cost[~reachable] = min(h_costs.shape) * (c * C * C + C) + 1
+
+        row_ind, col_ind = linear_sum_assignment(modified_cost)
         assignment_results = {}
-        for i in range(c):
-            curr_agent_id = free_agents[col_ind[i]]
-            if i < num_task_endpoints:
-                curr_task = endpoints[row_ind[i]]
+        # With fewer endpoints than free agents, the agents left over wait where they are, as do agents that cannot reach theirs
+        for agent_id in free_agents:
+            assignment_results[agent_id] = ("Idle", system.get_agent(agent_id).path.get_state(system.timestep - 1).node)
+        for row, col in zip(row_ind, col_ind):
+            if not reachable[row, col]:
+                continue
+            curr_agent_id = free_agents[col]
+            if row < num_task_endpoints:
+                curr_task = endpoints[row]
                 assignment_results[curr_agent_id] = ("Task", curr_task)
             else:
-                curr_loc = pickup_locs[row_ind[i]]
+                curr_loc = pickup_locs[row]
                 assignment_results[curr_agent_id] = ("Idle", curr_loc)
 
+        if stats is not None:
+            stats.add("assign_tasks_time", perf_counter() - start_time)
+            stats.add("assigned_agents", len(free_agents))
         return assignment_results
 
-    def get_endpoints(self, system: System, free_agents: list[int]):
+    def get_endpoints(self, system: System, free_agents: list[int], kept_tasks: list[Task] = ()):
+        cell_id = system.map.cell_id
         pickup_locs = []
-        avoid_locs = []
+        # Cell ids of the endpoints already in use
+        avoid_locs = set()
         executed_tasks = system.get_executed_tasks()
         for task in executed_tasks:
-            avoid_locs.append(task.delivery_node)
+            avoid_locs.add(cell_id(task.delivery_node.x_coord, task.delivery_node.y_coord))
+        # Tasks that keep their agent are not offered again, but their endpoints are still in use
+        kept_task_ids = set()
+        for task in kept_tasks:
+            kept_task_ids.add(task.id)
+            avoid_locs.add(cell_id(task.pickup_node.x_coord, task.pickup_node.y_coord))
+            avoid_locs.add(cell_id(task.delivery_node.x_coord, task.delivery_node.y_coord))
         unexecuted_tasks = system.get_unexecuted_tasks()
         for task in unexecuted_tasks:
-            if (task.pickup_node not in avoid_locs) and (task.delivery_node not in avoid_locs):
+            if task.id in kept_task_ids:
+                continue
+            pickup_loc = cell_id(task.pickup_node.x_coord, task.pickup_node.y_coord)
+            delivery_loc = cell_id(task.delivery_node.x_coord, task.delivery_node.y_coord)
+            if (pickup_loc not in avoid_locs) and (delivery_loc not in avoid_locs):
                 pickup_locs.append(task)
-                avoid_locs.append(task.pickup_node)
-                avoid_locs.append(task.delivery_node)
+                avoid_locs.add(pickup_loc)
+                avoid_locs.add(delivery_loc)
         num_task_endpoints = len(pickup_locs)
         num_free_agents = len(free_agents)
         if num_task_endpoints < num_free_agents:
             all_endpoints = system.get_free_non_task_endpoints()
-            free_endpoints = [endpoint for endpoint in all_endpoints if endpoint not in avoid_locs]
-            for id in free_agents:
-                agent = system.get_agent(id)
-                agent_state = agent.path.path[system.timestep - 1]
-                h_costs = list(map(lambda x: heuristic(agent_state.node, x), free_endpoints))
-                chosen_endpoint = free_endpoints[np.argmin(h_costs)]
-                pickup_locs.append(chosen_endpoint)
-                free_endpoints.remove(chosen_endpoint)
+            if self.incremental:
+                # The agents being assigned give up their current endpoints, so they are free for them to keep
+                endpoint_cells = {cell_id(endpoint.x_coord, endpoint.y_coord) for endpoint in all_endpoints}
+                for agent_id in free_agents:
+                    last_node = system.get_agent(agent_id).path.last_state.node
+                    last_cell = cell_id(last_node.x_coord, last_node.y_coord)
+                    if system.map.grid[last_node.y_coord, last_node.x_coord] == NODE_STATUS_CODES[NodeStatus.NON_TASK_ENDPOINT] and last_cell not in endpoint_cells:
+                        all_endpoints.append(last_node)
+                        endpoint_cells.add(last_cell)
+            free_endpoints = [endpoint for endpoint in all_endpoints if cell_id(endpoint.x_coord, endpoint.y_coord) not in avoid_locs]
+            # Each agent in turn takes its nearest endpoint that is still free
+            h_costs = self.get_distances(system, free_agents, free_endpoints)
+            taken_cost = np.iinfo(h_costs.dtype).max
+            for agent_index in range(min(num_free_agents, len(free_endpoints))):
+                chosen_index = int(np.argmin(h_costs[:, agent_index]))
+                pickup_locs.append(free_endpoints[chosen_index])
+                h_costs[chosen_index] = taken_cost
         return pickup_locs, num_task_endpoints
 
+    def get_distances(self, system: System, agent_ids: list[int], nodes: list[Node]) -> np.ndarray:
+        # (len(nodes), len(agent_ids)) matrix of travel times from each agent's current state to each node
+        agent_coords = np.array([system.get_agent(agent_id).path.get_coords(system.timestep - 1) for agent_id in agent_ids], dtype=np.intp).reshape(-1, 3)
+        x_coords, y_coords, rot_indices = agent_coords[:, 0], agent_coords[:, 1], agent_coords[:, 2] // 90
+        distance_oracle = system.map.distance_oracle
+        distances = np.empty((len(nodes), len(agent_ids)), dtype=np.int64)
+        for i, node in enumerate(nodes):
+            distances[i] = distance_oracle.get_table(node)[rot_indices, y_coords, x_coords]
+        return distances
+
     def _assign_agent_id(self):
         curr_id = Agent_Central._id_counter
         Agent_Central._id_counter += 1
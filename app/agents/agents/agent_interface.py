@@ -2,9 +2,91 @@ from abc import ABC, abstractmethod
 from app.agents.components.agent_path import AgentPath
 from app.agents.components.agent_state import AgentState
 from app.components.system.system import System
+from app.components.task.task import Task
+from app.agents.components.search.a_star_search import A_Star_Search
 
 class AgentInterface(ABC):
 
     @abstractmethod
     def move(self, system: System) -> System:
-        pass
\ No newline at end of file
+        pass
+
+    @classmethod
+    def reset_id_counter(cls):
+        cls._id_counter = 0
+
+    def set_window(self, window: int = None, replan_interval: int = None):
+        # Conflicts are only resolved within the next window timesteps, and the path is replanned every replan_interval timesteps
+        if window is None:
+            if replan_interval is not None:
+                raise ValueError("A replan interval requires a window!")
+        elif window < 1:
+            raise ValueError("The window must be at least 1 timestep!")
+        elif replan_interval is None:
+            replan_interval = window
+        elif not 1 <= replan_interval <= window:
+            raise ValueError("The replan interval must be between 1 and the window!")
+        self.window: int | None = window
+        self.replan_interval: int | None = replan_interval
+
+    def is_replan_timestep(self, system: System) -> bool:
+        return self.window is not None and system.timestep % self.replan_interval == 0
+
+    def replan_window(self, system: System):
+        # Searches the rest of the current task or idle path again, so that conflicts are resolved within the window from now
+        timestep = system.timestep
+        if timestep not in self.path:
+            return
+        a_star = A_Star_Search(system, self.window)
+        task = self.task
+        goal_node = self.path.last_state.node
+        system.reservations.release_path(self.id, timestep)
+        path = self.path.clone()
+        path.truncate(timestep)
+        curr_agent_state = path.path[timestep - 1]
+        # The current path is kept whenever no new path is found
+        if task is not None and task.assigned_agent == self.id and task.delivery_time is not None and task.delivery_time >= timestep:
+            if task.pickup_time >= timestep:
+                task_path = self.search_task_path(a_star, path, timestep, task)
+                if task_path is not None:
+                    self.path, pickup_time = task_path
+                    task.pickup(pickup_time, self.id)
+                    task.deliver(self.path.end_timestep, self.id)
+            else:
+                delivery_path = a_star.search(timestep, curr_agent_state, task.delivery_node)
+                if delivery_path is not None:
+                    path += delivery_path
+                    self.path = path
+                    task.deliver(self.path.end_timestep, self.id)
+        else:
+            idle_path = a_star.search(timestep, curr_agent_state, goal_node)
+            if idle_path is not None:
+                path += idle_path
+                self.path = path
+        system.reservations.reserve_path(self.id, self.path, timestep)
+
+    def find_idle_path(self, system: System, a_star: A_Star_Search, curr_agent_state: AgentState) -> AgentPath:
+        # Waits in place, unless the agent is on a task endpoint or in another agent's way, in which case it moves to the
+        # nearest free non-task endpoint - and still waits when there is none or it cannot be reached
+        node = curr_agent_state.node
+        if system.check_is_task_loc(node) or system.check_in_other_agent_path(node):
+            free_endpoints = system.get_nearest_free_non_task_endpoints(curr_agent_state)
+            if free_endpoints:
+                idle_path = a_star.search(system.timestep, curr_agent_state, free_endpoints[0])
+                if idle_path is not None:
+                    return idle_path
+        return AgentPath({system.timestep: curr_agent_state})
+
+    def search_task_path(self, a_star: A_Star_Search, path: AgentPath, timestep: int, task: Task) -> tuple[AgentPath, int] | None:
+        # A copy of the path extended from the timestep through the task's pickup to its delivery, and the pickup time.
+        # None when either cannot be reached, so that the task is never given times the agent does not keep.
+        pickup_path = a_star.search(timestep, path.path[timestep - 1], task.pickup_node)
+        if pickup_path is None:
+            return None
+        task_path = path + pickup_path
+        pickup_time = task_path.end_timestep
+        delivery_path = a_star.search(pickup_time + 1, task_path.path[pickup_time], task.delivery_node)
+        if delivery_path is None:
+            return None
+        task_path += delivery_path
+        return task_path, pickup_time
@@ -1,20 +1,222 @@
-from copy import deepcopy
+from array import array
+from collections.abc import MutableMapping
 
+from app.components.environment.node import Node
 from app.agents.components.agent_state import AgentState
 
+__all__ = ["AgentPath", "PathView"]
+
 class AgentPath:
 
-    def __init__(self, path: dict[int, AgentState] = None):
-        if path is None:
-            path = {}
-        self.path: dict[int, AgentState] = path
+    # Contiguous path stored as a start timestep plus typed arrays of x, y and rot.
+    # Clones share the arrays: appending to the end of a shared array is safe because every
+    # path only reads up to its own length, and any other write copies the arrays first.
+
+    def __init__(self, path: dict[int, AgentState] = None, map=None):
+        self.start_timestep: int = 0
+        # Map whose shared nodes the states are read with, otherwise a new node is created on every read
+        self.map = map
+        self.__length: int = 0
+        self.__x_coords: array = array("i")
+        self.__y_coords: array = array("i")
+        self.__rots: array = array("h")
+        self.__shared: bool = False
+        self.__view: PathView | None = None
+        if path:
+            timesteps = sorted(path.keys())
+            if timesteps[-1] - timesteps[0] + 1 != len(timesteps):
+                raise ValueError("Path timesteps must be contiguous!")
+            self.start_timestep = timesteps[0]
+            for timestep in timesteps:
+                self.append(path[timestep])
+
+    @classmethod
+    def from_states(cls, start_timestep: int, states: list[AgentState], map=None) -> "AgentPath":
+        agent_path = cls(map=map)
+        agent_path.start_timestep = start_timestep
+        for state in states:
+            agent_path.append(state)
+        return agent_path
+
+    @property
+    def path(self) -> "PathView":
+        if self.__view is None:
+            self.__view = PathView(self)
+        return self.__view
+
+    @property
+    def end_timestep(self) -> int:
+        # Last timestep in the path, or start_timestep - 1 when it is empty
+        return self.start_timestep + self.__length - 1
+
+    @property
+    def last_state(self) -> AgentState:
+        return self.get_state(self.end_timestep)
+
+    def __len__(self) -> int:
+        return self.__length
 
-    def __add__(self, other: "AgentPath"):
-        new_path = self.path.copy()
-        new_path.update(other.path)
-        return AgentPath(new_path)
+    def __contains__(self, timestep: int) -> bool:
+        return self.start_timestep <= timestep < self.start_timestep + self.__length
+
+    def get_state(self, timestep: int) -> AgentState:
+        index = timestep - self.start_timestep
+        if not 0 <= index < self.__length:
+            raise KeyError(timestep)
+        x_coord, y_coord = self.__x_coords[index], self.__y_coords[index]
+        map = self.map
+        if map is not None and 0 <= x_coord < map.width and 0 <= y_coord < map.height:
+            return AgentState(map.nodes[y_coord * map.width + x_coord], self.__rots[index])
+        return AgentState(Node(x_coord, y_coord), self.__rots[index])
+
+    def get_coords(self, timestep: int) -> tuple[int, int, int]:
+        index = timestep - self.start_timestep
+        if not 0 <= index < self.__length:
+            raise KeyError(timestep)
+        return (self.__x_coords[index], self.__y_coords[index], self.__rots[index])
+
+    def append(self, state: AgentState):
+        self.__append_coords(state.node.x_coord, state.node.y_coord, state.rot)
+
+    def set_state(self, timestep: int, state: AgentState):
+        if self.__length == 0:
+            self.start_timestep = timestep
+        index = timestep - self.start_timestep
+        if index == self.__length:
+            self.append(state)
+        elif 0 <= index < self.__length:
+            self.__make_writable()
+            self.__x_coords[index] = state.node.x_coord
+            self.__y_coords[index] = state.node.y_coord
+            self.__rots[index] = state.rot
+        else:
+            raise ValueError(f"Timestep {timestep} would leave a gap in the path")
+
+    def truncate(self, timestep: int):
+        # Removes every state at or after the given timestep
+        new_length = min(self.__length, max(0, timestep - self.start_timestep))
+        if new_length == self.__length:
+            return
+        self.__length = new_length
+        if not self.__shared:
+            del self.__x_coords[new_length:]
+            del self.__y_coords[new_length:]
+            del self.__rots[new_length:]
+
+    def discard_before(self, timestep: int):
+        # Removes every state before the given timestep
+        num_discarded = min(self.__length, max(0, timestep - self.start_timestep))
+        if num_discarded == 0:
+            return
+        self.__x_coords = self.__x_coords[num_discarded:self.__length]
+        self.__y_coords = self.__y_coords[num_discarded:self.__length]
+        self.__rots = self.__rots[num_discarded:self.__length]
+        self.__shared = False
+        self.__length -= num_discarded
+        self.start_timestep += num_discarded
 
     def clone(self) -> "AgentPath":
-        clone = AgentPath()
-        clone.path = deepcopy(self.path)
-        return clone
\ No newline at end of file
+        clone = AgentPath(map=self.map)
+        clone.start_timestep = self.start_timestep
+        clone.__length = self.__length
+        clone.__x_coords = self.__x_coords
+        clone.__y_coords = self.__y_coords
+        clone.__rots = self.__rots
+        clone.__shared = True
+        self.__shared = True
+        return clone
+
+    def __getstate__(self) -> tuple:
+        # Only the states up to this path's length are stored, and a copy never shares its arrays. The map is not stored,
+        # see System.from_state
+        length = self.__length
+        return (self.start_timestep, self.__x_coords[:length], self.__y_coords[:length], self.__rots[:length])
+
+    def __setstate__(self, state: tuple):
+        self.start_timestep, self.__x_coords, self.__y_coords, self.__rots = state
+        self.__length = len(self.__x_coords)
+        self.__shared = False
+        self.__view = None
+        self.map = None
+
+    def __iadd__(self, other: "AgentPath") -> "AgentPath":
+        # States of the other path replace any states of this path from its start timestep onwards
+        if not isinstance(other, AgentPath):
+            return NotImplemented
+        if self.map is None:
+            self.map = other.map
+        if len(other) == 0:
+            return self
+        if self.__length == 0 or other.start_timestep <= self.start_timestep:
+            self.truncate(self.start_timestep)
+            self.start_timestep = other.start_timestep
+        elif other.start_timestep > self.end_timestep + 1:
+            raise ValueError(f"Path starting at timestep {other.start_timestep} would leave a gap after timestep {self.end_timestep}")
+        else:
+            self.truncate(other.start_timestep)
+        other_length = len(other)
+        other_x_coords, other_y_coords, other_rots = other.__x_coords, other.__y_coords, other.__rots
+        if len(self.__x_coords) != self.__length:
+            self.__make_writable()
+        self.__x_coords.extend(other_x_coords[:other_length])
+        self.__y_coords.extend(other_y_coords[:other_length])
+        self.__rots.extend(other_rots[:other_length])
+        self.__length += other_length
+        return self
+
+    def __add__(self, other: "AgentPath") -> "AgentPath":
+        if not isinstance(other, AgentPath):
+            return NotImplemented
+        new_path = self.clone()
+        new_path += other
+        return new_path
+
+    def __append_coords(self, x_coord: int, y_coord: int, rot: int):
+        if len(self.__x_coords) != self.__length:
+            # Another path sharing the arrays has already appended past this path's end
+            self.__make_writable()
+        self.__x_coords.append(x_coord)
+        self.__y_coords.append(y_coord)
+        self.__rots.append(rot)
+        self.__length += 1
+
+    def __make_writable(self):
+        if not self.__shared and len(self.__x_coords) == self.__length:
+            return
+        self.__x_coords = self.__x_coords[:self.__length]
+        self.__y_coords = self.__y_coords[:self.__length]
+        self.__rots = self.__rots[:self.__length]
+        self.__shared = False
+
+class PathView(MutableMapping):
+
+    # Dict-style timestep -> AgentState view of an AgentPath, kept for existing callers
+
+    def __init__(self, agent_path: AgentPath):
+        self.__agent_path = agent_path
+
+    def __getitem__(self, timestep: int) -> AgentState:
+        return self.__agent_path.get_state(timestep)
+
+    def __setitem__(self, timestep: int, state: AgentState):
+        self.__agent_path.set_state(timestep, state)
+
+    def __delitem__(self, timestep: int):
+        agent_path = self.__agent_path
+        if timestep not in agent_path:
+            raise KeyError(timestep)
+        if timestep == agent_path.end_timestep:
+            agent_path.truncate(timestep)
+        elif timestep == agent_path.start_timestep:
+            agent_path.discard_before(timestep + 1)
+        else:
+            raise ValueError(f"Deleting timestep {timestep} would leave a gap in the path")
+
+    def __contains__(self, timestep: int) -> bool:
+        return timestep in self.__agent_path
+
+    def __iter__(self):
+        return iter(range(self.__agent_path.start_timestep, self.__agent_path.end_timestep + 1))
+
+    def __len__(self) -> int:
+        return len(self.__agent_path)
@@ -1,15 +1,28 @@
+from functools import total_ordering
 from app.components.environment.node import Node
 
+@total_ordering
 class AgentState:
 
+    __slots__ = ("node", "rot")
+
     def __init__(self, node: Node, rot: int):
         self.node = node
         self.rot = rot
 
     def __eq__(self, other_agent_state: "AgentState"):
+        if not isinstance(other_agent_state, AgentState):
+            return NotImplemented
         return self.node == other_agent_state.node and self.rot == other_agent_state.rot
 
+    def __lt__(self, other_agent_state: "AgentState") -> bool:
+        # Ordered by node, then by rotation
+        if not isinstance(other_agent_state, AgentState):
+            return NotImplemented
+        return (self.node, self.rot) < (other_agent_state.node, other_agent_state.rot)
+
     def __hash__(self):
-        description = f"{self.node.x_coord}_{self.node.y_coord}_{self.rot}"
-        hash_key = hash(description)
-        return hash_key
\ No newline at end of file
+        return hash(self.node) * 4 + self.rot // 90
+
+    def __repr__(self) -> str:
+        return f"AgentState({self.node!r}, {self.rot})"
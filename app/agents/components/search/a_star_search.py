@@ -1,11 +1,14 @@
 from heapq import heappop, heappush
+from time import perf_counter
+
+import numpy as np
 
 from app.components.system.system import System
 from app.components.environment.node import Node
+from app.components.environment.distance_oracle import UNREACHABLE, FORWARD_OFFSETS
 from app.agents.components.agent_state import AgentState
 from app.agents.components.agent_path import AgentPath
 from app.agents.components.search.components.state import State
-from app.components.environment.node_state import NodeStatus
 
 __all__ = ["heuristic", "A_Star_Search"]
 
@@ -15,74 +18,145 @@ def heuristic(start_node: Node, end_node: Node):
 
 class A_Star_Search:
 
-    def __init__(self, system: System):
+    def __init__(self, system: System, window: int = None):
         self.system: System = system
+        # Conflicts are only avoided within this many timesteps from the current one - None avoids them everywhere
+        self.window: int | None = window
+        # Counters of the most recent search
+        self.expansions: int = 0
+        self.generated: int = 0
+        self.collision_checks: int = 0
+        self.conflict_fallback: bool = False
+        self.cached: bool = False
 
     def search(self, timestep: int, start_state: AgentState, end_node: Node) -> AgentPath:
-        init_state = State(timestep - 1, start_state, 0, heuristic(start_state.node, end_node))
+        system = self.system
+        stats = system.stats
+        if stats is None:
+            path = self.__search_cached(timestep, start_state, end_node)
+            if self.conflict_fallback:
+                system.conflict_fallbacks += 1
+            return path
+        start_time = perf_counter()
+        path = self.__search_cached(timestep, start_state, end_node)
+        if self.conflict_fallback:
+            system.conflict_fallbacks += 1
+            stats.add("conflict_fallbacks")
+        stats.add_search(perf_counter() - start_time, self.expansions, self.generated, self.collision_checks, 0 if path is None else len(path), self.cached)
+        return path
+
+    def __search_cached(self, timestep: int, start_state: AgentState, end_node: Node) -> AgentPath:
+        self.expansions = 0
+        self.generated = 0
+        self.collision_checks = 0
+        self.conflict_fallback = False
+        self.cached = False
+        reservations = self.system.reservations
+        search_cache = self.system.search_cache
+        window_end = None if self.window is None else self.system.timestep + self.window - 1
+        cache_key = (timestep, start_state.node.x_coord, start_state.node.y_coord, start_state.rot, end_node.x_coord, end_node.y_coord, window_end)
+        cached = search_cache.get(cache_key, reservations)
+        if cached is not None:
+            self.cached = True
+            path, self.conflict_fallback = cached
+            return None if path is None else path.clone()
+        version = reservations.version
+        # Last timestep whose reservations were checked by the search
+        self.__last_checked_timestep = timestep - 1
+        path = self.__search(timestep, start_state, end_node, window_end)
+        # No conflict-free path exists, e.g. another agent was planned through this agent's cell. No path is returned, so
+        # that the agent waits and searches again, instead of following a path that collides
+        self.conflict_fallback = path is None
+        last_checked_timestep = self.__last_checked_timestep if window_end is None else min(self.__last_checked_timestep, window_end)
+        search_cache.put(cache_key, version, timestep, last_checked_timestep, path, self.conflict_fallback)
+        return None if path is None else path.clone()
+
+    def __search(self, timestep: int, start_state: AgentState, end_node: Node, window_end: int | None) -> AgentPath:
+        self.generated += 1
+        # Exact static distances to the goal, used as a perfect heuristic when there are no other agents
+        map = self.system.map
+        distances = map.distance_oracle.get_table(end_node)
+        end_cell_id = map.cell_id(end_node.x_coord, end_node.y_coord)
+        init_state = State(timestep - 1, start_state, 0, map.distance_oracle.distance(start_state, end_node), map.cell_id(start_state.node.x_coord, start_state.node.y_coord))
         prior_queue: list[State] = [init_state]
-        came_from_dict = {}  
-        visited = []
+        came_from_dict: dict[tuple, State] = {}
+        best_g_costs: dict[tuple, int] = {init_state.key: 0}
+        closed: set[tuple] = set()
+        # Past the reservation horizon or the window the search is time-independent, so each (x, y, rot) is expanded only once
+        horizon = self.system.reservations.horizon
+        if window_end is not None:
+            horizon = min(horizon, window_end)
+        closed_after_horizon: set[tuple] = set()
         while prior_queue:
             curr_state = heappop(prior_queue)
-            if curr_state.state.node == end_node:
-                path = [curr_state]
-                if curr_state in came_from_dict:
-                    while curr_state in came_from_dict:
-                        curr_state = came_from_dict[curr_state]
-                        path.append(curr_state)
-                    path = path[::-1]
-                path = {agent_state.timestep: agent_state.state for agent_state in path}
-                return AgentPath(path)
-            visited.append(curr_state)
-            neighbours = self.__get_neighbours(curr_state, end_node)
-            for neigh_state in neighbours:
-                if (neigh_state not in visited) and (neigh_state not in prior_queue):
-                    came_from_dict[neigh_state] = curr_state
-                    heappush(prior_queue, neigh_state)
+            curr_key = curr_state.key
+            if curr_key in closed:
+                # Stale entry left behind by a cheaper push of the same state
+                continue
+            if curr_key[1] == end_cell_id:
+                return self.__reconstruct_path(curr_state, came_from_dict)
+            if curr_state.timestep > horizon:
+                static_key = curr_key[1:]
+                if static_key in closed_after_horizon:
+                    continue
+                closed_after_horizon.add(static_key)
+            closed.add(curr_key)
+            self.expansions += 1
+            if curr_state.timestep >= self.__last_checked_timestep:
+                self.__last_checked_timestep = curr_state.timestep + 1
+            for neigh_state in self.__get_neighbours(curr_state, distances, horizon):
+                neigh_key = neigh_state.key
+                if neigh_key in closed or neigh_state.g_cost >= best_g_costs.get(neigh_key, float("inf")):
+                    continue
+                best_g_costs[neigh_key] = neigh_state.g_cost
+                came_from_dict[neigh_key] = curr_state
+                heappush(prior_queue, neigh_state)
+                self.generated += 1
         return None
 
-    def __check_collision(self, curr_state: State, next_state: State):
-        for agent in self.system.agents:
-            agent_path = agent.path
-            if next_state.timestep in agent_path.path:
-                other_next_state: AgentState = agent_path.path[next_state.timestep]
-                if next_state.state.node == other_next_state.node:
-                    return True
-                other_curr_time = agent_path.path[curr_state.timestep]
-                if other_next_state.node == curr_state.state.node and other_curr_time.node == next_state.state.node:
-                    return True
-        return False
+    def __reconstruct_path(self, end_state: State, came_from_dict: dict[tuple, State]) -> AgentPath:
+        path = [end_state]
+        curr_state = end_state
+        while curr_state.key in came_from_dict:
+            curr_state = came_from_dict[curr_state.key]
+            path.append(curr_state)
+        path.reverse()
+        return AgentPath.from_states(path[0].timestep, [search_state.state for search_state in path], self.system.map)
 
-    def __check_valid_state(self, curr_state: State, next_state: State):
-        next_node = next_state.state.node
-        try:
-            node_status = self.system.map.env[(next_node.x_coord, next_node.y_coord)].node_status
-            is_obstacle = True if node_status == NodeStatus.OBSTACLE.value else False
-        except:
-            return False
-        return (next_state.state.node.is_in_boundary()) \
-             and (not is_obstacle) and (not self.__check_collision(curr_state, next_state))
+    def __check_collision(self, curr_state: State, next_state: State):
+        self.collision_checks += 1
+        reservations = self.system.reservations
+        if reservations.is_vertex_reserved(next_state.state.node, next_state.timestep):
+            return True
+        # Swap conflict - another agent moves from the next node into the current node
+        return reservations.is_edge_reserved(next_state.state.node, curr_state.state.node, next_state.timestep)
 
-    def __get_neighbours(self, curr_state: State, end_node: Node) -> list[State]:
+    def __get_neighbours(self, curr_state: State, distances: np.ndarray, horizon: int) -> list[State]:
         neigh_states = []
         neigh_timestep = curr_state.timestep + 1
+        map = self.system.map
+        # Neighbours use the map's shared nodes, so that no nodes are created during the search
+        nodes = map.nodes
+        width = map.width
         curr_node = curr_state.state.node
         curr_y_coord = curr_node.y_coord
         curr_x_coord = curr_node.x_coord
         curr_rot = curr_state.state.rot
-        dir_dict = {
-            0: Node(curr_x_coord, curr_y_coord - 1),
-            90: Node(curr_x_coord + 1, curr_y_coord),
-            180: Node(curr_x_coord, curr_y_coord + 1),
-            270: Node(curr_x_coord - 1, curr_y_coord)
-        }
+        x_offset, y_offset = FORWARD_OFFSETS[curr_rot // 90]
         new_g_cost = curr_state.g_cost + 1
-        poss_neigh = [State(neigh_timestep, AgentState(Node(curr_x_coord, curr_y_coord), curr_rot), new_g_cost, heuristic(Node(curr_x_coord, curr_y_coord), end_node)),
-                      State(neigh_timestep, AgentState(Node(curr_x_coord, curr_y_coord), (curr_rot + 90) % 360), new_g_cost, heuristic(Node(curr_x_coord, curr_y_coord), end_node)),
-                      State(neigh_timestep, AgentState(Node(curr_x_coord, curr_y_coord), (curr_rot - 90) % 360), new_g_cost, heuristic(Node(curr_x_coord, curr_y_coord), end_node)),
-                      State(neigh_timestep, AgentState(dir_dict[curr_rot], curr_rot), new_g_cost, heuristic(dir_dict[curr_rot], end_node))]
-        for neigh_state in poss_neigh:
-            if self.__check_valid_state(curr_state, neigh_state):
+        avoid_conflicts = neigh_timestep <= horizon
+        poss_neigh = [(curr_x_coord, curr_y_coord, curr_rot),
+                      (curr_x_coord, curr_y_coord, (curr_rot + 90) % 360),
+                      (curr_x_coord, curr_y_coord, (curr_rot - 90) % 360),
+                      (curr_x_coord + x_offset, curr_y_coord + y_offset, curr_rot)]
+        for neigh_x_coord, neigh_y_coord, neigh_rot in poss_neigh:
+            if not map.is_passable(neigh_x_coord, neigh_y_coord):
+                continue
+            h_cost = distances.item(neigh_rot // 90, neigh_y_coord, neigh_x_coord)
+            if h_cost == UNREACHABLE:
+                continue
+            neigh_cell_id = neigh_y_coord * width + neigh_x_coord
+            neigh_state = State(neigh_timestep, AgentState(nodes[neigh_cell_id], neigh_rot), new_g_cost, h_cost, neigh_cell_id)
+            if not avoid_conflicts or not self.__check_collision(curr_state, neigh_state):
                 neigh_states.append(neigh_state)
-        return neigh_states
\ No newline at end of file
+        return neigh_states
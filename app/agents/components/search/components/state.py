@@ -1,21 +1,27 @@
 from app.agents.components.agent_state import AgentState
-from app.components.environment.node import Node
 
 class State:
 
-    def __init__(self, timestep: int, state: AgentState, g_cost: int, f_cost: int):
+    __slots__ = ("timestep", "state", "g_cost", "h_cost", "f_cost", "key", "priority")
+
+    def __init__(self, timestep: int, state: AgentState, g_cost: int, h_cost: int, cell_id: int):
         self.timestep = timestep
         self.state = state
         self.g_cost = g_cost
-        self.f_cost = f_cost
+        self.h_cost = h_cost
+        self.f_cost = g_cost + h_cost
+        # Cell id of the node within the searched map
+        self.key: tuple[int, int, int] = (timestep, cell_id, state.rot)
+        # Ties on f are broken towards the goal (lower h), then the earlier timestep, then the cell itself
+        self.priority: tuple = (self.f_cost, h_cost, timestep, state.node.x_coord, state.node.y_coord, state.rot)
 
     def __lt__(self, other_state: "State"):
-        return self.f_cost < other_state.f_cost
+        return self.priority < other_state.priority
     
     def __eq__(self, other_state: "State"):
-        return self.state == other_state.state
+        if not isinstance(other_state, State):
+            return NotImplemented
+        return self.key == other_state.key
     
     def __hash__(self):
-        description = f"{self.timestep}_{self.state}_{self.g_cost}_{self.f_cost}"
-        hash_key = hash(description)
-        return hash_key
\ No newline at end of file
+        return hash(self.key)
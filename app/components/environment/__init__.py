@@ -1,3 +1,7 @@
 from .node import *
 from .map import *
 from .node_state import *
+from .distance_oracle import *
+from .map_loader import *
+from .warehouse import *
+from .spatial_index import *
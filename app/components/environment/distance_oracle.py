@@ -0,0 +1,70 @@
+import numpy as np
+
+from app.components.environment.node import Node
+
+__all__ = ["DistanceOracle", "UNREACHABLE"]
+
+# Distance reported for states that can never reach the target node
+UNREACHABLE = int(np.iinfo(np.int32).max)
+
+# Cell offset of a forward move for each rotation index (rot // 90)
+FORWARD_OFFSETS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+class DistanceOracle:
+
+    # Exact static travel times (moves and 90 degree turns) from every (x, y, rot) to a target node,
+    # ignoring other agents. Each target gets a dense (4, height, width) table built by a backward BFS.
+
+    def __init__(self, map):
+        self.map = map
+        self.__tables: dict[tuple[int, int], np.ndarray] = {}
+
+    def get_table(self, node: Node) -> np.ndarray:
+        target = (node.x_coord, node.y_coord)
+        table = self.__tables.get(target)
+        if table is None:
+            table = self.__backward_bfs(node.x_coord, node.y_coord)
+            self.__tables[target] = table
+        return table
+
+    def distance(self, agent_state, node: Node) -> int:
+        agent_node = agent_state.node
+        if not self.map.is_in_boundary(agent_node.x_coord, agent_node.y_coord):
+            return UNREACHABLE
+        return self.get_table(node).item(agent_state.rot // 90, agent_node.y_coord, agent_node.x_coord)
+
+    def precompute(self, nodes: list[Node] = None):
+        if nodes is None:
+            nodes = self.map.get_task_endpoints() + self.map.get_non_task_endpoints()
+        for node in nodes:
+            self.get_table(node)
+
+    def __backward_bfs(self, x_coord: int, y_coord: int) -> np.ndarray:
+        passable = self.map.passable
+        table = np.full((4,) + passable.shape, UNREACHABLE, dtype=np.int32)
+        if not self.map.is_passable(x_coord, y_coord):
+            return table
+        frontier = np.zeros(table.shape, dtype=bool)
+        frontier[:, y_coord, x_coord] = True
+        table[frontier] = 0
+        unvisited = passable[np.newaxis, :, :] & ~frontier
+        distance = 0
+        while frontier.any():
+            distance += 1
+            # Turning 90 degrees either way reaches a frontier state
+            predecessors = np.roll(frontier, 1, axis=0) | np.roll(frontier, -1, axis=0)
+            # Moving forward from (x - dx, y - dy) with the same rotation reaches a frontier state at (x, y)
+            for rot_index, (x_offset, y_offset) in enumerate(FORWARD_OFFSETS):
+                predecessors[rot_index] |= self.__shift(frontier[rot_index], -x_offset, -y_offset)
+            frontier = predecessors & unvisited
+            table[frontier] = distance
+            unvisited &= ~frontier
+        return table
+
+    def __shift(self, layer: np.ndarray, x_offset: int, y_offset: int) -> np.ndarray:
+        # shifted[y + y_offset, x + x_offset] = layer[y, x], without wrapping around the edges
+        shifted = np.zeros_like(layer)
+        height, width = layer.shape
+        shifted[max(y_offset, 0):height + min(y_offset, 0), max(x_offset, 0):width + min(x_offset, 0)] = \
+            layer[max(-y_offset, 0):height + min(-y_offset, 0), max(-x_offset, 0):width + min(-x_offset, 0)]
+        return shifted
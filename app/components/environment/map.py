@@ -1,26 +1,160 @@
-from app.components.environment.node_state import NodeState, NodeStatus
+from collections.abc import Mapping
+
+import numpy as np
+
+from app.components.environment.node_state import NodeState, NodeStatus, NODE_STATUS_CODES, NODE_STATUSES
 from app.components.environment.node import Node
+from app.components.environment.distance_oracle import DistanceOracle
+
+__all__ = ["Map", "MapView", "MISSING_NODE_CODE"]
+
+# Grid code for cells that were never created - treated as outside of the map
+MISSING_NODE_CODE = -1
 
 class Map:
 
-    def __init__ (self):
-        self.env: dict[(int, int), NodeState] = {}
+    def __init__ (self, width: int = 0, height: int = 0):
+        self.width: int = width
+        self.height: int = height
+        self.grid: np.ndarray = np.full((height, width), MISSING_NODE_CODE, dtype=np.int8)
+        self.env: MapView = MapView(self)
+        self.__clear_cache()
+
+    @classmethod
+    def from_status_grid(cls, node_status: list[list[str]]) -> "Map":
+        map = cls(width=len(node_status[0]), height=len(node_status))
+        for y_coord in range(map.height):
+            for x_coord in range(map.width):
+                map.grid[y_coord, x_coord] = NODE_STATUS_CODES[NodeStatus(node_status[y_coord][x_coord])]
+        return map
+
+    @property
+    def passable(self) -> np.ndarray:
+        if self.__passable is None:
+            self.__build_passable()
+        return self.__passable
+
+    @property
+    def distance_oracle(self) -> DistanceOracle:
+        if self.__distance_oracle is None:
+            self.__distance_oracle = DistanceOracle(self)
+        return self.__distance_oracle
+
+    @property
+    def task_endpoints(self) -> np.ndarray:
+        if self.__task_endpoints is None:
+            self.__task_endpoints = self.__find_cells(NodeStatus.TASK_ENDPOINT)
+        return self.__task_endpoints
+
+    @property
+    def non_task_endpoints(self) -> np.ndarray:
+        if self.__non_task_endpoints is None:
+            self.__non_task_endpoints = self.__find_cells(NodeStatus.NON_TASK_ENDPOINT)
+        return self.__non_task_endpoints
+
+    @property
+    def nodes(self) -> list[Node]:
+        # One shared Node per cell, indexed by cell id
+        if self.__nodes is None:
+            self.__nodes = [Node(x_coord, y_coord) for y_coord in range(self.height) for x_coord in range(self.width)]
+        return self.__nodes
+
+    def cell_id(self, x_coord: int, y_coord: int) -> int:
+        # Dense row-major id of a cell within the map
+        return y_coord * self.width + x_coord
+
+    def get_node(self, x_coord: int, y_coord: int) -> Node:
+        if not (0 <= x_coord < self.width and 0 <= y_coord < self.height):
+            raise ValueError(f"Node at coordinates ({x_coord}, {y_coord}) is outside of the map!")
+        return self.nodes[y_coord * self.width + x_coord]
+
+    def get_node_by_id(self, cell_id: int) -> Node:
+        return self.nodes[cell_id]
+
+    def is_in_boundary(self, x_coord: int, y_coord: int) -> bool:
+        return 0 <= x_coord < self.width and 0 <= y_coord < self.height
+
+    def is_passable(self, x_coord: int, y_coord: int) -> bool:
+        if not (0 <= x_coord < self.width and 0 <= y_coord < self.height):
+            return False
+        if self.__passable is None:
+            self.__build_passable()
+        return self.__passable_rows[y_coord][x_coord]
 
     def get_node_state(self, x_coord: int, y_coord: int) -> NodeState:
         if (x_coord, y_coord) in self.env:
             return self.env[(x_coord, y_coord)]
         else:
             raise ValueError(f"Node at coordinates ({x_coord}, {y_coord}) does not exist!")
-    
+
     def create_node(self, x_coord: int, y_coord: int, node_status: NodeStatus):
         if (x_coord, y_coord) not in self.env:
-            self.env[(x_coord, y_coord)] = NodeState(Node(x_coord, y_coord), node_status)
+            self.__fit_to(x_coord, y_coord)
+            self.grid[y_coord, x_coord] = NODE_STATUS_CODES[NodeStatus(node_status)]
+            self.__clear_cache()
         else:
             raise ValueError(f"Node at coordinates ({x_coord}, {y_coord}) already exists!")
-        
+
+    def refresh(self):
+        # Must be called after writing to the grid directly, so that the cached views are rebuilt
+        self.__clear_cache()
+
+    def get_task_endpoints(self) -> list[Node]:
+        if self.__task_endpoint_nodes is None:
+            self.__task_endpoint_nodes = [self.get_node(int(x_coord), int(y_coord)) for x_coord, y_coord in self.task_endpoints]
+        return list(self.__task_endpoint_nodes)
+
     def get_non_task_endpoints(self) -> list[Node]:
-        non_task_endpoints = []
-        for _, node_state in self.env.items():
-            if node_state.node_status == NodeStatus.NON_TASK_ENDPOINT.value:
-                non_task_endpoints.append(node_state.node)
-        return non_task_endpoints
\ No newline at end of file
+        if self.__non_task_endpoint_nodes is None:
+            self.__non_task_endpoint_nodes = [self.get_node(int(x_coord), int(y_coord)) for x_coord, y_coord in self.non_task_endpoints]
+        return list(self.__non_task_endpoint_nodes)
+
+    def __build_passable(self):
+        self.__passable = (self.grid != MISSING_NODE_CODE) & (self.grid != NODE_STATUS_CODES[NodeStatus.OBSTACLE])
+        # Nested lists are faster than NumPy for the scalar lookups made by the search
+        self.__passable_rows = self.__passable.tolist()
+
+    def __find_cells(self, node_status: NodeStatus) -> np.ndarray:
+        # Row-major (y, then x) order, returned as an (n, 2) array of (x, y) coordinates
+        y_coords, x_coords = np.nonzero(self.grid == NODE_STATUS_CODES[node_status])
+        return np.stack([x_coords, y_coords], axis=1)
+
+    def __fit_to(self, x_coord: int, y_coord: int):
+        if x_coord < 0 or y_coord < 0:
+            raise ValueError(f"Node at coordinates ({x_coord}, {y_coord}) has negative coordinates!")
+        pad_x = max(0, x_coord + 1 - self.width)
+        pad_y = max(0, y_coord + 1 - self.height)
+        if pad_x or pad_y:
+            self.grid = np.pad(self.grid, ((0, pad_y), (0, pad_x)), constant_values=MISSING_NODE_CODE)
+            self.height, self.width = self.grid.shape
+
+    def __clear_cache(self):
+        self.__passable: np.ndarray | None = None
+        self.__passable_rows: list[list[bool]] | None = None
+        self.__task_endpoints: np.ndarray | None = None
+        self.__non_task_endpoints: np.ndarray | None = None
+        self.__task_endpoint_nodes: list[Node] | None = None
+        self.__non_task_endpoint_nodes: list[Node] | None = None
+        self.__distance_oracle: DistanceOracle | None = None
+        self.__nodes: list[Node] | None = None
+
+class MapView(Mapping):
+
+    # Read-only (x, y) -> NodeState view over the status grid of a Map
+
+    def __init__(self, map: Map):
+        self.__map = map
+
+    def __getitem__(self, coords: tuple[int, int]) -> NodeState:
+        x_coord, y_coord = coords
+        if not self.__map.is_in_boundary(x_coord, y_coord) or self.__map.grid[y_coord, x_coord] == MISSING_NODE_CODE:
+            raise KeyError(coords)
+        return NodeState(Node(x_coord, y_coord), NODE_STATUSES[int(self.__map.grid[y_coord, x_coord])].value)
+
+    def __iter__(self):
+        y_coords, x_coords = np.nonzero(self.__map.grid != MISSING_NODE_CODE)
+        for x_coord, y_coord in zip(x_coords.tolist(), y_coords.tolist()):
+            yield (x_coord, y_coord)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.__map.grid != MISSING_NODE_CODE))
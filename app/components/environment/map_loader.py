@@ -0,0 +1,71 @@
+from random import Random
+
+import numpy as np
+from scipy.ndimage import label
+
+from app.components.environment.map import Map
+from app.components.environment.node_state import NodeStatus, NODE_STATUS_CODES
+
+__all__ = ["load_movingai_map", "parse_movingai_map", "annotate_endpoints", "MOVINGAI_CELL_STATUSES"]
+
+# Cell characters of the MovingAI format, plus "e" (task endpoint) and "r" (non-task endpoint) as used by the
+# lifelong MAPD warehouse maps
+MOVINGAI_CELL_STATUSES: dict[str, NodeStatus] = {
+    ".": NodeStatus.FREE,
+    "G": NodeStatus.FREE,
+    "S": NodeStatus.FREE,
+    "@": NodeStatus.OBSTACLE,
+    "O": NodeStatus.OBSTACLE,
+    "T": NodeStatus.OBSTACLE,
+    "W": NodeStatus.OBSTACLE,
+    "e": NodeStatus.TASK_ENDPOINT,
+    "E": NodeStatus.TASK_ENDPOINT,
+    "r": NodeStatus.NON_TASK_ENDPOINT,
+    "R": NodeStatus.NON_TASK_ENDPOINT
+}
+
+def load_movingai_map(file_path: str, num_task_endpoints: int = 0, num_non_task_endpoints: int = 0, random: Random = None) -> Map:
+    with open(file_path) as map_file:
+        return parse_movingai_map(map_file.read(), num_task_endpoints, num_non_task_endpoints, random)
+
+def parse_movingai_map(content: str, num_task_endpoints: int = 0, num_non_task_endpoints: int = 0, random: Random = None) -> Map:
+    # Benchmark maps without endpoints can be given the requested number of random endpoints
+    lines = content.splitlines()
+    header = {}
+    line_index = 0
+    while line_index < len(lines) and lines[line_index].strip() != "map":
+        fields = lines[line_index].split()
+        if len(fields) == 2:
+            header[fields[0]] = fields[1]
+        line_index += 1
+    if "height" not in header or "width" not in header or line_index == len(lines):
+        raise ValueError("Not a MovingAI map - expected height, width and map lines!")
+    height, width = int(header["height"]), int(header["width"])
+    rows = lines[line_index + 1:line_index + 1 + height]
+    if len(rows) != height or any(len(row.rstrip("\r")) < width for row in rows):
+        raise ValueError(f"Map rows do not match the declared size of {width}x{height}!")
+    map = Map(width=width, height=height)
+    for y_coord, row in enumerate(rows):
+        for x_coord, cell in enumerate(row[:width]):
+            if cell not in MOVINGAI_CELL_STATUSES:
+                raise ValueError(f"Unknown map cell '{cell}' at ({x_coord}, {y_coord})!")
+            map.grid[y_coord, x_coord] = NODE_STATUS_CODES[MOVINGAI_CELL_STATUSES[cell]]
+    if num_task_endpoints or num_non_task_endpoints:
+        annotate_endpoints(map, num_task_endpoints, num_non_task_endpoints, random)
+    return map
+
+def annotate_endpoints(map: Map, num_task_endpoints: int, num_non_task_endpoints: int, random: Random = None):
+    # Turns random free cells of the largest connected area into endpoints, so that every endpoint can reach every other
+    random = random or Random()
+    components, _ = label(map.passable)
+    component_sizes = np.bincount(components.ravel())
+    component_sizes[0] = 0
+    y_coords, x_coords = np.nonzero((components == np.argmax(component_sizes)) & (map.grid == NODE_STATUS_CODES[NodeStatus.FREE]))
+    free_cells = list(zip(x_coords.tolist(), y_coords.tolist()))
+    if num_task_endpoints + num_non_task_endpoints > len(free_cells):
+        raise ValueError(f"Only {len(free_cells)} free cells are available for endpoints!")
+    chosen_cells = random.sample(free_cells, num_task_endpoints + num_non_task_endpoints)
+    for index, (x_coord, y_coord) in enumerate(chosen_cells):
+        node_status = NodeStatus.TASK_ENDPOINT if index < num_task_endpoints else NodeStatus.NON_TASK_ENDPOINT
+        map.grid[y_coord, x_coord] = NODE_STATUS_CODES[node_status]
+    map.refresh()
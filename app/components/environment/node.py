@@ -1,20 +1,34 @@
-from app.constants import MAX_COLS, MAX_ROWS
+from functools import total_ordering
 
+# Nodes hash to y * NODE_HASH_STRIDE + x, which is distinct for any two nodes with 32-bit coordinates, the range paths store.
+# It is not the cell id y * width + x the reservation table and System key cells by, as a node does not know its map's width.
+NODE_HASH_STRIDE = 1 << 32
+
+@total_ordering
 class Node:
 
+    __slots__ = ("x_coord", "y_coord")
+
     def __init__ (self, x_coord: int, y_coord: int):
         self.x_coord: int = x_coord
         self.y_coord: int = y_coord
 
     def __eq__(self, other_node: "Node") -> bool:
         if not isinstance(other_node, Node):
-            raise TypeError(f"Cannot compare 'Node' with '{type(other_node).__name__}'")
+            return NotImplemented
         return (self.x_coord == other_node.x_coord) and (self.y_coord == other_node.y_coord)
+
+    def __lt__(self, other_node: "Node") -> bool:
+        # Row-major order, the same as cell ids
+        if not isinstance(other_node, Node):
+            return NotImplemented
+        return (self.y_coord, self.x_coord) < (other_node.y_coord, other_node.x_coord)
     
-    def is_in_boundary(self):
-        return 0 <= self.x_coord < MAX_COLS and 0 <= self.y_coord < MAX_ROWS
+    def is_in_boundary(self, map) -> bool:
+        return map.is_in_boundary(self.x_coord, self.y_coord)
 
     def __hash__(self):
-        hash_prime = 397
-        hash_key = (((self.x_coord * hash_prime) ** self.y_coord) * hash_prime)
-        return hash_key
+        return self.y_coord * NODE_HASH_STRIDE + self.x_coord
+
+    def __repr__(self) -> str:
+        return f"Node({self.x_coord}, {self.y_coord})"
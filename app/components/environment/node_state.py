@@ -8,8 +8,19 @@ class NodeStatus(Enum):
     TASK_ENDPOINT = "TASK_ENDPOINT"
     NON_TASK_ENDPOINT = "NON_TASK_ENDPOINT"
 
+# Compact int8 codes used by the status grid of a Map
+NODE_STATUS_CODES: dict[NodeStatus, int] = {
+    NodeStatus.FREE: 0,
+    NodeStatus.OBSTACLE: 1,
+    NodeStatus.TASK_ENDPOINT: 2,
+    NodeStatus.NON_TASK_ENDPOINT: 3
+}
+NODE_STATUSES: dict[int, NodeStatus] = {code: node_status for node_status, code in NODE_STATUS_CODES.items()}
+
 class NodeState:
 
+    __slots__ = ("node", "node_status")
+
     def __init__(self, node: Node, node_status: NodeStatus):
         self.node = node
         self.node_status = node_status
\ No newline at end of file
@@ -0,0 +1,93 @@
+from bisect import insort
+
+__all__ = ["SpatialIndex", "DEFAULT_BUCKET_SIZE"]
+
+DEFAULT_BUCKET_SIZE = 8
+
+class SpatialIndex:
+
+    # Values at grid cells, keyed and kept in insertion order like a dict, and bucketed into square blocks of
+    # bucket_size cells. nearest() visits the buckets in order of their Manhattan distance to the query cell,
+    # a lower bound of the travel time, and stops once no bucket left can hold a closer value.
+
+    def __init__(self, bucket_size: int = DEFAULT_BUCKET_SIZE):
+        if bucket_size < 1:
+            raise ValueError("Buckets must hold at least 1 cell!")
+        self.bucket_size: int = bucket_size
+        # key -> (value, x, y, order)
+        self.__items: dict = {}
+        # (bucket x, bucket y) -> keys in the bucket
+        self.__buckets: dict[tuple[int, int], set] = {}
+        self.__next_order: int = 0
+
+    def add(self, key, value, x_coord: int, y_coord: int, order: int = None):
+        # Keys already in the index keep their value and their place, as with a dict. Ties in nearest() go to the
+        # lowest order, which defaults to the order in which the keys were added.
+        if key in self.__items:
+            return
+        if order is None:
+            order = self.__next_order
+            self.__next_order += 1
+        self.__items[key] = (value, x_coord, y_coord, order)
+        self.__buckets.setdefault((x_coord // self.bucket_size, y_coord // self.bucket_size), set()).add(key)
+
+    def pop(self, key, default=None):
+        item = self.__items.pop(key, None)
+        if item is None:
+            return default
+        value, x_coord, y_coord, _ = item
+        bucket_key = (x_coord // self.bucket_size, y_coord // self.bucket_size)
+        bucket = self.__buckets[bucket_key]
+        bucket.discard(key)
+        if not bucket:
+            del self.__buckets[bucket_key]
+        return value
+
+    def get(self, key, default=None):
+        item = self.__items.get(key)
+        return default if item is None else item[0]
+
+    def values(self) -> list:
+        return [item[0] for item in self.__items.values()]
+
+    def __contains__(self, key) -> bool:
+        return key in self.__items
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    def nearest(self, x_coord: int, y_coord: int, distance, k: int = 1, exclude=()) -> list:
+        # The k values with the smallest distance(value), closest first. distance must never be less than the
+        # Manhattan distance between the cells, as it is for the travel times of the DistanceOracle.
+        if k < 1:
+            return []
+        size = self.bucket_size
+        bucket_bounds = []
+        for bucket_x, bucket_y in self.__buckets:
+            min_x, min_y = bucket_x * size, bucket_y * size
+            x_gap = max(min_x - x_coord, x_coord - min_x - size + 1, 0)
+            y_gap = max(min_y - y_coord, y_coord - min_y - size + 1, 0)
+            bucket_bounds.append((x_gap + y_gap, bucket_x, bucket_y))
+        bucket_bounds.sort()
+        items = self.__items
+        # (distance, order, key) of the closest values so far, at most k
+        closest = []
+        for bound, bucket_x, bucket_y in bucket_bounds:
+            if len(closest) == k and bound > closest[-1][0]:
+                break
+            for key in self.__buckets[(bucket_x, bucket_y)]:
+                if key in exclude:
+                    continue
+                value, item_x_coord, item_y_coord, order = items[key]
+                if len(closest) == k:
+                    worst = closest[-1]
+                    if abs(item_x_coord - x_coord) + abs(item_y_coord - y_coord) > worst[0]:
+                        continue
+                    entry = (distance(value), order, key)
+                    if entry[:2] >= worst[:2]:
+                        continue
+                    closest.pop()
+                else:
+                    entry = (distance(value), order, key)
+                insort(closest, entry, key=lambda entry: entry[:2])
+        return [items[key][0] for _, _, key in closest]
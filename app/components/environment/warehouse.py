@@ -0,0 +1,34 @@
+import numpy as np
+
+from app.components.environment.map import Map
+from app.components.environment.node_state import NodeStatus, NODE_STATUS_CODES
+
+__all__ = ["generate_warehouse"]
+
+def generate_warehouse(shelf_rows: int = 5, shelf_blocks: int = 2, shelf_length: int = 10, aisle_width: int = 1, station_groups: int = 2, station_width: int = 2) -> Map:
+    # Shelf blocks in the middle, each shelf row an obstacle row with a row of task endpoints above and below it, and
+    # columns of non-task endpoints (stations) on both sides, all separated by aisles of free cells.
+    # The defaults give the original 35x21 layout.
+    if min(shelf_rows, shelf_blocks, shelf_length, aisle_width, station_width) < 1 or station_groups < 0:
+        raise ValueError("Warehouse dimensions must be positive!")
+    height = 2 * aisle_width + shelf_rows * 3 + (shelf_rows - 1) * aisle_width
+    station_columns = []
+    shelf_columns = []
+    x_coord = 0
+    for segment_type in ["station"] * station_groups + ["shelf"] * shelf_blocks + ["station"] * station_groups:
+        x_coord += aisle_width
+        segment_width = station_width if segment_type == "station" else shelf_length
+        (station_columns if segment_type == "station" else shelf_columns).extend(range(x_coord, x_coord + segment_width))
+        x_coord += segment_width
+    width = x_coord + aisle_width
+
+    grid = np.full((height, width), NODE_STATUS_CODES[NodeStatus.FREE], dtype=np.int8)
+    grid[aisle_width:height - aisle_width, station_columns] = NODE_STATUS_CODES[NodeStatus.NON_TASK_ENDPOINT]
+    for shelf_index in range(shelf_rows):
+        y_coord = aisle_width + shelf_index * (3 + aisle_width)
+        grid[np.ix_([y_coord, y_coord + 2], shelf_columns)] = NODE_STATUS_CODES[NodeStatus.TASK_ENDPOINT]
+        grid[y_coord + 1, shelf_columns] = NODE_STATUS_CODES[NodeStatus.OBSTACLE]
+    map = Map(width=width, height=height)
+    map.grid[:] = grid
+    map.refresh()
+    return map
@@ -1 +1,7 @@
-from .system import *
\ No newline at end of file
+from .system import *
+from .reservation_table import *
+from .search_cache import *
+from .trajectory_writer import *
+from .recorder import *
+from .checkpoint import *
+from .stats import *
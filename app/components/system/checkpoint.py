@@ -0,0 +1,140 @@
+import io
+import pickle
+from copy import copy, deepcopy
+
+import numpy as np
+
+from app.components.environment.map import Map
+from app.components.environment.node import Node
+from app.components.task.task import Task
+from app.components.system.system import System
+
+__all__ = ["snapshot_system", "restore_system", "fork_system", "save_checkpoint", "load_checkpoint", "CHECKPOINT_TASK_FIELDS"]
+
+CHECKPOINT_VERSION = 1
+# Columns of the task table, one row per released task - times and the assigned agent are -1 while unset
+CHECKPOINT_TASK_FIELDS = ["id", "add_time", "pickup_time", "delivery_time", "assigned_agent", "has_been_picked_up", "pickup_x", "pickup_y", "delivery_x", "delivery_y"]
+
+class _TaskPickler(pickle.Pickler):
+
+    # Released tasks are stored once in the task table, and only referenced by their id everywhere else
+
+    def __init__(self, file, tasks_by_id: dict[int, Task]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.tasks_by_id: dict[int, Task] = tasks_by_id
+
+    def persistent_id(self, obj):
+        if type(obj) is Task and self.tasks_by_id.get(obj.id) is obj:
+            return obj.id
+        return None
+
+class _TaskUnpickler(pickle.Unpickler):
+
+    def __init__(self, file, tasks_by_id: dict[int, Task]):
+        super().__init__(file)
+        self.tasks_by_id: dict[int, Task] = tasks_by_id
+
+    def persistent_load(self, task_id: int) -> Task:
+        return self.tasks_by_id[task_id]
+
+def snapshot_system(system: System) -> dict:
+    # Everything needed to continue the run: the map grid and task table as arrays, and the agents (with their
+    # paths as typed arrays), the shared planner state, the task source and the ID counters pickled together
+    tasks_by_id = {task.id: task for task in system.tasks}
+    agent_classes = {type(agent) for agent in system.agents}
+    state = {
+        "agents": system.agents,
+        "planner_state": system.planner_state,
+        "task_source": system.task_source,
+        "agent_id_counters": {agent_class: agent_class._id_counter for agent_class in agent_classes}
+    }
+    state_buffer = io.BytesIO()
+    _TaskPickler(state_buffer, tasks_by_id).dump(state)
+    return {
+        "version": CHECKPOINT_VERSION,
+        "timestep": system.timestep,
+        "map": system.map.grid.copy(),
+        "tasks": _get_task_table(system.tasks),
+        "task_id_counter": Task._id_counter,
+        "reservation_horizon": system.reservations.horizon,
+        "path_retention": system.path_retention,
+        "search_cache_size": system.search_cache.max_size,
+        "conflict_fallbacks": system.conflict_fallbacks,
+        "state": state_buffer.getvalue()
+    }
+
+def restore_system(snapshot: dict, trajectory_writer=None) -> System:
+    # The ID counters are set back to those of the snapshot, so that the restored run continues exactly as the original
+    if snapshot["version"] != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {snapshot['version']}!")
+    map = _load_map(snapshot["map"])
+    tasks = [_load_task(row) for row in snapshot["tasks"].tolist()]
+    tasks_by_id = {task.id: task for task in tasks}
+    state = _TaskUnpickler(io.BytesIO(snapshot["state"]), tasks_by_id).load()
+    Task._id_counter = snapshot["task_id_counter"]
+    for agent_class, id_counter in state["agent_id_counters"].items():
+        agent_class._id_counter = id_counter
+    system = System.from_state(map, state["task_source"], state["agents"], snapshot["timestep"], tasks, planner_state=state["planner_state"],
+                               reservation_horizon=snapshot["reservation_horizon"], path_retention=snapshot["path_retention"],
+                               trajectory_writer=trajectory_writer, search_cache_size=snapshot["search_cache_size"])
+    system.conflict_fallbacks = snapshot.get("conflict_fallbacks", 0)
+    return system
+
+def fork_system(system: System, agent_class: type = None, agent_kwargs: dict = None, trajectory_writer=None) -> System:
+    # Independent copy of a running System, without serialising it. The map and the delivered tasks are shared,
+    # and the agent paths are cloned, so that only the paths that change later are copied.
+    # Given an agent class, every agent is replaced by a new agent of that class with the same id, path and task.
+    # The ID counters stay shared, so tasks released by either system get distinct ids.
+    memo = {}
+    for task in system.tasks:
+        memo[id(task)] = copy(task) if task.id in system.active_tasks else task
+    tasks = [memo[id(task)] for task in system.tasks]
+    agents = []
+    for agent in system.agents:
+        if agent_class is None:
+            forked_agent = copy(agent)
+        else:
+            forked_agent = agent_class(agent.state, **(agent_kwargs or {}))
+            forked_agent.id = agent.id
+        forked_agent.path = agent.path.clone()
+        forked_agent.task = memo.get(id(agent.task), agent.task)
+        agents.append(forked_agent)
+    # Another agent class starts without the shared state of the previous one
+    planner_state = deepcopy(system.planner_state, memo) if agent_class is None else {}
+    task_source = deepcopy(system.task_source, memo)
+    forked_system = System.from_state(system.map, task_source, agents, system.timestep, tasks, planner_state=planner_state,
+                                      reservation_horizon=system.reservations.horizon, path_retention=system.path_retention,
+                                      trajectory_writer=trajectory_writer, search_cache_size=system.search_cache.max_size)
+    forked_system.conflict_fallbacks = system.conflict_fallbacks
+    return forked_system
+
+def save_checkpoint(system: System, file_path: str):
+    with open(file_path, "wb") as checkpoint_file:
+        pickle.dump(snapshot_system(system), checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+def load_checkpoint(file_path: str, trajectory_writer=None) -> System:
+    with open(file_path, "rb") as checkpoint_file:
+        snapshot = pickle.load(checkpoint_file)
+    return restore_system(snapshot, trajectory_writer)
+
+def _get_task_table(tasks: list[Task]) -> np.ndarray:
+    rows = [[task.id, task.add_time, task.pickup_time, task.delivery_time, task.assigned_agent, task.has_been_picked_up,
+             task.pickup_node.x_coord, task.pickup_node.y_coord, task.delivery_node.x_coord, task.delivery_node.y_coord] for task in tasks]
+    rows = [[-1 if value is None else int(value) for value in row] for row in rows]
+    return np.array(rows, dtype=np.int64).reshape(-1, len(CHECKPOINT_TASK_FIELDS))
+
+def _load_task(row: list[int]) -> Task:
+    task_id, add_time, pickup_time, delivery_time, assigned_agent, has_been_picked_up, pickup_x, pickup_y, delivery_x, delivery_y = row
+    task = Task(pickup_node=Node(pickup_x, pickup_y), delivery_node=Node(delivery_x, delivery_y), add_time=add_time)
+    task.id = task_id
+    task.pickup_time = None if pickup_time < 0 else pickup_time
+    task.delivery_time = None if delivery_time < 0 else delivery_time
+    task.assigned_agent = None if assigned_agent < 0 else assigned_agent
+    task.has_been_picked_up = bool(has_been_picked_up)
+    return task
+
+def _load_map(grid: np.ndarray) -> Map:
+    map = Map(width=grid.shape[1], height=grid.shape[0])
+    map.grid[:] = grid
+    map.refresh()
+    return map
@@ -0,0 +1,114 @@
+import json
+import os
+
+import numpy as np
+
+from app.components.task.task import Task
+
+__all__ = ["Recorder", "RECORDING_META_FILE", "RECORDING_MAP_FILE", "TASK_RECORD_FIELDS", "get_state_chunk_file", "get_task_chunk_file"]
+
+RECORDING_VERSION = 2
+RECORDING_META_FILE = "meta.json"
+RECORDING_MAP_FILE = "map.npy"
+# Columns of the task chunks - times and the assigned agent are -1 while unset. picked_up_timestep is the first
+# recorded timestep at which the task counted as picked up, which can be later than a pickup_time planned in the past.
+TASK_RECORD_FIELDS = ["id", "add_time", "pickup_time", "delivery_time", "assigned_agent", "picked_up_timestep", "pickup_x", "pickup_y", "delivery_x", "delivery_y"]
+
+def get_state_chunk_file(chunk_index: int) -> str:
+    return f"states_{chunk_index:06d}.npy"
+
+def get_task_chunk_file(chunk_index: int) -> str:
+    return f"tasks_{chunk_index:06d}.npy"
+
+class Recorder:
+
+    # Records a simulation into a directory of .npy chunks:
+    # - states_*.npy: (chunk_size, num_agents, 3) int32 arrays of the (x, y, rot) of every agent at every timestep
+    # - tasks_*.npy: (n, len(TASK_RECORD_FIELDS)) int64 rows, one per task in order of add_time, written once the task has
+    #   been delivered - meta.json holds the first add time and the last delivery time (-1 if any is unset) of every chunk
+    # - map.npy: the status grid, and meta.json: the layout, rewritten with every chunk so that partial recordings can be read
+
+    def __init__(self, directory: str, chunk_size: int = 1024):
+        if chunk_size < 1:
+            raise ValueError("Chunks must hold at least 1 timestep!")
+        self.directory: str = directory
+        self.chunk_size: int = chunk_size
+        self.num_timesteps: int = 0
+        self.__agent_ids: list[int] | None = None
+        self.__states: np.ndarray | None = None
+        self.__num_state_chunks: int = 0
+        self.__num_task_chunks: int = 0
+        self.__task_chunk_ranges: list[tuple[int, int]] = []
+        self.__active_tasks: dict[int, Task] = {}
+        self.__picked_up_timesteps: dict[int, int] = {}
+        self.__finished_tasks: list[Task] = []
+        self.__closed: bool = False
+        os.makedirs(directory, exist_ok=True)
+
+    def record(self, system):
+        # Called once per timestep, starting from timestep 0
+        if self.__agent_ids is None:
+            self.__start(system)
+        if system.timestep != self.num_timesteps:
+            raise ValueError(f"Expected timestep {self.num_timesteps} but got {system.timestep}!")
+        row = self.__states[self.num_timesteps % self.chunk_size]
+        for agent_index, agent in enumerate(system.agents):
+            row[agent_index] = agent.path.get_coords(system.timestep)
+        # Tasks leave the active tasks once they are delivered, and never change after that
+        active_tasks = system.active_tasks
+        for task_id in [task_id for task_id in self.__active_tasks if task_id not in active_tasks]:
+            self.__finished_tasks.append(self.__active_tasks.pop(task_id))
+        self.__active_tasks.update(active_tasks)
+        for task_id, task in active_tasks.items():
+            if task.has_been_picked_up and task_id not in self.__picked_up_timesteps:
+                self.__picked_up_timesteps[task_id] = system.timestep
+        self.num_timesteps += 1
+        if self.num_timesteps % self.chunk_size == 0:
+            self.__flush(self.chunk_size, completed=False)
+
+    def close(self, completed: bool = False):
+        # Tasks still active are written as they are now
+        if self.__closed or self.__agent_ids is None:
+            return
+        self.__finished_tasks.extend(self.__active_tasks.values())
+        self.__active_tasks = {}
+        self.__flush(self.num_timesteps % self.chunk_size, completed)
+        self.__closed = True
+
+    def __start(self, system):
+        self.__agent_ids = [agent.id for agent in system.agents]
+        self.__states = np.zeros((self.chunk_size, len(self.__agent_ids), 3), dtype=np.int32)
+        np.save(os.path.join(self.directory, RECORDING_MAP_FILE), system.map.grid)
+
+    def __flush(self, num_rows: int, completed: bool):
+        if num_rows:
+            np.save(os.path.join(self.directory, get_state_chunk_file(self.__num_state_chunks)), self.__states[:num_rows])
+            self.__num_state_chunks += 1
+        if self.__finished_tasks:
+            task_rows = [[-1 if value is None else value for value in self.__get_task_record(task)] for task in self.__finished_tasks]
+            task_rows.sort(key=lambda task_row: (task_row[1], task_row[0]))
+            np.save(os.path.join(self.directory, get_task_chunk_file(self.__num_task_chunks)), np.array(task_rows, dtype=np.int64))
+            delivery_times = [task_row[3] for task_row in task_rows]
+            self.__task_chunk_ranges.append((task_rows[0][1], -1 if min(delivery_times) < 0 else max(delivery_times)))
+            self.__num_task_chunks += 1
+            self.__finished_tasks = []
+        self.__write_meta(completed)
+
+    def __get_task_record(self, task: Task) -> list[int | None]:
+        return [task.id, task.add_time, task.pickup_time, task.delivery_time, task.assigned_agent, self.__picked_up_timesteps.pop(task.id, None),
+                task.pickup_node.x_coord, task.pickup_node.y_coord, task.delivery_node.x_coord, task.delivery_node.y_coord]
+
+    def __write_meta(self, completed: bool):
+        meta = {
+            "version": RECORDING_VERSION,
+            "chunk_size": self.chunk_size,
+            "num_timesteps": self.num_timesteps,
+            "agent_ids": self.__agent_ids,
+            "num_state_chunks": self.__num_state_chunks,
+            "num_task_chunks": self.__num_task_chunks,
+            "task_chunk_ranges": self.__task_chunk_ranges,
+            "task_fields": TASK_RECORD_FIELDS,
+            "completed": completed
+        }
+        with open(os.path.join(self.directory, RECORDING_META_FILE), "w") as meta_file:
+            json.dump(meta, meta_file)
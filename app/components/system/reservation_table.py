@@ -0,0 +1,235 @@
+from collections import deque
+from heapq import heappop, heappush
+
+from app.components.environment.node import Node
+from app.agents.components.agent_path import AgentPath
+
+__all__ = ["ReservationTable"]
+
+class ReservationTable:
+
+    def __init__(self, width: int):
+        # Cells are keyed by their cell id y * width + x, so only nodes within the map can be reserved and queried
+        self.width: int = width
+        # (cell_id, timestep) -> ids of the agents occupying the cell at that timestep
+        self.vertex_reservations: dict[tuple[int, int], set[int]] = {}
+        # (from_cell_id, to_cell_id, timestep) -> ids of the agents moving between the cells into that timestep
+        self.edge_reservations: dict[tuple[int, int, int], set[int]] = {}
+        self.__agent_reservations: dict[int, dict[int, tuple]] = {}
+        # Upper bound on the last reserved timestep - the table is empty after it
+        self.horizon: int = 0
+        # Incremented on every change, and the version of the last change of each timestep
+        self.version: int = 0
+        self.__modified_versions: dict[int, int] = {}
+        # Cell of the last reservation of every agent, where it rests once its path ends, and the agents resting in every cell
+        self.resting_cells: dict[int, int] = {}
+        self.resting_agents: dict[int, set[int]] = {}
+        # Timesteps before the current one have passed. The reservations from the current timestep on are kept as intervals of
+        # consecutive timesteps an agent occupies a cell for: cell_id -> (agent_id, first_timestep) -> last_timestep, with
+        # the (cell_id, first_timestep) of every agent's intervals in time order, and a heap of the last timesteps of the
+        # intervals, whose entries are stale once the interval has changed
+        self.current_timestep: int = 0
+        self.future_intervals: dict[int, dict[tuple[int, int], int]] = {}
+        self.__agent_intervals: dict[int, deque] = {}
+        self.__interval_ends: list[tuple[int, int, int, int]] = []
+        # Notified with on_resting_cell_changed(agent_id, old_cell_id, new_cell_id) whenever an agent's resting cell changes
+        self._listener = None
+
+    def set_listener(self, listener):
+        self._listener = listener
+
+    def reserve_path(self, agent_id: int, path: AgentPath, from_timestep: int = 0):
+        released_reservations = self.__release(agent_id, from_timestep)
+        agent_reservations = self.__agent_reservations.setdefault(agent_id, {})
+        self.version += 1
+        width = self.width
+        timestep = from_timestep
+        prev_cell_id = None
+        interval = None
+        if timestep - 1 in path:
+            prev_x_coord, prev_y_coord, _ = path.get_coords(timestep - 1)
+            prev_cell_id = prev_y_coord * width + prev_x_coord
+        while timestep in path:
+            x_coord, y_coord, _ = path.get_coords(timestep)
+            cell_id = y_coord * width + x_coord
+            vertex_key = (cell_id, timestep)
+            self.vertex_reservations.setdefault(vertex_key, set()).add(agent_id)
+            if timestep >= self.current_timestep:
+                if interval is not None and interval[0] != cell_id:
+                    self.__push_interval_end(agent_id, *interval)
+                    interval = None
+                interval = self.__add_future(agent_id, cell_id, timestep, interval)
+            edge_key = None
+            if prev_cell_id is not None and prev_cell_id != cell_id:
+                edge_key = (prev_cell_id, cell_id, timestep)
+                self.edge_reservations.setdefault(edge_key, set()).add(agent_id)
+            agent_reservations[timestep] = (vertex_key, edge_key)
+            # Reserving the same moves again does not change the table
+            if released_reservations.pop(timestep, None) != (vertex_key, edge_key):
+                self.__modified_versions[timestep] = self.version
+            prev_cell_id = cell_id
+            timestep += 1
+        if interval is not None:
+            self.__push_interval_end(agent_id, *interval)
+        for released_timestep in released_reservations:
+            self.__modified_versions[released_timestep] = self.version
+        self.horizon = max(self.horizon, timestep - 1)
+        self.__update_resting_cell(agent_id)
+
+    def release_path(self, agent_id: int, from_timestep: int = 0):
+        released_reservations = self.__release(agent_id, from_timestep)
+        if released_reservations:
+            self.version += 1
+            for timestep in released_reservations:
+                self.__modified_versions[timestep] = self.version
+            self.__update_resting_cell(agent_id)
+
+    def advance(self, timestep: int):
+        # Moves the current timestep forward, dropping the intervals that end before it
+        interval_ends = self.__interval_ends
+        while interval_ends and interval_ends[0][0] < timestep:
+            last_timestep, cell_id, agent_id, first_timestep = heappop(interval_ends)
+            cell_intervals = self.future_intervals.get(cell_id)
+            if cell_intervals is not None and cell_intervals.get((agent_id, first_timestep)) == last_timestep:
+                # Intervals of an agent end in time order, so this is its first one
+                self.__remove_interval(agent_id, cell_id, first_timestep)
+                self.__agent_intervals[agent_id].popleft()
+        self.current_timestep = max(self.current_timestep, timestep)
+
+    def discard_before(self, timestep: int):
+        # Drops every reservation before the given timestep, which can no longer be queried. The last reservation
+        # of every agent is kept, as it is where the agent rests.
+        for agent_id, agent_reservations in self.__agent_reservations.items():
+            while len(agent_reservations) > 1:
+                reserved_timestep = next(iter(agent_reservations))
+                if reserved_timestep >= timestep:
+                    break
+                vertex_key, edge_key = agent_reservations.pop(reserved_timestep)
+                self.__discard(self.vertex_reservations, vertex_key, agent_id)
+                if edge_key is not None:
+                    self.__discard(self.edge_reservations, edge_key, agent_id)
+                if reserved_timestep >= self.current_timestep:
+                    self.__discard_future_first(agent_id, reserved_timestep)
+        for modified_timestep in [modified_timestep for modified_timestep in self.__modified_versions if modified_timestep < timestep]:
+            del self.__modified_versions[modified_timestep]
+
+    def is_unchanged_since(self, version: int, from_timestep: int, to_timestep: int) -> bool:
+        # Whether no reservation between the timesteps (inclusive) has changed after the given version
+        modified_versions = self.__modified_versions
+        for timestep in range(from_timestep, to_timestep + 1):
+            if modified_versions.get(timestep, 0) > version:
+                return False
+        return True
+
+    def is_vertex_reserved(self, node: Node, timestep: int) -> bool:
+        return (node.y_coord * self.width + node.x_coord, timestep) in self.vertex_reservations
+
+    def is_reserved_from_now(self, node: Node) -> bool:
+        # Whether any agent occupies the node at the current timestep or later
+        return node.y_coord * self.width + node.x_coord in self.future_intervals
+
+    def get_future_intervals(self, node: Node) -> list[tuple[int, int, int]]:
+        # (agent_id, first_timestep, last_timestep) of every run of consecutive timesteps an agent occupies the node for,
+        # from the current timestep on, ordered by first timestep
+        current_timestep = self.current_timestep
+        cell_intervals = self.future_intervals.get(node.y_coord * self.width + node.x_coord, {})
+        intervals = [(agent_id, max(first_timestep, current_timestep), last_timestep) for (agent_id, first_timestep), last_timestep in cell_intervals.items()]
+        intervals.sort(key=lambda interval: (interval[1], interval[0]))
+        return intervals
+
+    def is_edge_reserved(self, from_node: Node, to_node: Node, timestep: int) -> bool:
+        width = self.width
+        return (from_node.y_coord * width + from_node.x_coord, to_node.y_coord * width + to_node.x_coord, timestep) in self.edge_reservations
+
+    def __update_resting_cell(self, agent_id: int):
+        agent_reservations = self.__agent_reservations.get(agent_id)
+        resting_cell = agent_reservations[next(reversed(agent_reservations))][0][0] if agent_reservations else None
+        prev_resting_cell = self.resting_cells.get(agent_id)
+        if resting_cell == prev_resting_cell:
+            return
+        if prev_resting_cell is not None:
+            self.__discard(self.resting_agents, prev_resting_cell, agent_id)
+        if resting_cell is None:
+            del self.resting_cells[agent_id]
+        else:
+            self.resting_cells[agent_id] = resting_cell
+            self.resting_agents.setdefault(resting_cell, set()).add(agent_id)
+        if self._listener is not None:
+            self._listener.on_resting_cell_changed(agent_id, prev_resting_cell, resting_cell)
+
+    def __release(self, agent_id: int, from_timestep: int) -> dict[int, tuple]:
+        released_reservations = {}
+        agent_reservations = self.__agent_reservations.get(agent_id)
+        if not agent_reservations:
+            return released_reservations
+        # Reserved timesteps are contiguous and kept in ascending insertion order
+        timestep = max(from_timestep, next(iter(agent_reservations)))
+        while timestep in agent_reservations:
+            vertex_key, edge_key = agent_reservations.pop(timestep)
+            self.__discard(self.vertex_reservations, vertex_key, agent_id)
+            if edge_key is not None:
+                self.__discard(self.edge_reservations, edge_key, agent_id)
+            released_reservations[timestep] = (vertex_key, edge_key)
+            timestep += 1
+        if released_reservations:
+            self.__release_future(agent_id, max(from_timestep, self.current_timestep))
+        return released_reservations
+
+    def __discard(self, reservations: dict, key: tuple, agent_id: int):
+        agent_ids = reservations.get(key)
+        if agent_ids is None:
+            return
+        agent_ids.discard(agent_id)
+        if not agent_ids:
+            del reservations[key]
+
+    def __add_future(self, agent_id: int, cell_id: int, timestep: int, interval: tuple[int, int] | None) -> tuple[int, int]:
+        # Extends the open (cell_id, first_timestep) interval, or the agent's last interval when it ends in the cell just
+        # before the timestep, and otherwise starts a new one
+        if interval is None:
+            agent_intervals = self.__agent_intervals.get(agent_id)
+            if agent_intervals:
+                last_cell_id, first_timestep = agent_intervals[-1]
+                if last_cell_id == cell_id and self.future_intervals[cell_id][(agent_id, first_timestep)] == timestep - 1:
+                    interval = (cell_id, first_timestep)
+        if interval is None:
+            interval = (cell_id, timestep)
+            self.__agent_intervals.setdefault(agent_id, deque()).append(interval)
+        self.future_intervals.setdefault(cell_id, {})[(agent_id, interval[1])] = timestep
+        return interval
+
+    def __release_future(self, agent_id: int, timestep: int):
+        # Cuts the agent's intervals short before the timestep
+        agent_intervals = self.__agent_intervals.get(agent_id)
+        while agent_intervals:
+            cell_id, first_timestep = agent_intervals[-1]
+            if first_timestep < timestep:
+                if self.future_intervals[cell_id][(agent_id, first_timestep)] >= timestep:
+                    if timestep - 1 >= self.current_timestep:
+                        self.future_intervals[cell_id][(agent_id, first_timestep)] = timestep - 1
+                        self.__push_interval_end(agent_id, cell_id, first_timestep)
+                        break
+                else:
+                    break
+            self.__remove_interval(agent_id, cell_id, first_timestep)
+            agent_intervals.pop()
+
+    def __discard_future_first(self, agent_id: int, timestep: int):
+        # Removes the timestep from the start of the agent's first interval
+        agent_intervals = self.__agent_intervals[agent_id]
+        cell_id, first_timestep = agent_intervals.popleft()
+        last_timestep = self.__remove_interval(agent_id, cell_id, first_timestep)
+        if last_timestep > timestep:
+            self.future_intervals.setdefault(cell_id, {})[(agent_id, timestep + 1)] = last_timestep
+            agent_intervals.appendleft((cell_id, timestep + 1))
+            self.__push_interval_end(agent_id, cell_id, timestep + 1)
+
+    def __remove_interval(self, agent_id: int, cell_id: int, first_timestep: int) -> int:
+        cell_intervals = self.future_intervals[cell_id]
+        last_timestep = cell_intervals.pop((agent_id, first_timestep))
+        if not cell_intervals:
+            del self.future_intervals[cell_id]
+        return last_timestep
+
+    def __push_interval_end(self, agent_id: int, cell_id: int, first_timestep: int):
+        heappush(self.__interval_ends, (self.future_intervals[cell_id][(agent_id, first_timestep)], cell_id, agent_id, first_timestep))
@@ -0,0 +1,46 @@
+from collections import OrderedDict
+
+from app.agents.components.agent_path import AgentPath
+from app.components.system.reservation_table import ReservationTable
+
+__all__ = ["SearchCache"]
+
+class SearchCache:
+
+    # Bounded LRU cache of search results. An entry records the reservation version it was computed at and the
+    # timesteps whose reservations the search checked, and is only returned while none of them has changed since.
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self.__entries: OrderedDict[tuple, tuple] = OrderedDict()
+
+    def get(self, key: tuple, reservations: ReservationTable) -> tuple[AgentPath | None, bool] | None:
+        # Returns the cached (path, used conflict fallback) pair, or None on a miss
+        entry = self.__entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        version, from_timestep, to_timestep, result = entry
+        if not reservations.is_unchanged_since(version, from_timestep, to_timestep):
+            del self.__entries[key]
+            self.misses += 1
+            return None
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: tuple, version: int, from_timestep: int, to_timestep: int, path: AgentPath | None, conflict_fallback: bool):
+        if self.max_size <= 0:
+            return
+        self.__entries[key] = (version, from_timestep, to_timestep, (path, conflict_fallback))
+        self.__entries.move_to_end(key)
+        if len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+
+    def clear(self):
+        self.__entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
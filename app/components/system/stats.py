@@ -0,0 +1,77 @@
+__all__ = ["Stats", "SEARCH_RECORD_FIELDS"]
+
+# Columns of Stats.searches, one row per A_Star_Search.search - the time is in seconds
+SEARCH_RECORD_FIELDS = ["timestep", "time", "expansions", "generated", "collision_checks", "path_length", "cached"]
+
+class Stats:
+
+    # Timings and counters of every timestep, collected while System.stats is set. The planners only check
+    # whether it is set, so nothing is measured or stored while it is None.
+    # Metrics ending in "_time" are in seconds, those ending in "_max" keep the maximum of the timestep
+    # and every other metric is a total of the timestep.
+
+    def __init__(self):
+        # timestep -> metric -> value
+        self.timesteps: dict[int, dict[str, float]] = {}
+        self.searches: list[tuple] = []
+        self.timestep: int = 0
+        self.__current: dict[str, float] = self.timesteps.setdefault(0, {})
+        # Nesting depth of every section entered but not left yet
+        self.__depths: dict[str, int] = {}
+
+    def start_timestep(self, timestep: int):
+        self.timestep = timestep
+        self.__current = self.timesteps.setdefault(timestep, {})
+
+    def add(self, metric: str, value: float = 1):
+        current = self.__current
+        current[metric] = current.get(metric, 0) + value
+
+    def set_max(self, metric: str, value: float):
+        current = self.__current
+        if metric not in current or value > current[metric]:
+            current[metric] = value
+
+    def enter(self, section: str):
+        # Counts the section, and the deepest it was nested within itself as "<section>_depth_max"
+        depth = self.__depths.get(section, 0) + 1
+        self.__depths[section] = depth
+        self.add(section)
+        self.set_max(f"{section}_depth_max", depth)
+
+    def leave(self, section: str):
+        self.__depths[section] -= 1
+
+    def add_search(self, time: float, expansions: int, generated: int, collision_checks: int, path_length: int, cached: bool):
+        self.searches.append((self.timestep, time, expansions, generated, collision_checks, path_length, cached))
+        self.add("searches")
+        self.add("search_time", time)
+        self.set_max("search_time_max", time)
+        self.add("expansions", expansions)
+        self.add("generated", generated)
+        self.add("collision_checks", collision_checks)
+        self.add("path_length", path_length)
+        if cached:
+            self.add("search_cache_hits")
+
+    def get_timestep(self, timestep: int) -> dict[str, float]:
+        return dict(self.timesteps.get(timestep, {}))
+
+    def get_series(self, metric: str) -> list[float]:
+        # Value of the metric at every recorded timestep, 0 where it was not recorded
+        return [values.get(metric, 0) for _, values in sorted(self.timesteps.items())]
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        # metric -> total over the run (maximum for "_max" metrics), mean and maximum per timestep. The means are over the
+        # timesteps anything was recorded at, leaving out e.g. the empty timestep 0 of stats enabled before the first iteration
+        num_timesteps = max(1, sum(1 for values in self.timesteps.values() if values))
+        metrics = sorted({metric for values in self.timesteps.values() for metric in values})
+        summary = {}
+        for metric in metrics:
+            series = self.get_series(metric)
+            summary[metric] = {
+                "total": max(series) if metric.endswith("_max") else sum(series),
+                "mean": sum(series) / num_timesteps,
+                "max": max(series)
+            }
+        return summary
@@ -1,112 +1,311 @@
+from heapq import heappop, heappush
+from time import perf_counter
+
 from app.components.environment.map import Map
 from app.components.environment.node import Node
+from app.components.environment.spatial_index import SpatialIndex
 from app.components.task.task import Task
+from app.components.task.task_source import TaskSourceInterface, TaskListSource
 from app.agents.components.agent_path import AgentPath
+from app.agents.components.agent_state import AgentState
+from app.components.system.reservation_table import ReservationTable
+from app.components.system.search_cache import SearchCache
+from app.components.system.trajectory_writer import TrajectoryWriter
+from app.components.system.recorder import Recorder
+from app.components.system.stats import Stats
 
 class System():
 
-    def __init__(self, map: Map, tasks: list[Task], agents):
+    def __init__(self, map: Map, tasks: list[Task] | TaskSourceInterface, agents, path_retention: int = None, trajectory_writer: TrajectoryWriter = None, search_cache_size: int = 1024, recorder: Recorder = None):
+        self.__setup(map, tasks, path_retention, trajectory_writer, search_cache_size, recorder)
+        self.agents: list = self.__generate_paths(agents)
+        self.__initialize_system()
+
+    @classmethod
+    def from_state(cls, map: Map, tasks: TaskSourceInterface, agents, timestep: int, released_tasks: list[Task], planner_state: dict = None, reservation_horizon: int = 0, path_retention: int = None, trajectory_writer: TrajectoryWriter = None, search_cache_size: int = 1024) -> "System":
+        # Rebuilds a System part way through a run, from agents that already hold their paths and every task released
+        # so far, e.g. when restoring a checkpoint. Nothing is pulled from the task source and nothing is recorded.
+        system = cls.__new__(cls)
+        system.__setup(map, tasks, path_retention, trajectory_writer, search_cache_size, None)
+        system.timestep = timestep
+        system.reservations.advance(timestep)
+        system.planner_state = planner_state if planner_state is not None else {}
+        for agent in agents:
+            system.__agents_by_id[agent.id] = agent
+            # Searches never look before the current timestep, so the history is not reserved again, but the last state always is
+            agent_path = agent.path
+            agent_path.map = map
+            system.reservations.reserve_path(agent.id, agent_path, min(max(agent_path.start_timestep, timestep), agent_path.end_timestep))
+        system.reservations.horizon = max(system.reservations.horizon, reservation_horizon)
+        system.agents = agents
+        system.tasks = released_tasks
+        for task in released_tasks:
+            # Tasks are completed once the timestep of their delivery has been checked
+            if task.delivery_time is None or task.delivery_time > timestep:
+                system.__activate_task(task)
+        # Tasks being executed have been marked as picked up already
+        system.__newly_executing_tasks = []
+        return system
+
+    def __setup(self, map: Map, tasks: list[Task] | TaskSourceInterface, path_retention: int | None, trajectory_writer: TrajectoryWriter | None, search_cache_size: int, recorder: Recorder | None):
+        if path_retention is not None and path_retention < 0:
+            raise ValueError("Path retention must not be negative!")
         self.map: Map = map
-        self.tasks: list[Task] = tasks
+        # Tasks are pulled from the source as they are released, and only released tasks are kept in self.tasks
+        self.task_source: TaskSourceInterface = tasks if isinstance(tasks, TaskSourceInterface) else TaskListSource(tasks)
+        self.tasks: list[Task] = []
         self.timestep: int = 0
         self.active_tasks: dict[int, Task] = {}
-        self.agents: list = self.__generate_paths(agents)
-        self.__initialize_system()
+        self.reservations: ReservationTable = ReservationTable(map.width)
+        # Shared by every search, so that repeated searches against unchanged reservations are not run again
+        self.search_cache: SearchCache = SearchCache(search_cache_size)
+        # Number of past timesteps kept in the agent paths and reservations - None keeps the whole history
+        self.path_retention: int | None = path_retention
+        # Receives the committed states as they are dropped from the agent paths
+        self.trajectory_writer: TrajectoryWriter | None = trajectory_writer
+        # Receives the agent states and tasks of every timestep, for replays
+        self.recorder: Recorder | None = recorder
+        # Timings and counters of every timestep - None while disabled, see enable_stats
+        self.stats: Stats | None = None
+        # Searches that found no conflict-free path, see A_Star_Search
+        self.conflict_fallbacks: int = 0
+        # State the agents share across timesteps, e.g. the assignments of Agent_Central, keyed by the agent class
+        self.planner_state: dict = {}
+        # Indexes kept up to date as tasks are released, assigned, picked up and delivered
+        self.__agents_by_id: dict[int, object] = {}
+        self.__pickup_queue: list[tuple[int, int]] = []
+        self.__delivery_queue: list[tuple[int, int]] = []
+        # Tasks by the cell of their pickup node, for nearest task queries
+        self.__unassigned_tasks: SpatialIndex = SpatialIndex()
+        self.__unexecuted_tasks: SpatialIndex = SpatialIndex()
+        self.__executing_tasks: dict[int, Task] = {}
+        self.__newly_executing_tasks: list[Task] = []
+        # cell_id -> number of pickup and delivery nodes of the active tasks in the cell
+        self.__task_cells: dict[int, int] = {}
+        # Non-task endpoints no agent rests at, ordered as in the map, kept current from the resting cells of the reservations
+        self.__non_task_endpoint_orders: dict[int, int] = {}
+        self.__free_non_task_endpoints: SpatialIndex = SpatialIndex()
+        for order, endpoint in enumerate(map.get_non_task_endpoints()):
+            endpoint_cell_id = map.cell_id(endpoint.x_coord, endpoint.y_coord)
+            self.__non_task_endpoint_orders[endpoint_cell_id] = order
+            self.__free_non_task_endpoints.add(endpoint_cell_id, endpoint, endpoint.x_coord, endpoint.y_coord, order)
+        self.reservations.set_listener(self)
 
     def iterate(self) -> "System":
         self.timestep += 1
+        self.reservations.advance(self.timestep)
+        if self.stats is not None:
+            return self.__iterate_with_stats(self.stats)
+        self.__check_pickups(self.timestep)
         self.__check_agent_paths()
         self.__check_tasks(self.timestep)
+        if self.recorder is not None:
+            self.recorder.record(self)
+        if self.path_retention is not None:
+            self.__discard_history(self.timestep - self.path_retention)
         return self
+
+    def enable_stats(self) -> Stats:
+        # Starts collecting timings and counters from the next timestep, see Stats
+        if self.stats is None:
+            self.stats = Stats()
+        return self.stats
+
+    def disable_stats(self):
+        self.stats = None
+
+    def is_completed(self) -> bool:
+        # Every task the source will ever release has been delivered
+        return not self.active_tasks and self.task_source.is_exhausted()
+
+    def close(self):
+        # Streams out the committed history still held in memory - call once the simulation has finished
+        if self.recorder is not None:
+            self.recorder.close(self.is_completed())
+        if self.trajectory_writer is None:
+            return
+        for agent in self.agents:
+            self.trajectory_writer.write_path(agent.id, agent.path, self.timestep + 1)
+        self.trajectory_writer.close()
     
     def get_agent(self, agent_id: int):
-        for agent in self.agents:
-            if agent.id == agent_id:
-                return agent
-        return None
+        return self.__agents_by_id.get(agent_id)
     
     def get_not_assigned_tasks(self) -> list[Task]:
-        not_assigned_tasks = []
-        for task in self.active_tasks.values():
-            if task.assigned_agent is None:
-                not_assigned_tasks.append(task)
-        return not_assigned_tasks
+        return list(self.__unassigned_tasks.values())
     
     def get_available_tasks(self) -> list[Task]:
-        available_tasks = []
-        for task in self.active_tasks.values():
-            if not task.assigned_agent or task.pickup_time > self.timestep:
-                available_tasks.append(task)
-        return available_tasks
+        return list(self.__unexecuted_tasks.values())
     
     def get_executed_tasks(self) -> list[Task]:
-        executed_tasks = []
-        for task in self.active_tasks.values():
-            if task.assigned_agent and task.pickup_time <= self.timestep:
-                executed_tasks.append(task)
-        return executed_tasks
+        return list(self.__executing_tasks.values())
     
     def get_unexecuted_tasks(self) -> list[Task]:
-        unexecuted_tasks = []
-        for task in self.active_tasks.values():
-            if task.assigned_agent == None or task.pickup_time > self.timestep:
-                unexecuted_tasks.append(task)
-        return unexecuted_tasks
+        return list(self.__unexecuted_tasks.values())
+
+    def on_task_updated(self, task: Task):
+        # Called by an active task whenever its assignment, pickup time or delivery time changes
+        task_id = task.id
+        if task.assigned_agent is None:
+            self.__unassigned_tasks.add(task_id, task, task.pickup_node.x_coord, task.pickup_node.y_coord)
+        else:
+            self.__unassigned_tasks.pop(task_id, None)
+        if task.assigned_agent is not None and task.pickup_time is not None and task.pickup_time <= self.timestep:
+            self.__set_executing(task)
+        else:
+            self.__executing_tasks.pop(task_id, None)
+            self.__unexecuted_tasks.add(task_id, task, task.pickup_node.x_coord, task.pickup_node.y_coord)
+            if task.pickup_time is not None:
+                heappush(self.__pickup_queue, (task.pickup_time, task_id))
+        if task.delivery_time is not None:
+            heappush(self.__delivery_queue, (task.delivery_time, task_id))
     
     def check_is_task_loc(self, node: Node) -> bool:
-        for _, task in self.active_tasks.items():
-            if task.delivery_node == node or task.pickup_node == node:
-                return True
-        return False
+        return self.map.cell_id(node.x_coord, node.y_coord) in self.__task_cells
     
     def check_in_other_agent_path(self, node: Node) -> bool:
-        for agent in self.agents:
-            agent_path = agent.path
-            len_timestep = len(agent_path.path)
-            for timestep in range(self.timestep, len_timestep):
-                if node == agent_path.path[timestep].node:
-                    return True
-        return False
+        # Every path is reserved from the current timestep on as soon as it is planned
+        return self.reservations.is_reserved_from_now(node)
+
+    def get_cell_occupancy(self, node: Node) -> tuple[list[tuple[int, int, int]], set[int], int]:
+        # (agent_id, first_timestep, last_timestep) intervals the node is reserved for from the current timestep on, the agents
+        # resting at it once their paths end and the number of active tasks using it
+        cell_id = self.map.cell_id(node.x_coord, node.y_coord)
+        return self.reservations.get_future_intervals(node), set(self.reservations.resting_agents.get(cell_id, ())), self.__task_cells.get(cell_id, 0)
     
     def get_free_non_task_endpoints(self) -> list[Node]:
-        non_task_endpoints = self.map.get_non_task_endpoints()
-        agent_last_nodes = self.__get_agent_last_nodes()
-        free_non_task_endpoints = [endpoint for endpoint in non_task_endpoints if endpoint not in agent_last_nodes]
-        return free_non_task_endpoints
+        # Non-task endpoints no agent rests at once its path ends
+        cell_id = self.map.cell_id
+        resting_agents = self.reservations.resting_agents
+        return [endpoint for endpoint in self.map.get_non_task_endpoints() if cell_id(endpoint.x_coord, endpoint.y_coord) not in resting_agents]
+
+    def get_nearest_not_assigned_tasks(self, agent_state: AgentState, k: int = 1, exclude: set[int] = ()) -> list[Task]:
+        # The k unassigned tasks whose id is not excluded with the shortest travel time to their pickup, ties going to the
+        # earliest in get_not_assigned_tasks
+        distance_oracle = self.map.distance_oracle
+        return self.__unassigned_tasks.nearest(agent_state.node.x_coord, agent_state.node.y_coord, lambda task: distance_oracle.distance(agent_state, task.pickup_node), k, exclude)
+
+    def get_nearest_available_tasks(self, agent_state: AgentState, k: int = 1, exclude: set[int] = ()) -> list[Task]:
+        # As get_nearest_not_assigned_tasks, over the tasks of get_available_tasks whose id is not excluded
+        distance_oracle = self.map.distance_oracle
+        return self.__unexecuted_tasks.nearest(agent_state.node.x_coord, agent_state.node.y_coord, lambda task: distance_oracle.distance(agent_state, task.pickup_node), k, exclude)
+
+    def get_nearest_free_non_task_endpoints(self, agent_state: AgentState, k: int = 1) -> list[Node]:
+        # The k endpoints of get_free_non_task_endpoints with the shortest travel time, ties going to the earliest
+        distance_oracle = self.map.distance_oracle
+        return self.__free_non_task_endpoints.nearest(agent_state.node.x_coord, agent_state.node.y_coord, lambda endpoint: distance_oracle.distance(agent_state, endpoint), k)
+
+    def on_resting_cell_changed(self, agent_id: int, prev_cell_id: int | None, cell_id: int | None):
+        # Called by the reservations whenever the cell an agent rests at once its path ends changes
+        if cell_id is not None:
+            self.__free_non_task_endpoints.pop(cell_id)
+        if prev_cell_id is not None and prev_cell_id in self.__non_task_endpoint_orders and prev_cell_id not in self.reservations.resting_agents:
+            endpoint = self.map.get_node_by_id(prev_cell_id)
+            self.__free_non_task_endpoints.add(prev_cell_id, endpoint, endpoint.x_coord, endpoint.y_coord, self.__non_task_endpoint_orders[prev_cell_id])
+
+    def __iterate_with_stats(self, stats: Stats) -> "System":
+        # Same phases as iterate, each timed
+        stats.start_timestep(self.timestep)
+        start_time = perf_counter()
+        self.__check_pickups(self.timestep)
+        pickups_time = perf_counter()
+        self.__check_agent_paths()
+        moves_time = perf_counter()
+        self.__check_tasks(self.timestep)
+        tasks_time = perf_counter()
+        if self.recorder is not None:
+            self.recorder.record(self)
+        record_time = perf_counter()
+        if self.path_retention is not None:
+            self.__discard_history(self.timestep - self.path_retention)
+        end_time = perf_counter()
+        stats.add("check_pickups_time", pickups_time - start_time)
+        stats.add("agent_moves_time", moves_time - pickups_time)
+        stats.add("check_tasks_time", tasks_time - moves_time)
+        stats.add("record_time", record_time - tasks_time)
+        stats.add("discard_history_time", end_time - record_time)
+        stats.add("iterate_time", end_time - start_time)
+        stats.add("active_tasks", len(self.active_tasks))
+        return self
 
-    def __get_agent_last_nodes(self) -> list[Node]:
-        last_nodes = []
+    def __discard_history(self, timestep: int):
+        # Planners only read from the previous timestep onwards and the GUI from the current one
         for agent in self.agents:
-            agent_path = agent.path
-            last_node = agent_path.path[max(agent_path.path.keys())].node
-            last_nodes.append(last_node)
-        return last_nodes
+            # The last state is always kept, as it is where the agent rests
+            agent_timestep = min(timestep, agent.path.end_timestep)
+            if agent.path.start_timestep >= agent_timestep:
+                continue
+            if self.trajectory_writer is not None:
+                self.trajectory_writer.write_path(agent.id, agent.path, agent_timestep)
+            agent.path.discard_before(agent_timestep)
+        self.reservations.discard_before(timestep)
 
     def __check_agent_paths(self):
         for agent in self.agents:
             agent.move(self)
     
     def __check_tasks(self, next_timestep: int):
-        for task_id in range(len(self.tasks)):
-            curr_task = self.tasks[task_id]
-            if next_timestep == curr_task.add_time:
-                self.active_tasks[task_id] = curr_task
-        completed_tasks = []
-        for task_id, task in self.active_tasks.items():
-            if next_timestep == task.pickup_time:
-                task.has_been_picked_up = True
-            if next_timestep == task.delivery_time:
-                completed_tasks.append(task_id)
-        for task_id in completed_tasks:
-            del self.active_tasks[task_id]
+        for task in self.task_source.get_tasks(next_timestep):
+            self.tasks.append(task)
+            self.__activate_task(task)
+        for task in self.__newly_executing_tasks:
+            task.has_been_picked_up = True
+        self.__newly_executing_tasks = []
+        while self.__delivery_queue and self.__delivery_queue[0][0] <= next_timestep:
+            delivery_time, task_id = heappop(self.__delivery_queue)
+            task = self.active_tasks.get(task_id)
+            # Entries are left behind when a task is replanned, so only the current delivery time counts
+            if task is not None and task.delivery_time == delivery_time:
+                self.__complete_task(task_id, task)
+
+    def __check_pickups(self, timestep: int):
+        while self.__pickup_queue and self.__pickup_queue[0][0] <= timestep:
+            pickup_time, task_id = heappop(self.__pickup_queue)
+            task = self.active_tasks.get(task_id)
+            if task is not None and task.pickup_time == pickup_time and task.assigned_agent is not None:
+                self.__set_executing(task)
+
+    def __set_executing(self, task: Task):
+        if task.id not in self.__executing_tasks:
+            self.__unexecuted_tasks.pop(task.id, None)
+            self.__executing_tasks[task.id] = task
+            self.__newly_executing_tasks.append(task)
+
+    def __activate_task(self, task: Task):
+        self.active_tasks[task.id] = task
+        task.set_listener(self)
+        self.on_task_updated(task)
+        for cell_id in self.__get_task_cells(task):
+            self.__task_cells[cell_id] = self.__task_cells.get(cell_id, 0) + 1
+
+    def __complete_task(self, task_id: int, task: Task):
+        del self.active_tasks[task_id]
+        task.set_listener(None)
+        self.__unassigned_tasks.pop(task_id, None)
+        self.__unexecuted_tasks.pop(task_id, None)
+        self.__executing_tasks.pop(task_id, None)
+        for cell_id in self.__get_task_cells(task):
+            count = self.__task_cells[cell_id] - 1
+            if count:
+                self.__task_cells[cell_id] = count
+            else:
+                del self.__task_cells[cell_id]
+
+    def __get_task_cells(self, task: Task) -> tuple[int, int]:
+        cell_id = self.map.cell_id
+        return cell_id(task.pickup_node.x_coord, task.pickup_node.y_coord), cell_id(task.delivery_node.x_coord, task.delivery_node.y_coord)
     
     def __generate_paths(self, agents) -> list:
         for i in range(len(agents)):
             agent_start_state = agents[i].state
-            agent_start_path = AgentPath()
+            agent_start_path = AgentPath(map=self.map)
             agent_start_path.path[0] = agent_start_state
             agents[i].path = agent_start_path
+            self.__agents_by_id[agents[i].id] = agents[i]
+            self.reservations.reserve_path(agents[i].id, agent_start_path)
         return agents
 
     def __initialize_system(self):
         self.__check_tasks(next_timestep=0)
+        if self.recorder is not None:
+            self.recorder.record(self)
@@ -0,0 +1,27 @@
+from app.agents.components.agent_path import AgentPath
+
+__all__ = ["TrajectoryWriter"]
+
+class TrajectoryWriter:
+
+    # Append-only CSV of committed agent states, one "timestep,agent_id,x,y,rot" row per agent per timestep
+
+    HEADER = "timestep,agent_id,x,y,rot\n"
+
+    def __init__(self, file_path: str):
+        self.file_path: str = file_path
+        self.__file = open(file_path, "a")
+        if self.__file.tell() == 0:
+            self.__file.write(self.HEADER)
+
+    def write_path(self, agent_id: int, agent_path: AgentPath, end_timestep: int):
+        # Writes the states of the path before end_timestep
+        rows = []
+        for timestep in range(agent_path.start_timestep, min(end_timestep, agent_path.end_timestep + 1)):
+            x_coord, y_coord, rot = agent_path.get_coords(timestep)
+            rows.append(f"{timestep},{agent_id},{x_coord},{y_coord},{rot}\n")
+        self.__file.writelines(rows)
+
+    def close(self):
+        if not self.__file.closed:
+            self.__file.close()
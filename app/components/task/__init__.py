@@ -1 +1,2 @@
 from .task import *
+from .task_source import *
@@ -5,6 +5,8 @@ class Task:
     # Class attribute to keep track of the Task IDs
     _id_counter = 0
 
+    __slots__ = ("id", "pickup_node", "delivery_node", "add_time", "pickup_time", "delivery_time", "assigned_agent", "has_been_picked_up", "_listener")
+
     def __init__(self, pickup_node: Node, delivery_node: Node, add_time: int):
         self.id: int = self._assign_task_id()
         self.pickup_node: Node = pickup_node
@@ -14,23 +16,46 @@ class Task:
         self.delivery_time: int | None = None
         self.assigned_agent: int | None = None
         self.has_been_picked_up: bool = False
+        # Notified of every change so that System can keep its task indexes current
+        self._listener = None
 
     def pickup(self, pickup_time: int, agent_id: int) -> "Task":
         if self.assigned_agent != agent_id:
             raise ValueError(f"Agent {agent_id} is not the assigned agent for task {self.id}")
         self.pickup_time = pickup_time
+        self.__notify()
         return self
     
     def deliver(self, delivery_time: int, agent_id: int) -> "Task":
         if self.assigned_agent != agent_id:
             raise ValueError(f"Agent {agent_id} is not the assigned agent for task {self.id}")
         self.delivery_time = delivery_time
+        self.__notify()
         return self
     
     def assign(self, agent_id: int) -> "Task":
         self.assigned_agent = agent_id
+        self.__notify()
+        return self
+
+    def unassign(self) -> "Task":
+        self.assigned_agent = None
+        self.pickup_time = None
+        self.delivery_time = None
+        self.__notify()
         return self
     
+    def set_listener(self, listener):
+        self._listener = listener
+
+    def __notify(self):
+        if self._listener is not None:
+            self._listener.on_task_updated(self)
+
+    @classmethod
+    def reset_id_counter(cls):
+        cls._id_counter = 0
+
     def _assign_task_id(self):
         curr_id = Task._id_counter
         Task._id_counter += 1
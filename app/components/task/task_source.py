@@ -0,0 +1,207 @@
+import csv
+import json
+from abc import ABC, abstractmethod
+from heapq import heappop, heappush
+from math import ceil, exp
+from random import Random
+
+from app.components.environment.node import Node
+from app.components.environment.map import Map
+from app.components.task.task import Task
+
+__all__ = ["TaskSourceInterface", "TaskListSource", "RandomTaskSource", "ReplayTaskSource", "QueueTaskSource", "TASK_FILE_FIELDS"]
+
+# Columns of a replay file, in CSV or JSON lines format, one task per row in order of add_time
+TASK_FILE_FIELDS = ["add_time", "pickup_x", "pickup_y", "delivery_x", "delivery_y"]
+
+class TaskSourceInterface(ABC):
+
+    # Supplies tasks to System one timestep at a time, so that only released tasks exist in memory
+
+    @abstractmethod
+    def get_tasks(self, timestep: int) -> list[Task]:
+        # Tasks released at or before the timestep that have not been returned yet, in order of release
+        pass
+
+    @abstractmethod
+    def is_exhausted(self) -> bool:
+        # Whether no further tasks will ever be returned
+        pass
+
+class TaskListSource(TaskSourceInterface):
+
+    def __init__(self, tasks: list[Task]):
+        self.__tasks: list[Task] = sorted(tasks, key=lambda task: (task.add_time, task.id))
+        self.__next_index: int = 0
+
+    def get_tasks(self, timestep: int) -> list[Task]:
+        released_tasks = []
+        while self.__next_index < len(self.__tasks) and self.__tasks[self.__next_index].add_time <= timestep:
+            released_tasks.append(self.__tasks[self.__next_index])
+            self.__next_index += 1
+        return released_tasks
+
+    def is_exhausted(self) -> bool:
+        return self.__next_index >= len(self.__tasks)
+
+class RandomTaskSource(TaskSourceInterface):
+
+    # Tasks between two different random task endpoints. With the "uniform" distribution, num_tasks_per_timestep
+    # tasks are released every timestep (fractional rates spread over several timesteps), with "poisson" the
+    # number released every timestep is Poisson distributed with that mean. num_tasks=None never runs out.
+
+    DISTRIBUTIONS = ["uniform", "poisson"]
+
+    def __init__(self, task_endpoints: list[Node], num_tasks_per_timestep: float, num_tasks: int = None, random: Random = None, distribution: str = "uniform"):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown task distribution {distribution}!")
+        if len(task_endpoints) < 2:
+            raise ValueError("At least two task endpoints are needed to generate tasks!")
+        self.task_endpoints: list[Node] = task_endpoints
+        self.num_tasks_per_timestep: float = num_tasks_per_timestep
+        self.num_tasks: int | None = num_tasks
+        self.random: Random = random or Random()
+        self.distribution: str = distribution
+        self.tasks_added: int = 0
+        self.__next_timestep: int = 0
+
+    def get_tasks(self, timestep: int) -> list[Task]:
+        released_tasks = []
+        while self.__next_timestep <= timestep and not self.is_exhausted():
+            if self.distribution == "uniform":
+                num_released = max(0, ceil((self.__next_timestep + 1) * self.num_tasks_per_timestep) - self.tasks_added)
+            else:
+                num_released = self.__sample_poisson()
+            if self.num_tasks is not None:
+                num_released = min(num_released, self.num_tasks - self.tasks_added)
+            for _ in range(num_released):
+                released_tasks.append(self.__generate_task(self.__next_timestep))
+            self.__next_timestep += 1
+        return released_tasks
+
+    def is_exhausted(self) -> bool:
+        return self.num_tasks is not None and self.tasks_added >= self.num_tasks
+
+    def __generate_task(self, add_time: int) -> Task:
+        pickup_loc = self.random.randrange(len(self.task_endpoints))
+        delivery_loc = self.random.randrange(len(self.task_endpoints))
+        while delivery_loc == pickup_loc:
+            delivery_loc = self.random.randrange(len(self.task_endpoints))
+        self.tasks_added += 1
+        return Task(pickup_node=self.task_endpoints[pickup_loc], delivery_node=self.task_endpoints[delivery_loc], add_time=add_time)
+
+    def __sample_poisson(self) -> int:
+        # Knuth's method, fine for the small rates used per timestep
+        limit = exp(-self.num_tasks_per_timestep)
+        num_released = 0
+        product = self.random.random()
+        while product > limit:
+            num_released += 1
+            product *= self.random.random()
+        return num_released
+
+class ReplayTaskSource(TaskSourceInterface):
+
+    # Streams tasks from a CSV file with a header row, or a JSON lines file (.jsonl or .json), with the TASK_FILE_FIELDS.
+    # Given the map, rows whose pickup or delivery is not one of its task endpoints are rejected.
+
+    def __init__(self, file_path: str, map: Map = None):
+        self.file_path: str = file_path
+        self.__task_endpoints: set[tuple[int, int]] | None = None if map is None else {(node.x_coord, node.y_coord) for node in map.get_task_endpoints()}
+        self.__open_rows()
+        self.__rows_read: int = 0
+        self.__last_add_time: int | None = None
+        # Read one task ahead, but only once the simulation starts, so that task IDs are numbered by the App
+        self.__next_task: Task | None = None
+        self.__started: bool = False
+
+    def get_tasks(self, timestep: int) -> list[Task]:
+        released_tasks = []
+        while self.__peek_task() is not None and self.__next_task.add_time <= timestep:
+            released_tasks.append(self.__next_task)
+            self.__next_task = self.__read_task()
+        return released_tasks
+
+    def is_exhausted(self) -> bool:
+        return self.__peek_task() is None
+
+    def close(self):
+        if not self.__file.closed:
+            self.__file.close()
+
+    def __getstate__(self) -> dict:
+        # The open file is not copied - a copy reopens it and skips the rows already read
+        state = self.__dict__.copy()
+        del state["_ReplayTaskSource__file"], state["_ReplayTaskSource__rows"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.__open_rows()
+        for _ in range(self.__rows_read):
+            next(self.__rows, None)
+        if self.__started and self.__next_task is None:
+            self.close()
+
+    def __open_rows(self):
+        self.__file = open(self.file_path, newline="")
+        if self.file_path.endswith((".jsonl", ".json")):
+            self.__rows = (json.loads(line) for line in self.__file if line.strip())
+        else:
+            self.__rows = csv.DictReader(self.__file)
+
+    def __peek_task(self) -> Task | None:
+        if not self.__started:
+            self.__started = True
+            self.__next_task = self.__read_task()
+        return self.__next_task
+
+    def __read_task(self) -> Task | None:
+        row = next(self.__rows, None)
+        if row is None:
+            self.close()
+            return None
+        self.__rows_read += 1
+        add_time = int(row["add_time"])
+        if self.__last_add_time is not None and add_time < self.__last_add_time:
+            raise ValueError(f"Tasks in {self.file_path} must be in order of add_time!")
+        self.__last_add_time = add_time
+        pickup_coords = (int(row["pickup_x"]), int(row["pickup_y"]))
+        delivery_coords = (int(row["delivery_x"]), int(row["delivery_y"]))
+        if self.__task_endpoints is not None:
+            for coords in (pickup_coords, delivery_coords):
+                if coords not in self.__task_endpoints:
+                    raise ValueError(f"Task {self.__rows_read} in {self.file_path} uses {coords}, which is not a task endpoint of the map!")
+        return Task(pickup_node=Node(*pickup_coords), delivery_node=Node(*delivery_coords), add_time=add_time)
+
+class QueueTaskSource(TaskSourceInterface):
+
+    # Tasks injected while the simulation runs. The source only runs out once it has been closed and emptied.
+
+    def __init__(self):
+        self.__queue: list[tuple[int, int, Task]] = []
+        self.__next_timestep: int = 0
+        self.__closed: bool = False
+
+    def add_task(self, pickup_node: Node, delivery_node: Node, add_time: int = None) -> Task:
+        # Tasks without an add time, or with one that has already passed, are released at the next timestep
+        if self.__closed:
+            raise ValueError("Cannot add tasks to a closed task source!")
+        if add_time is None or add_time < self.__next_timestep:
+            add_time = self.__next_timestep
+        task = Task(pickup_node=pickup_node, delivery_node=delivery_node, add_time=add_time)
+        heappush(self.__queue, (task.add_time, task.id, task))
+        return task
+
+    def get_tasks(self, timestep: int) -> list[Task]:
+        released_tasks = []
+        while self.__queue and self.__queue[0][0] <= timestep:
+            released_tasks.append(heappop(self.__queue)[2])
+        self.__next_timestep = max(self.__next_timestep, timestep + 1)
+        return released_tasks
+
+    def close(self):
+        self.__closed = True
+
+    def is_exhausted(self) -> bool:
+        return self.__closed and not self.__queue
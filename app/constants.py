@@ -1,2 +0,0 @@
-MAX_ROWS = 21
-MAX_COLS = 35
\ No newline at end of file
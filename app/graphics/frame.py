@@ -0,0 +1,25 @@
+from typing import NamedTuple
+
+__all__ = ["Frame"]
+
+class Frame(NamedTuple):
+
+    # Immutable snapshot of what is drawn at one timestep, so that rendering never touches the running System
+
+    timestep: int
+    # (agent_id, x, y, rot) of every agent
+    agent_states: tuple[tuple[int, int, int, int], ...]
+    # (task_id, pickup (x, y) or None once picked up, delivery (x, y)) of every active task
+    task_markers: tuple[tuple[int, tuple[int, int] | None, tuple[int, int]], ...]
+    completed: bool = False
+
+    @classmethod
+    def from_system(cls, system) -> "Frame":
+        timestep = system.timestep
+        agent_states = tuple((agent.id, *agent.path.get_coords(timestep)) for agent in system.agents)
+        task_markers = tuple(
+            (task.id,
+             None if task.has_been_picked_up else (task.pickup_node.x_coord, task.pickup_node.y_coord),
+             (task.delivery_node.x_coord, task.delivery_node.y_coord))
+            for task in system.active_tasks.values())
+        return cls(timestep, agent_states, task_markers, system.is_completed())
@@ -1,13 +1,22 @@
+from time import perf_counter
+
 import PySimpleGUI as sg
-from app.agents.components.agent_path import AgentPath
-from app.agents.components.agent_state import AgentState
 from app.components.system import System
-from app.components.task import Task
 from app.components.environment.map import Map
 from app.components.environment.node_state import NodeStatus
-from app.constants import MAX_ROWS, MAX_COLS
+from app.graphics.frame import Frame
+from app.graphics.simulation_worker import SimulationWorker
+from app.graphics.recording import Recording
 
-CELL_SIZE = 30
+MAX_CELL_SIZE = 30
+MIN_CELL_SIZE = 2
+MAX_CANVAS_SIZE = 900
+# Grid lines are left out when the cells are smaller than this
+MIN_GRID_CELL_SIZE = 6
+DEFAULT_FPS = 10
+MAX_FPS = 120
+# Milliseconds between checks for a new frame while the simulation is behind
+FRAME_POLL_INTERVAL = 10
 APP_FONT = "Any 16"
 THEME = "DarkGrey5"
 
@@ -18,109 +27,245 @@ CELL_COLOR_MAP = {
     NodeStatus.OBSTACLE.value: "GREY"
 }
 
+# Corners of the agent triangle for each rotation, as fractions of a cell, pointing in the direction of travel
+AGENT_SHAPES = {
+    0: [(0.1, 0.9), (0.9, 0.9), (0.5, 0.1)],
+    90: [(0.1, 0.1), (0.1, 0.9), (0.9, 0.5)],
+    180: [(0.1, 0.1), (0.9, 0.1), (0.5, 0.9)],
+    270: [(0.1, 0.5), (0.9, 0.1), (0.9, 0.9)]
+}
+
 class GUI():
 
-    def __init__(self, system: System):
+    # The grid and cell colours are drawn once. Agents and task markers are canvas items that are created once
+    # and then only moved, or deleted, when their state changes.
+    # The simulation runs on a SimulationWorker thread, and the window draws the frames it produces at its own pace.
+    # Given a Recording instead of a System, the window replays it and can seek to any timestep.
+
+    def __init__(self, system: System = None, autoplay: bool = False, fps: int = None, max_frames: int = 64, recording: Recording = None):
+        if (system is None) == (recording is None):
+            raise ValueError("The GUI shows either a System or a Recording!")
         self.system = system
-        self._VARS = self.__initialize_variables()
+        self.recording = recording
+        self.map: Map = system.map if recording is None else recording.map
+        self._VARS = self.__initialize_variables(autoplay, fps or DEFAULT_FPS)
+        self.frame: Frame = Frame.from_system(system) if recording is None else recording.get_frame(0)
+        self.worker: SimulationWorker | None = None if recording is not None else SimulationWorker(system, max_frames)
+        # agent id -> (canvas item, (x, y, rot) it is drawn at)
+        self.__agent_items: dict[int, tuple[int, tuple[int, int, int]]] = {}
+        # task id -> [pickup marker or None once picked up, delivery marker]
+        self.__task_items: dict[int, list[int | None]] = {}
         self.__draw_canvas()
+        self.__draw_static_layer()
         self.__update_map()
+        if self.worker is not None:
+            self.worker.start()
         self.__event_loop()
 
-    def __initialize_variables(self):
+    def __initialize_variables(self, autoplay: bool, fps: int):
         return {
-            'xCellCount': MAX_COLS,
-            'yCellCount': MAX_ROWS,
+            'xCellCount': self.map.width,
+            'yCellCount': self.map.height,
+            # Large maps are drawn with smaller cells so that the canvas still fits on the screen
+            'cellSize': max(MIN_CELL_SIZE, min(MAX_CELL_SIZE, MAX_CANVAS_SIZE // max(self.map.width, self.map.height))),
+            'playing': autoplay,
+            # Steps requested while paused that are still waiting for their frame
+            'pendingSteps': 0,
+            'fps': min(max(1, fps), MAX_FPS),
             'canvas': None,
             'window': None
         }
 
     def __draw_canvas(self):
+        cell_size = self._VARS["cellSize"]
         layout = [
-            [sg.Canvas(size=(self._VARS["xCellCount"] * CELL_SIZE, self._VARS["yCellCount"] * CELL_SIZE), background_color="white", key="canvas")],
+            [sg.Canvas(size=(self._VARS["xCellCount"] * cell_size, self._VARS["yCellCount"] * cell_size), background_color="white", key="canvas")],
             [
                 sg.Exit(font=APP_FONT),
+                sg.Button("Pause" if self._VARS["playing"] else "Play", key="-Play-", font=APP_FONT, size=(6, 1)),
+                sg.Button("Step", key="-Step-", font=APP_FONT),
+                sg.Text("FPS", font=APP_FONT),
+                sg.Spin(list(range(1, MAX_FPS + 1)), initial_value=self._VARS["fps"], key="-FPS-", font=APP_FONT, size=(4, 1), enable_events=True),
                 sg.Text("Timestep: 0", key="-Exit-", font=APP_FONT, size=(15, 1))
             ]
         ]
+        if self.recording is not None:
+            layout.append([sg.Slider(range=(0, len(self.recording) - 1), default_value=0, orientation="h", key="-Seek-", enable_events=True, disable_number_display=True, size=(60, 15))])
         self._VARS["window"] = sg.Window("Simulation", layout, resizable=True, finalize=True, return_keyboard_events=True)
         self._VARS["canvas"] = self._VARS["window"]["canvas"]
 
+    def __draw_static_layer(self):
+        self.__mark_cells()
+        if self._VARS["cellSize"] >= MIN_GRID_CELL_SIZE:
+            self.__draw_grid()
+
     def __draw_grid(self):
-        xCanvasSize = self._VARS["xCellCount"] * CELL_SIZE
-        yCanvasSize = self._VARS["yCellCount"] * CELL_SIZE
+        cell_size = self._VARS["cellSize"]
+        xCanvasSize = self._VARS["xCellCount"] * cell_size
+        yCanvasSize = self._VARS["yCellCount"] * cell_size
         for x in range(self._VARS["xCellCount"]):
-            xCoord = CELL_SIZE * x
+            xCoord = cell_size * x
             self._VARS["canvas"].TKCanvas.create_line(
                 (xCoord, 0), (xCoord, yCanvasSize), fill="BLACK", width=1
             )
         for y in range(self._VARS["yCellCount"]):
-            yCoord = CELL_SIZE * y
+            yCoord = cell_size * y
             self._VARS["canvas"].TKCanvas.create_line(
                 (0, yCoord), (xCanvasSize, yCoord), fill="BLACK", width=1
             )
 
-    def __draw_cell(self, x: int, y: int, color: str):
-        x *= CELL_SIZE
-        y *= CELL_SIZE
-        self._VARS['canvas'].TKCanvas.create_rectangle(
-            x, y, x + CELL_SIZE, y + CELL_SIZE, outline='BLACK', fill=color, width=1
+    def __draw_cell(self, x: int, y: int, color: str, tag: str = "cell") -> int:
+        cell_size = self._VARS["cellSize"]
+        x *= cell_size
+        y *= cell_size
+        outline = 'BLACK' if cell_size >= MIN_GRID_CELL_SIZE else ''
+        return self._VARS['canvas'].TKCanvas.create_rectangle(
+            x, y, x + cell_size, y + cell_size, outline=outline, fill=color, width=1, tags=tag
         )
 
     def __mark_cells(self):
-        for (x_coord, y_coord), node_state in self.system.map.env.items():
-            self.__draw_cell(x_coord, y_coord, CELL_COLOR_MAP[node_state.node_status])
+        # Free cells are left blank
+        for (x_coord, y_coord), node_state in self.map.env.items():
+            color = CELL_COLOR_MAP[node_state.node_status]
+            if color:
+                self.__draw_cell(x_coord, y_coord, color)
 
     def __populate_agents(self):
-        for agent in self.system.agents:
-            agent_path = agent.path
-            curr_agent_state: AgentState = agent_path.path[self.system.timestep]
-            self.__draw_agent_cell(curr_agent_state)
-
-    def __draw_agent_cell(self, agent_state: AgentState):
-        xCoord = agent_state.node.x_coord * CELL_SIZE
-        yCoord = agent_state.node.y_coord * CELL_SIZE
-        if agent_state.rot == 0:
-            points = [xCoord + 0.1 * CELL_SIZE, yCoord + 0.9 * CELL_SIZE, xCoord + 0.9 * CELL_SIZE, yCoord + 0.9 * CELL_SIZE, xCoord + 0.5 * CELL_SIZE, yCoord + 0.1 * CELL_SIZE]
-        elif agent_state.rot == 90:
-            points = [xCoord + 0.1 * CELL_SIZE, yCoord + 0.1 * CELL_SIZE, xCoord + 0.1 * CELL_SIZE, yCoord + 0.9 * CELL_SIZE, xCoord + 0.9 * CELL_SIZE, yCoord + 0.5 * CELL_SIZE]
-        elif agent_state.rot == 180:
-            points = [xCoord + 0.1 * CELL_SIZE, yCoord + 0.1 * CELL_SIZE, xCoord + 0.9 * CELL_SIZE, yCoord + 0.1 * CELL_SIZE, xCoord + 0.5 * CELL_SIZE, yCoord + 0.9 * CELL_SIZE]
-        elif agent_state.rot == 270:
-            points = [xCoord + 0.1 * CELL_SIZE, yCoord + 0.5 * CELL_SIZE, xCoord + 0.9 * CELL_SIZE, yCoord + 0.1 * CELL_SIZE, xCoord + 0.9 * CELL_SIZE, yCoord + 0.9 * CELL_SIZE]
-        self._VARS["canvas"].TKCanvas.create_polygon(points, fill='BLACK')
+        canvas = self._VARS["canvas"].TKCanvas
+        for agent_id, x_coord, y_coord, rot in self.frame.agent_states:
+            coords = (x_coord, y_coord, rot)
+            agent_item = self.__agent_items.get(agent_id)
+            if agent_item is None:
+                item = canvas.create_polygon(self.__get_agent_points(*coords), fill='BLACK', tags="agent")
+                self.__agent_items[agent_id] = (item, coords)
+            elif agent_item[1] != coords:
+                canvas.coords(agent_item[0], *self.__get_agent_points(*coords))
+                self.__agent_items[agent_id] = (agent_item[0], coords)
+
+    def __get_agent_points(self, x_coord: int, y_coord: int, rot: int) -> list[float]:
+        cell_size = self._VARS["cellSize"]
+        points = []
+        for x_fraction, y_fraction in AGENT_SHAPES[rot]:
+            points.append((x_coord + x_fraction) * cell_size)
+            points.append((y_coord + y_fraction) * cell_size)
+        return points
 
     def __populate_tasks(self):
-        for task in self.system.active_tasks.values():
-            self.__draw_task_cell(task)
+        canvas = self._VARS["canvas"].TKCanvas
+        task_markers = {task_id: (pickup_loc, delivery_loc) for task_id, pickup_loc, delivery_loc in self.frame.task_markers}
+        for task_id in [task_id for task_id in self.__task_items if task_id not in task_markers]:
+            for item in self.__task_items.pop(task_id):
+                if item is not None:
+                    canvas.delete(item)
+        created = False
+        for task_id, (pickup_loc, delivery_loc) in task_markers.items():
+            task_items = self.__task_items.get(task_id)
+            if task_items is None:
+                self.__task_items[task_id] = self.__draw_task_cell(pickup_loc, delivery_loc)
+                created = True
+            elif pickup_loc is None and task_items[0] is not None:
+                canvas.delete(task_items[0])
+                task_items[0] = None
+            elif pickup_loc is not None and task_items[0] is None:
+                # Seeking back to before the pickup
+                task_items[0] = self.__draw_cell(*pickup_loc, 'ORANGE', tag="task")
+                created = True
+        if created:
+            # New markers must not hide the agents
+            canvas.tag_raise("agent")
 
-    def __draw_task_cell(self, task: Task):
-        self.__draw_cell(task.delivery_node.x_coord, task.delivery_node.y_coord, 'RED')
-        if not task.has_been_picked_up:
-            self.__draw_cell(task.pickup_node.x_coord, task.pickup_node.y_coord, 'ORANGE')
+    def __draw_task_cell(self, pickup_loc: tuple[int, int] | None, delivery_loc: tuple[int, int]) -> list[int | None]:
+        delivery_item = self.__draw_cell(*delivery_loc, 'RED', tag="task")
+        pickup_item = None
+        if pickup_loc is not None:
+            pickup_item = self.__draw_cell(*pickup_loc, 'ORANGE', tag="task")
+        return [pickup_item, delivery_item]
 
     def __update_map(self):
-        self._VARS['canvas'].TKCanvas.delete("all")
-        self.__draw_grid()
         self.__update_timestep()
-        self.__mark_cells()
         self.__populate_tasks()
         self.__populate_agents()
 
     def __update_timestep(self):
-        self._VARS['window']['-Exit-'].update(f"Timestep: {self.system.timestep}")
+        self._VARS['window']['-Exit-'].update(f"Timestep: {self.frame.timestep}")
+        if self.recording is not None:
+            self._VARS['window']['-Seek-'].update(value=self.frame.timestep)
+
+    def __set_playing(self, playing: bool):
+        self._VARS["playing"] = playing
+        self._VARS["window"]["-Play-"].update("Pause" if playing else "Play")
+
+    def __get_next_frame(self) -> Frame | None:
+        if self.recording is None:
+            return self.worker.get_frame()
+        if self.frame.timestep + 1 >= len(self.recording):
+            return None
+        return self.recording.get_frame(self.frame.timestep + 1)
+
+    def __is_finished(self) -> bool:
+        if self.recording is None:
+            return self.worker.is_finished()
+        return self.frame.timestep + 1 >= len(self.recording)
+
+    def __seek(self, timestep: int):
+        self.frame = self.recording.get_frame(timestep)
+        self.__update_map()
+
+    def __show_next_frame(self) -> bool:
+        # Draws the next frame of the simulation, if it is ready
+        frame = self.__get_next_frame()
+        if frame is None:
+            if self.__is_finished():
+                self.__set_playing(False)
+                self._VARS["pendingSteps"] = 0
+            return False
+        self.frame = frame
+        self.__update_map()
+        if frame.completed:
+            self.__set_playing(False)
+            self._VARS["pendingSteps"] = 0
+        return True
+
+    def __get_timeout(self, next_frame_time: float) -> int | None:
+        if self._VARS["playing"]:
+            # Frames are spaced by the target FPS, less the time taken to draw the last one
+            return max(0, int((next_frame_time - perf_counter()) * 1000))
+        if self._VARS["pendingSteps"]:
+            return FRAME_POLL_INTERVAL
+        return None
 
     def __event_loop(self):
+        next_frame_time = perf_counter()
         while True:
-            event, _ = self._VARS["window"].read()
+            event, values = self._VARS["window"].read(timeout=self.__get_timeout(next_frame_time))
             if event in (sg.WIN_CLOSED, "Exit"):
                 break
-            self.system = self.system.iterate()
-            self.__update_map()
+            if event == "-Play-":
+                self.__set_playing(not self._VARS["playing"])
+                self._VARS["pendingSteps"] = 0
+                next_frame_time = perf_counter()
+            elif event == "-FPS-":
+                self._VARS["fps"] = int(values["-FPS-"])
+            elif event == "-Seek-":
+                self.__seek(int(values["-Seek-"]))
+            elif event == sg.TIMEOUT_KEY:
+                if self._VARS["playing"]:
+                    if self.__show_next_frame():
+                        next_frame_time = max(next_frame_time + 1 / self._VARS["fps"], perf_counter())
+                    else:
+                        # The simulation is behind, so check again shortly
+                        next_frame_time = perf_counter() + FRAME_POLL_INTERVAL / 1000
+                elif self._VARS["pendingSteps"] and self.__show_next_frame():
+                    self._VARS["pendingSteps"] -= 1
+            elif not self._VARS["playing"]:
+                # Any other button or key press advances a single timestep
+                self._VARS["pendingSteps"] += 1
+                if self.__show_next_frame():
+                    self._VARS["pendingSteps"] -= 1
         self.__close_window()
 
     def __close_window(self):
+        # A planning step in progress is not interrupted - the daemon thread is dropped with the process
+        if self.worker is not None:
+            self.worker.stop(timeout=1)
         self._VARS['window'].close()
-
-if __name__ == "__main__":
-    GUI()
\ No newline at end of file
@@ -0,0 +1,88 @@
+import json
+import os
+
+import numpy as np
+
+from app.components.environment.map import Map
+from app.components.system.recorder import RECORDING_VERSION, RECORDING_META_FILE, RECORDING_MAP_FILE, TASK_RECORD_FIELDS, get_state_chunk_file, get_task_chunk_file
+from app.graphics.frame import Frame
+
+__all__ = ["Recording"]
+
+class Recording:
+
+    # Read-only view of a directory written by Recorder. Any timestep is read in O(1) from its memory-mapped
+    # state chunk, and the task markers from the few task chunks whose range of add and delivery times covers
+    # it, without a System or any agent. Task chunks are only loaded once a frame needs them.
+
+    def __init__(self, directory: str):
+        self.directory: str = directory
+        with open(os.path.join(directory, RECORDING_META_FILE)) as meta_file:
+            meta = json.load(meta_file)
+        if meta["version"] != RECORDING_VERSION or meta["task_fields"] != TASK_RECORD_FIELDS:
+            raise ValueError(f"Unsupported recording in {directory}!")
+        self.chunk_size: int = meta["chunk_size"]
+        self.num_timesteps: int = meta["num_timesteps"]
+        self.agent_ids: list[int] = meta["agent_ids"]
+        self.completed: bool = meta["completed"]
+        self.map: Map = self.__load_map()
+        self.__state_chunks: list[np.ndarray] = [np.load(os.path.join(directory, get_state_chunk_file(chunk_index)), mmap_mode="r") for chunk_index in range(meta["num_state_chunks"])]
+        task_chunk_ranges = np.array(meta["task_chunk_ranges"], dtype=np.int64).reshape(-1, 2)
+        self.__task_chunk_add_times: np.ndarray = task_chunk_ranges[:, 0]
+        # Chunks with an undelivered task are shown until the end
+        self.__task_chunk_delivery_times: np.ndarray = np.where(task_chunk_ranges[:, 1] < 0, np.iinfo(np.int64).max, task_chunk_ranges[:, 1])
+        # No task shown at a timestep is in a chunk before the first whose running maximum delivery time is after it,
+        # or from the first whose minimum add time over the remaining chunks is after it. Both bounds are monotonic,
+        # so the chunks in between are found by binary search.
+        self.__delivered_bounds: np.ndarray = np.maximum.accumulate(self.__task_chunk_delivery_times)
+        self.__added_bounds: np.ndarray = np.minimum.accumulate(self.__task_chunk_add_times[::-1])[::-1]
+        self.__task_chunks: dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.num_timesteps
+
+    def get_states(self, timestep: int) -> np.ndarray:
+        # (num_agents, 3) array of the (x, y, rot) of every agent
+        if not 0 <= timestep < self.num_timesteps:
+            raise IndexError(f"Timestep {timestep} is not in the recording!")
+        return self.__state_chunks[timestep // self.chunk_size][timestep % self.chunk_size]
+
+    def get_frame(self, timestep: int) -> Frame:
+        states = self.get_states(timestep).tolist()
+        agent_states = tuple((agent_id, x_coord, y_coord, rot) for agent_id, (x_coord, y_coord, rot) in zip(self.agent_ids, states))
+        task_markers = []
+        for task_rows in self.__get_task_chunks(timestep):
+            # Rows are in order of add time, so only the prefix added by the timestep is searched
+            task_rows = task_rows[:np.searchsorted(task_rows[:, 1], timestep, side="right")]
+            # Tasks are shown from their release until they are delivered, and the pickup marker until they are picked up
+            delivery_times = task_rows[:, 3]
+            task_markers.extend(
+                (task_id, None if 0 <= picked_up_timestep <= timestep else (pickup_x, pickup_y), (delivery_x, delivery_y))
+                for task_id, _, _, _, _, picked_up_timestep, pickup_x, pickup_y, delivery_x, delivery_y in task_rows[(delivery_times < 0) | (delivery_times > timestep)].tolist())
+        task_markers.sort()
+        task_markers = tuple(task_markers)
+        completed = self.completed and timestep == self.num_timesteps - 1
+        return Frame(timestep, agent_states, task_markers, completed)
+
+    def __get_task_chunks(self, timestep: int) -> list[np.ndarray]:
+        first_index = int(np.searchsorted(self.__delivered_bounds, timestep, side="right"))
+        end_index = int(np.searchsorted(self.__added_bounds, timestep, side="right"))
+        task_chunks = []
+        for chunk_index in range(first_index, end_index):
+            if self.__task_chunk_add_times[chunk_index] <= timestep < self.__task_chunk_delivery_times[chunk_index]:
+                task_chunks.append(self.__get_task_chunk(chunk_index))
+        return task_chunks
+
+    def __get_task_chunk(self, chunk_index: int) -> np.ndarray:
+        task_chunk = self.__task_chunks.get(chunk_index)
+        if task_chunk is None:
+            task_chunk = np.load(os.path.join(self.directory, get_task_chunk_file(chunk_index)), mmap_mode="r")
+            self.__task_chunks[chunk_index] = task_chunk
+        return task_chunk
+
+    def __load_map(self) -> Map:
+        grid = np.load(os.path.join(self.directory, RECORDING_MAP_FILE))
+        map = Map(width=grid.shape[1], height=grid.shape[0])
+        map.grid[:] = grid
+        map.refresh()
+        return map
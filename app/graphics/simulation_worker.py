@@ -0,0 +1,59 @@
+from queue import Queue, Full, Empty
+from threading import Thread, Event
+
+from app.components.system.system import System
+from app.graphics.frame import Frame
+
+__all__ = ["SimulationWorker"]
+
+class SimulationWorker(Thread):
+
+    # Iterates the System on a background thread and puts a Frame of every timestep into a bounded queue.
+    # The worker blocks once the queue is full, so it runs at most max_frames timesteps ahead of the GUI.
+
+    # Seconds between checks for stop() while the queue is full
+    PUT_TIMEOUT = 0.1
+
+    def __init__(self, system: System, max_frames: int = 64):
+        super().__init__(name="simulation", daemon=True)
+        if max_frames < 1:
+            raise ValueError("The frame queue must hold at least 1 frame!")
+        self.system: System = system
+        self.frames: Queue = Queue(maxsize=max_frames)
+        # Exception that stopped the simulation, re-raised to the GUI by get_frame
+        self.error: BaseException | None = None
+        self.__stopped: Event = Event()
+
+    def run(self):
+        try:
+            while not self.__stopped.is_set() and not self.system.is_completed():
+                self.system.iterate()
+                self.__put(Frame.from_system(self.system))
+        except BaseException as error:
+            self.error = error
+
+    def get_frame(self) -> Frame | None:
+        # Next frame if one is ready, without waiting for it
+        try:
+            return self.frames.get_nowait()
+        except Empty:
+            if self.error is not None:
+                raise RuntimeError("The simulation stopped with an error") from self.error
+            return None
+
+    def is_finished(self) -> bool:
+        # No further frames will ever be put into the queue
+        return not self.is_alive() and self.frames.empty()
+
+    def stop(self, timeout: float = None):
+        self.__stopped.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def __put(self, frame: Frame):
+        while not self.__stopped.is_set():
+            try:
+                self.frames.put(frame, timeout=self.PUT_TIMEOUT)
+                return
+            except Full:
+                continue
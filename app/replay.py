@@ -0,0 +1,20 @@
+import argparse
+
+from app.graphics.recording import Recording
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.replay", description="Replay a simulation recorded with python -m app.run --record")
+    parser.add_argument("recording", help="directory of the recording")
+    parser.add_argument("--autoplay", action="store_true", help="start playing right away")
+    parser.add_argument("--fps", type=int, default=None, help="timesteps shown per second while playing")
+    return parser.parse_args(argv)
+
+def main(argv: list[str] = None):
+    args = parse_args(argv)
+    recording = Recording(args.recording)
+    # Imported here so that recordings can be inspected without the GUI toolkit
+    from app.graphics.gui import GUI
+    GUI(recording=recording, autoplay=args.autoplay, fps=args.fps)
+
+if __name__ == "__main__":
+    main()
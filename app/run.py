@@ -0,0 +1,168 @@
+import argparse
+import json
+import sys
+from random import Random
+from time import perf_counter
+
+from app.start import App
+from app.components.environment.map import Map
+from app.components.environment.map_loader import load_movingai_map
+from app.components.environment.warehouse import generate_warehouse
+from app.components.system.system import System
+from app.components.task.task_source import RandomTaskSource, ReplayTaskSource
+from app.agents.agents.agent_tp import Agent_TP
+from app.agents.agents.agent_tpts import Agent_TPTS
+from app.agents.agents.agent_central import Agent_Central
+
+AGENT_CLASSES = {
+    "TP": Agent_TP,
+    "TPTS": Agent_TPTS,
+    "Central": Agent_Central
+}
+
+PROFILERS = ["cprofile", "pyinstrument"]
+
+def run_headless(agent_class, num_agents: int, num_tasks: int, num_tasks_per_timestep: float, seed: int = None, max_timestep: int = 1000, path_retention: int = None, trajectory_path: str = None, agent_kwargs: dict = None, task_distribution: str = "uniform", task_file: str = None, map: Map = None, recording_path: str = None, collect_stats: bool = False, profiler: str = None, profile_path: str = None) -> dict:
+    if map is None:
+        map = generate_warehouse()
+    task_source = None if task_file is None else ReplayTaskSource(task_file, map)
+    app = App(agent_class=agent_class, num_agents=num_agents, num_tasks=num_tasks, num_tasks_per_timestep=num_tasks_per_timestep, seed=seed, path_retention=path_retention, trajectory_path=trajectory_path, agent_kwargs=agent_kwargs, task_source=task_source, task_distribution=task_distribution, map=map, recording_path=recording_path)
+    system = app.system
+    if collect_stats:
+        system.enable_stats()
+    profile = None if profiler is None else start_profiler(profiler)
+    iterate_times = []
+    vertex_collisions = 0
+    while system.timestep < max_timestep and not system.is_completed():
+        start_time = perf_counter()
+        system.iterate()
+        iterate_times.append(perf_counter() - start_time)
+        vertex_collisions += count_vertex_collisions(system, system.timestep)
+    if profile is not None:
+        stop_profiler(profiler, profile, profile_path)
+    system.close()
+    return summarize(system, iterate_times, vertex_collisions)
+
+def start_profiler(profiler: str):
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler {profiler}!")
+    if profiler == "cprofile":
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        raise ValueError("Profiling with pyinstrument requires the pyinstrument package!") from None
+    profile = Profiler()
+    profile.start()
+    return profile
+
+def stop_profiler(profiler: str, profile, profile_path: str = None):
+    # Writes the profile to the file, or a report to stderr so that it does not mix with the summary
+    if profiler == "cprofile":
+        profile.disable()
+        if profile_path is not None:
+            profile.dump_stats(profile_path)
+        else:
+            import pstats
+            pstats.Stats(profile, stream=sys.stderr).sort_stats("cumulative").print_stats(30)
+        return
+    profile.stop()
+    if profile_path is not None:
+        with open(profile_path, "w") as profile_file:
+            profile_file.write(profile.output_html())
+    else:
+        print(profile.output_text(), file=sys.stderr)
+
+def count_vertex_collisions(system: System, timestep: int) -> int:
+    # Agents sharing a cell with another agent at the timestep, where agents past the end of their path stay at its last cell
+    occupied_cells = set()
+    vertex_collisions = 0
+    for agent in system.agents:
+        agent_path = agent.path
+        x_coord, y_coord, _ = agent_path.get_coords(min(max(timestep, agent_path.start_timestep), agent_path.end_timestep))
+        if (x_coord, y_coord) in occupied_cells:
+            vertex_collisions += 1
+        occupied_cells.add((x_coord, y_coord))
+    return vertex_collisions
+
+def summarize(system: System, iterate_times: list[float], vertex_collisions: int) -> dict:
+    delivered_tasks = [task for task in system.tasks if task.delivery_time is not None and task.delivery_time <= system.timestep]
+    service_times = [task.delivery_time - task.add_time for task in delivered_tasks]
+    num_timesteps = len(iterate_times)
+    return {
+        "timesteps": system.timestep,
+        "completed": system.is_completed(),
+        "tasks_delivered": len(delivered_tasks),
+        "tasks_total": len(system.tasks),
+        "makespan": max((task.delivery_time for task in delivered_tasks), default=None),
+        "average_service_time": sum(service_times) / len(service_times) if service_times else None,
+        "throughput": len(delivered_tasks) / num_timesteps if num_timesteps else 0.0,
+        "wall_time": sum(iterate_times),
+        "average_wall_time_per_timestep": sum(iterate_times) / num_timesteps if num_timesteps else 0.0,
+        "max_wall_time_per_timestep": max(iterate_times, default=0.0),
+        "search_cache_hits": system.search_cache.hits,
+        "search_cache_misses": system.search_cache.misses,
+        # Searches that found no conflict-free path, so that the agent waited instead
+        "conflict_fallbacks": system.conflict_fallbacks,
+        "vertex_collisions": vertex_collisions,
+        "stats": None if system.stats is None else system.stats.summary()
+    }
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.run", description="Run a lifelong MAPD simulation without the GUI")
+    parser.add_argument("--agent", choices=AGENT_CLASSES.keys(), default="TP", help="agent algorithm")
+    parser.add_argument("--agents", type=int, default=10, help="number of agents")
+    parser.add_argument("--tasks", type=int, default=100, help="number of tasks, 0 keeps releasing tasks until --max-timestep")
+    parser.add_argument("--rate", type=float, default=1.0, help="tasks released per timestep")
+    parser.add_argument("--distribution", choices=RandomTaskSource.DISTRIBUTIONS, default="uniform", help="release the same number of tasks every timestep, or a Poisson distributed number")
+    parser.add_argument("--task-file", default=None, help="replay the tasks of a CSV or JSON lines file instead of generating them")
+    parser.add_argument("--map", default=None, help="MovingAI .map file, defaults to a generated warehouse")
+    parser.add_argument("--task-endpoints", type=int, default=0, help="number of random task endpoints added to the --map")
+    parser.add_argument("--non-task-endpoints", type=int, default=0, help="number of random non-task endpoints added to the --map")
+    parser.add_argument("--shelf-rows", type=int, default=5, help="rows of shelves in the generated warehouse")
+    parser.add_argument("--shelf-blocks", type=int, default=2, help="blocks of shelves side by side in the generated warehouse")
+    parser.add_argument("--shelf-length", type=int, default=10, help="length of every shelf in the generated warehouse")
+    parser.add_argument("--aisle-width", type=int, default=1, help="width of the aisles in the generated warehouse")
+    parser.add_argument("--station-groups", type=int, default=2, help="groups of non-task endpoint columns on each side of the generated warehouse")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for agent spawns and tasks")
+    parser.add_argument("--max-timestep", type=int, default=1000, help="stop after this many timesteps")
+    parser.add_argument("--retention", type=int, default=None, help="number of past timesteps kept in memory, defaults to the whole history")
+    parser.add_argument("--trajectory", default=None, help="CSV file the agent trajectories are appended to")
+    parser.add_argument("--record", default=None, help="directory the run is recorded to, for replays with python -m app.replay")
+    parser.add_argument("--incremental", action="store_true", help="only replan Central agents when the free agents or unexecuted tasks change")
+    parser.add_argument("--window", type=int, default=None, help="only resolve conflicts within this many timesteps, defaults to the whole path")
+    parser.add_argument("--replan-interval", type=int, default=None, help="replan the paths every this many timesteps in windowed mode, defaults to the window")
+    parser.add_argument("--stats", action="store_true", help="collect timings and counters of every timestep and add them to the summary")
+    parser.add_argument("--profile", choices=PROFILERS, default=None, help="profile the simulation with cProfile or pyinstrument")
+    parser.add_argument("--profile-output", default=None, help="file the profile is written to, defaults to a report on stderr")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    return parser.parse_args(argv)
+
+def main(argv: list[str] = None):
+    args = parse_args(argv)
+    if args.incremental and args.agent != "Central":
+        raise ValueError("Incremental replanning is only supported by the Central agent")
+    agent_kwargs = {"window": args.window, "replan_interval": args.replan_interval}
+    if args.incremental:
+        agent_kwargs["incremental"] = True
+    if args.map is None:
+        map = generate_warehouse(args.shelf_rows, args.shelf_blocks, args.shelf_length, args.aisle_width, args.station_groups)
+    else:
+        map = load_movingai_map(args.map, args.task_endpoints, args.non_task_endpoints, Random(None if args.seed is None else f"{args.seed}:map"))
+    summary = run_headless(AGENT_CLASSES[args.agent], args.agents, args.tasks or None, args.rate, task_distribution=args.distribution, task_file=args.task_file, seed=args.seed, max_timestep=args.max_timestep, path_retention=args.retention, trajectory_path=args.trajectory, agent_kwargs=agent_kwargs, map=map, recording_path=args.record, collect_stats=args.stats, profiler=args.profile, profile_path=args.profile_output)
+    if args.json:
+        print(json.dumps(summary))
+        return
+    stats = summary.pop("stats")
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+    if stats is not None:
+        print("stats (total, mean and max per timestep):")
+        for metric, values in stats.items():
+            print(f"  {metric}: {values['total']:.6g} {values['mean']:.6g} {values['max']:.6g}")
+
+if __name__ == "__main__":
+    main()
@@ -1,87 +1,58 @@
-from random import randrange
+from random import Random
 
 from app.agents.agents.agent_interface import AgentInterface
 from app.agents.components.agent_state import AgentState
 from app.components.environment.node import Node
-from app.components.environment.node_state import NodeStatus
 from app.components.environment.map import Map
+from app.components.environment.warehouse import generate_warehouse
 from app.components.task.task import Task
-from app.graphics.gui import GUI
+from app.components.task.task_source import TaskSourceInterface, RandomTaskSource
 from app.components.system.system import System
+from app.components.system.trajectory_writer import TrajectoryWriter
+from app.components.system.recorder import Recorder
 
 from app.agents.agents.agent_tp import Agent_TP
-from app.agents.agents.agent_tpts import Agent_TPTS
-from app.agents.agents.agent_central import Agent_Central
 
 class App:
 
-    def __init__(self, agent_class: AgentInterface, num_agents: int, num_tasks: int, num_tasks_per_timestep: int):
+    def __init__(self, agent_class: AgentInterface, num_agents: int, num_tasks: int, num_tasks_per_timestep: int, seed: int = None, path_retention: int = None, trajectory_path: str = None, agent_kwargs: dict = None, task_source: TaskSourceInterface = None, task_distribution: str = "uniform", map: Map = None, recording_path: str = None):
+        # Independent streams, so that e.g. the task sequence does not change with the number of agents
+        self.agent_random: Random = Random(None if seed is None else f"{seed}:agents")
+        self.task_random: Random = Random(None if seed is None else f"{seed}:tasks")
         self.agent_class: AgentInterface = agent_class
         self.num_agents: int = num_agents
         self.num_tasks: int = num_tasks
         self.num_tasks_per_timestep: int = num_tasks_per_timestep
-        self.map: Map = self.__generate_map()
+        # Extra options passed to every agent, e.g. {"incremental": True} for Agent_Central
+        self.agent_kwargs: dict = agent_kwargs or {}
+        # IDs double as indices into System.agents, so every simulation numbers its agents and tasks from 0
+        Task.reset_id_counter()
+        self.agent_class.reset_id_counter()
+        self.map: Map = map or generate_warehouse()
         self.agents: list[AgentInterface] = self.__generate_agents()
-        self.tasks: list[Task] = self.__generate_tasks()
-        self.system: System = System(self.map, self.tasks, self.agents)
+        # num_tasks=None generates tasks until the simulation is stopped
+        self.task_source: TaskSourceInterface = task_source or RandomTaskSource(self.map.get_task_endpoints(), num_tasks_per_timestep, num_tasks, self.task_random, task_distribution)
+        trajectory_writer = None if trajectory_path is None else TrajectoryWriter(trajectory_path)
+        recorder = None if recording_path is None else Recorder(recording_path)
+        self.system: System = System(self.map, self.task_source, self.agents, path_retention=path_retention, trajectory_writer=trajectory_writer, recorder=recorder)
 
-    def __generate_map(self) -> Map:
-        node_status: list[list[int]] = []
-        for y_coord in range(21):
-            if y_coord in [0, 20]:
-                node_status.append(["FREE"] * 35)
-            elif y_coord in list(range(1, 21, 2)):
-                node_status.append(["FREE", "NON_TASK_ENDPOINT", "NON_TASK_ENDPOINT"] * 2 + (["FREE"] + ["TASK_ENDPOINT"] * 10) * 2 + ["FREE", "NON_TASK_ENDPOINT", "NON_TASK_ENDPOINT"] * 2 + ["FREE"])
-            elif y_coord in list(range(2, 21, 4)):
-                node_status.append(["FREE", "NON_TASK_ENDPOINT", "NON_TASK_ENDPOINT"] * 2 + (["FREE"] + ["OBSTACLE"] * 10) * 2 + ["FREE", "NON_TASK_ENDPOINT", "NON_TASK_ENDPOINT"] * 2 + ["FREE"])
-            else:
-                node_status.append(["FREE", "NON_TASK_ENDPOINT", "NON_TASK_ENDPOINT"] * 2 + (["FREE"] * 11) * 2 + ["FREE", "NON_TASK_ENDPOINT", "NON_TASK_ENDPOINT"] * 2 + ["FREE"])
-        map = Map()
-        for y_coord in range(len(node_status)):
-            for x_coord in range(len(node_status[0])):
-                map.create_node(x_coord=x_coord, y_coord=y_coord, node_status=node_status[y_coord][x_coord])
-        return map
-    
     def __generate_agents(self) -> list[AgentInterface]:
-        spawn_loc = []
-        for y_coord in range(1, 20):
-            for x_coord in [1, 2, 4, 5, 29, 30, 32, 33]:
-                spawn_loc.append((x_coord, y_coord))
+        # Agents start on distinct non-task endpoints
+        spawn_loc = [(node.x_coord, node.y_coord) for node in self.map.get_non_task_endpoints()]
+        if self.num_agents > len(spawn_loc):
+            raise ValueError(f"The map only has {len(spawn_loc)} non-task endpoints for {self.num_agents} agents!")
         agents = []
         for _ in range(self.num_agents):
-            rand_x, rand_y = spawn_loc.pop(randrange(len(spawn_loc)))
-            rand_degree = randrange(0, 4) * 90
+            rand_x, rand_y = spawn_loc.pop(self.agent_random.randrange(len(spawn_loc)))
+            rand_degree = self.agent_random.randrange(0, 4) * 90
             agent_state = AgentState(node=Node(rand_x, rand_y), rot=rand_degree)
-            agents.append(self.agent_class(agent_state))
+            agents.append(self.agent_class(agent_state, **self.agent_kwargs))
         return agents
     
-    def __generate_tasks(self) -> list[Task]:
-        task_endpoints = self.__get_task_spawn_nodes()
-        tasks = []
-        timestep = 0
-        tasks_added = 0
-        while tasks_added < self.num_tasks:
-            task_to_release = (timestep + 1) * self.num_tasks_per_timestep
-            if tasks_added >= task_to_release:
-                timestep += 1
-                continue
-            pickup_loc = randrange(len(task_endpoints))
-            delivery_loc = randrange(len(task_endpoints))
-            while delivery_loc == pickup_loc:
-                delivery_loc = randrange(len(task_endpoints))
-            tasks.append(Task(pickup_node=task_endpoints[pickup_loc], delivery_node=task_endpoints[delivery_loc], add_time=timestep))
-            tasks_added += 1  
-        return tasks
-    
-    def __get_task_spawn_nodes(self) -> list[Node]:
-        task_nodes = []
-        for _, node_state in self.map.env.items():
-            if node_state.node_status == NodeStatus.TASK_ENDPOINT.value:
-                task_nodes.append(node_state.node)
-        return task_nodes
-    
-    def run_simulation(self):
-        GUI(self.system)
+    def run_simulation(self, autoplay: bool = False, fps: int = None):
+        # Imported here so that headless runs never load the GUI toolkit
+        from app.graphics.gui import GUI
+        GUI(self.system, autoplay=autoplay, fps=fps)
             
 if __name__ == "__main__":
     app = App(agent_class=Agent_TP, num_agents=3, num_tasks=15, num_tasks_per_timestep=0.25)
@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+from app.run import AGENT_CLASSES, run_headless
+
+# Fields that identify a configuration - rows already recorded with the same values are skipped on resume
+CONFIG_FIELDS = ["agent", "agents", "tasks", "rate", "seed", "max_timestep"]
+
+def build_configs(agent_names: list[str], agent_counts: list[int], rates: list[float], seeds: list[int], num_tasks: int, max_timestep: int) -> list[dict]:
+    configs = []
+    for agent_name, num_agents, rate, seed in product(agent_names, agent_counts, rates, seeds):
+        configs.append({
+            "agent": agent_name,
+            "agents": num_agents,
+            "tasks": num_tasks,
+            "rate": rate,
+            "seed": seed,
+            "max_timestep": max_timestep
+        })
+    return configs
+
+def run_config(config: dict) -> dict:
+    # Every run builds a fresh App, which resets the Task and agent ID counters, so worker processes can be reused
+    try:
+        summary = run_headless(AGENT_CLASSES[config["agent"]], config["agents"], config["tasks"], config["rate"], seed=config["seed"], max_timestep=config["max_timestep"])
+    except Exception:
+        return {**config, "error": traceback.format_exc()}
+    return {**config, **summary}
+
+def config_key(row: dict) -> tuple:
+    return tuple(row[field] for field in CONFIG_FIELDS)
+
+def load_recorded_keys(output_path: str) -> set[tuple]:
+    recorded_keys = set()
+    if not os.path.exists(output_path):
+        return recorded_keys
+    with open(output_path) as output_file:
+        for line in output_file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                # Partially written last line of an interrupted sweep
+                continue
+            if "error" not in row:
+                recorded_keys.add(config_key(row))
+    return recorded_keys
+
+def terminate_partial_line(output_path: str):
+    # An interrupted sweep can leave a half written row behind, which must not swallow the next one
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        return
+    with open(output_path, "rb+") as output_file:
+        output_file.seek(-1, os.SEEK_END)
+        if output_file.read(1) != b"\n":
+            output_file.write(b"\n")
+
+def run_sweep(configs: list[dict], output_path: str, max_workers: int = None) -> int:
+    recorded_keys = load_recorded_keys(output_path)
+    pending_configs = [config for config in configs if config_key(config) not in recorded_keys]
+    print(f"{len(configs) - len(pending_configs)} of {len(configs)} configurations already recorded", flush=True)
+    if not pending_configs:
+        return 0
+    terminate_partial_line(output_path)
+    num_completed = 0
+    with open(output_path, "a") as output_file, ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_config, config) for config in pending_configs]
+        for future in as_completed(futures):
+            row = future.result()
+            output_file.write(json.dumps(row) + "\n")
+            output_file.flush()
+            num_completed += 1
+            status = "failed" if "error" in row else f"delivered {row['tasks_delivered']}/{row['tasks_total']} in {row['wall_time']:.2f}s"
+            print(f"[{num_completed}/{len(pending_configs)}] {config_key(row)} {status}", flush=True)
+    return num_completed
+
+def parse_list(value: str, cast) -> list:
+    return [cast(item) for item in value.split(",") if item]
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.sweep", description="Run headless simulations for every combination of the given parameters in parallel")
+    parser.add_argument("output", help="JSON lines file the results are appended to - rows already in it are skipped")
+    parser.add_argument("--agent", type=lambda value: parse_list(value, str), default=list(AGENT_CLASSES.keys()), help="comma separated agent algorithms")
+    parser.add_argument("--agents", type=lambda value: parse_list(value, int), default=[10], help="comma separated agent counts")
+    parser.add_argument("--rates", type=lambda value: parse_list(value, float), default=[1.0], help="comma separated tasks released per timestep")
+    parser.add_argument("--seeds", type=lambda value: parse_list(value, int), default=[0], help="comma separated seeds")
+    parser.add_argument("--tasks", type=int, default=100, help="number of tasks per run")
+    parser.add_argument("--max-timestep", type=int, default=1000, help="stop each run after this many timesteps")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes, defaults to the CPU count")
+    return parser.parse_args(argv)
+
+def main(argv: list[str] = None):
+    args = parse_args(argv)
+    unknown = [agent_name for agent_name in args.agent if agent_name not in AGENT_CLASSES]
+    if unknown:
+        raise ValueError(f"Unknown agent algorithms: {', '.join(unknown)}")
+    configs = build_configs(args.agent, args.agents, args.rates, args.seeds, args.tasks, args.max_timestep)
+    run_sweep(configs, args.output, max_workers=args.workers)
+
+if __name__ == "__main__":
+    main()
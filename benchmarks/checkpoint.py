@@ -0,0 +1,54 @@
+import argparse
+import pickle
+import sys
+from copy import deepcopy
+from time import perf_counter
+
+from app.start import App
+from app.run import AGENT_CLASSES
+from app.components.system.checkpoint import snapshot_system, restore_system, fork_system
+
+def measure(function) -> tuple[float, object]:
+    start_time = perf_counter()
+    result = function()
+    return perf_counter() - start_time, result
+
+def run_benchmark(algorithm: str, num_agents: int, num_tasks_per_timestep: float, num_timesteps: int, seed: int) -> list[tuple[str, float, int | None]]:
+    # Runs the simulation for num_timesteps and then compares the ways of copying its state
+    app = App(agent_class=AGENT_CLASSES[algorithm], num_agents=num_agents, num_tasks=None, num_tasks_per_timestep=num_tasks_per_timestep, seed=seed)
+    system = app.system
+    while system.timestep < num_timesteps:
+        system.iterate()
+    snapshot_time, snapshot = measure(lambda: snapshot_system(system))
+    dump_time, checkpoint = measure(lambda: pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+    restore_time, _ = measure(lambda: restore_system(pickle.loads(checkpoint)))
+    fork_time, _ = measure(lambda: fork_system(system))
+    # Copying the whole object graph, as before checkpoints, for comparison
+    deepcopy_time, _ = measure(lambda: deepcopy(system))
+    pickle_time, pickled_system = measure(lambda: pickle.dumps(system, protocol=pickle.HIGHEST_PROTOCOL))
+    return [
+        ("checkpoint", snapshot_time + dump_time, len(checkpoint)),
+        ("restore", restore_time, None),
+        ("fork", fork_time, None),
+        ("deepcopy of System", deepcopy_time, None),
+        ("pickle of System", pickle_time, len(pickled_system))
+    ]
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.checkpoint", description="Measure the size and time of System checkpoints, restores and forks")
+    parser.add_argument("--agent", choices=AGENT_CLASSES.keys(), default="TP", help="algorithm of the agents")
+    parser.add_argument("--agents", type=int, default=100, help="number of agents")
+    parser.add_argument("--rate", type=float, default=2, help="tasks released per timestep")
+    parser.add_argument("--timesteps", type=int, default=500, help="timesteps simulated before the checkpoint is taken")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the simulation")
+    return parser.parse_args(argv)
+
+def main(argv: list[str] = None) -> int:
+    args = parse_args(argv)
+    for name, elapsed, size in run_benchmark(args.agent, args.agents, args.rate, args.timesteps, args.seed):
+        size_text = "" if size is None else f" {size / 2 ** 10:9.1f} KiB"
+        print(f"{name:20} {elapsed * 1000:9.2f}ms{size_text}", flush=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import argparse
+import sys
+from timeit import timeit
+
+from app.agents.components.agent_state import AgentState
+from app.components.environment.node import Node
+from app.components.environment.warehouse import generate_warehouse
+
+# Hash functions Node and AgentState used before nodes were hashed by their cell position, kept for comparison
+
+def legacy_node_hash(node: Node) -> int:
+    hash_prime = 397
+    return (((node.x_coord * hash_prime) ** node.y_coord) * hash_prime)
+
+def legacy_agent_state_hash(agent_state: AgentState) -> int:
+    return hash(f"{agent_state.node.x_coord}_{agent_state.node.y_coord}_{agent_state.rot}")
+
+def run_benchmark(number: int) -> list[tuple[str, float, float]]:
+    map = generate_warehouse()
+    nodes = [Node(x_coord, y_coord) for y_coord in range(map.height) for x_coord in range(map.width)]
+    agent_states = [AgentState(node, rot) for node in nodes for rot in (0, 90, 180, 270)]
+    x_coord, y_coord = map.width // 2, map.height // 2
+    width, shared_nodes = map.width, map.nodes
+
+    def hash_nodes(hash_function):
+        return lambda: [hash_function(node) for node in nodes]
+
+    def hash_agent_states(hash_function):
+        return lambda: [hash_function(agent_state) for agent_state in agent_states]
+
+    def set_of_nodes(node_list):
+        return lambda: len(set(node_list))
+
+    # The four neighbour nodes of a search expansion, created as before or taken from the map
+    def create_neighbours():
+        return [Node(x_coord, y_coord), Node(x_coord, y_coord), Node(x_coord, y_coord), Node(x_coord + 1, y_coord)]
+
+    def shared_neighbours():
+        cell_id = y_coord * width + x_coord
+        return [shared_nodes[cell_id], shared_nodes[cell_id], shared_nodes[cell_id], shared_nodes[cell_id + 1]]
+
+    class LegacyNode(Node):
+        __hash__ = legacy_node_hash
+
+    legacy_nodes = [LegacyNode(node.x_coord, node.y_coord) for node in nodes]
+    cases = [
+        ("node hash", hash_nodes(legacy_node_hash), hash_nodes(hash)),
+        ("agent state hash", hash_agent_states(legacy_agent_state_hash), hash_agent_states(hash)),
+        ("set of all nodes", set_of_nodes(legacy_nodes), set_of_nodes(nodes)),
+        ("neighbour nodes", create_neighbours, shared_neighbours)
+    ]
+    return [(name, timeit(before, number=number), timeit(after, number=number)) for name, before, after in cases]
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.hashing", description="Compare the cost of hashing nodes and agent states before and after cell ids")
+    parser.add_argument("--number", type=int, default=200, help="repetitions of every case")
+    return parser.parse_args(argv)
+
+def main(argv: list[str] = None) -> int:
+    args = parse_args(argv)
+    for name, before, after in run_benchmark(args.number):
+        print(f"{name:18} before={before * 1000:8.2f}ms after={after * 1000:8.2f}ms speedup={before / after:5.1f}x", flush=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
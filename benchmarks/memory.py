@@ -0,0 +1,90 @@
+import argparse
+import sys
+import tracemalloc
+from random import Random
+
+from app.agents.components.agent_path import AgentPath
+from app.agents.components.agent_state import AgentState
+from app.components.environment.node import Node
+from app.components.environment.distance_oracle import FORWARD_OFFSETS
+from app.components.environment.warehouse import generate_warehouse
+
+# Value types as they were before they were slotted, kept for comparison
+
+class LegacyNode:
+
+    def __init__(self, x_coord: int, y_coord: int):
+        self.x_coord = x_coord
+        self.y_coord = y_coord
+
+class LegacyAgentState:
+
+    def __init__(self, node: LegacyNode, rot: int):
+        self.node = node
+        self.rot = rot
+
+def random_walk(map, num_timesteps: int, random: Random):
+    # Waits, turns and forward moves over passable cells, starting on a random non-task endpoint
+    start_node = random.choice(map.get_non_task_endpoints())
+    x_coord, y_coord, rot = start_node.x_coord, start_node.y_coord, random.choice([0, 90, 180, 270])
+    for _ in range(num_timesteps):
+        yield (x_coord, y_coord, rot)
+        move = random.random()
+        if move < 0.6:
+            x_offset, y_offset = FORWARD_OFFSETS[rot // 90]
+            if map.is_passable(x_coord + x_offset, y_coord + y_offset):
+                x_coord, y_coord = x_coord + x_offset, y_coord + y_offset
+        elif move < 0.9:
+            rot = (rot + random.choice([90, -90])) % 360
+
+def store_legacy_dict(steps):
+    return {timestep: LegacyAgentState(LegacyNode(x_coord, y_coord), rot) for timestep, (x_coord, y_coord, rot) in enumerate(steps)}
+
+def store_slotted_dict(steps):
+    return {timestep: AgentState(Node(x_coord, y_coord), rot) for timestep, (x_coord, y_coord, rot) in enumerate(steps)}
+
+def store_agent_path(steps):
+    agent_path = AgentPath()
+    for x_coord, y_coord, rot in steps:
+        agent_path.append(AgentState(Node(x_coord, y_coord), rot))
+    return agent_path
+
+STORAGES = {
+    "dict of plain objects": store_legacy_dict,
+    "dict of slotted objects": store_slotted_dict,
+    "AgentPath arrays": store_agent_path
+}
+
+def measure(store, map, num_agents: int, num_timesteps: int, seed: int) -> int:
+    # Bytes still allocated once the paths of every agent are built. The walks are generated step by step, and each agent
+    # walks with its own seeded random, so that every storage holds the same paths without keeping them in memory twice.
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    paths = [store(random_walk(map, num_timesteps, Random(f"{seed}:{agent_index}"))) for agent_index in range(num_agents)]
+    allocated = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del paths
+    return allocated
+
+def run_benchmark(num_agents: int, num_timesteps: int, seed: int) -> list[tuple[str, int]]:
+    map = generate_warehouse()
+    return [(name, measure(store, map, num_agents, num_timesteps, seed)) for name, store in STORAGES.items()]
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory", description="Measure the memory used by the paths of every agent")
+    parser.add_argument("--agents", type=int, default=100, help="number of agents")
+    parser.add_argument("--timesteps", type=int, default=50000, help="path length of every agent")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the walks")
+    return parser.parse_args(argv)
+
+def main(argv: list[str] = None) -> int:
+    args = parse_args(argv)
+    total_steps = args.agents * args.timesteps
+    # Every path is built and measured in full, nothing is extrapolated
+    print(f"measured {args.agents} agents x {args.timesteps} timesteps ({total_steps} stored steps)", flush=True)
+    for name, allocated in run_benchmark(args.agents, args.timesteps, args.seed):
+        print(f"{name:24} {allocated / total_steps:7.1f} bytes/step {allocated / 2 ** 20:9.1f} MiB", flush=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import argparse
+import sys
+from random import Random
+from timeit import timeit
+
+import numpy as np
+
+from app.agents.components.agent_state import AgentState
+from app.components.environment.spatial_index import SpatialIndex
+from app.components.environment.warehouse import generate_warehouse
+
+def run_benchmark(num_agents: int, num_tasks: int, shelf_rows: int, shelf_blocks: int, number: int, seed: int) -> list[tuple[str, float, float]]:
+    # Every agent looks up its nearest task pickup and its nearest free non-task endpoint
+    warehouse = generate_warehouse(shelf_rows=shelf_rows, shelf_blocks=shelf_blocks)
+    distance_oracle = warehouse.distance_oracle
+    # Tables are built up front, so that only the lookups are timed
+    distance_oracle.precompute()
+    random = Random(seed)
+    passable_nodes = [node for node in warehouse.nodes if warehouse.is_passable(node.x_coord, node.y_coord)]
+    agent_states = [AgentState(random.choice(passable_nodes), random.choice([0, 90, 180, 270])) for _ in range(num_agents)]
+    pickup_nodes = [random.choice(warehouse.get_task_endpoints()) for _ in range(num_tasks)]
+    endpoints = warehouse.get_non_task_endpoints()
+    task_index, endpoint_index = SpatialIndex(), SpatialIndex()
+    for task_id, node in enumerate(pickup_nodes):
+        task_index.add(task_id, node, node.x_coord, node.y_coord)
+    for order, node in enumerate(endpoints):
+        endpoint_index.add(order, node, node.x_coord, node.y_coord)
+
+    def linear_scan(nodes):
+        # As the agents chose before, the argmin of the travel time to every candidate
+        return lambda: [nodes[np.argmin(list(map(lambda node: distance_oracle.distance(agent_state, node), nodes)))] for agent_state in agent_states]
+
+    def indexed(index):
+        return lambda: [index.nearest(agent_state.node.x_coord, agent_state.node.y_coord, lambda node: distance_oracle.distance(agent_state, node)) for agent_state in agent_states]
+
+    cases = [
+        ("nearest task", linear_scan(pickup_nodes), indexed(task_index)),
+        ("nearest endpoint", linear_scan(endpoints), indexed(endpoint_index))
+    ]
+    for _, before, after in cases:
+        if [[node] for node in before()] != after():
+            raise AssertionError("The spatial index chose different nodes than the linear scan!")
+    return [(name, timeit(before, number=number), timeit(after, number=number)) for name, before, after in cases]
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.spatial_index", description="Compare nearest task and endpoint lookups by linear scan and by spatial index")
+    parser.add_argument("--agents", type=int, default=300, help="number of agents looking up their nearest task and endpoint")
+    parser.add_argument("--tasks", type=int, default=1000, help="number of unassigned tasks")
+    parser.add_argument("--shelf-rows", type=int, default=10, help="rows of shelves in the generated warehouse")
+    parser.add_argument("--shelf-blocks", type=int, default=4, help="blocks of shelves side by side in the generated warehouse")
+    parser.add_argument("--number", type=int, default=5, help="repetitions of every case")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the agents and tasks")
+    return parser.parse_args(argv)
+
+def main(argv: list[str] = None) -> int:
+    args = parse_args(argv)
+    for name, before, after in run_benchmark(args.agents, args.tasks, args.shelf_rows, args.shelf_blocks, args.number, args.seed):
+        print(f"{name:18} linear={before * 1000:8.2f}ms indexed={after * 1000:8.2f}ms speedup={before / after:5.1f}x", flush=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import argparse
+import json
+import statistics
+import sys
+from itertools import product
+from time import perf_counter
+
+from app.start import App
+from app.run import AGENT_CLASSES
+
+# Metrics compared against a baseline - a higher value counts as a regression
+COMPARED_METRICS = ["iterate_mean", "search_mean", "expansions_mean", "assign_mean"]
+
+def run_benchmark(algorithm: str, num_agents: int, num_tasks_per_timestep: float, seed: int, max_timestep: int) -> dict:
+    num_tasks = max(1, int(num_tasks_per_timestep * max_timestep))
+    app = App(agent_class=AGENT_CLASSES[algorithm], num_agents=num_agents, num_tasks=num_tasks, num_tasks_per_timestep=num_tasks_per_timestep, seed=seed)
+    system = app.system
+    # Build the heuristic tables up front so that the first searches are not charged for them
+    app.map.distance_oracle.precompute()
+    stats = system.enable_stats()
+    iterate_times = []
+    while system.timestep < max_timestep and not system.is_completed():
+        start_time = perf_counter()
+        system.iterate()
+        iterate_times.append(perf_counter() - start_time)
+    # Agent_Central assigns the tasks at most once per timestep
+    assign_times = [values["assign_tasks_time"] for values in stats.timesteps.values() if "assign_tasks_time" in values]
+    return {
+        "algorithm": algorithm,
+        "agents": num_agents,
+        "rate": num_tasks_per_timestep,
+        "seed": seed,
+        "timesteps": system.timestep,
+        "tasks_delivered": sum(1 for task in system.tasks if task.delivery_time is not None and task.delivery_time <= system.timestep),
+        "search_cache_hits": system.search_cache.hits,
+        "search_cache_misses": system.search_cache.misses,
+        **summarize_samples("iterate", iterate_times),
+        **summarize_samples("search", [search[1] for search in stats.searches]),
+        **summarize_samples("expansions", [search[2] for search in stats.searches]),
+        **summarize_samples("assign", assign_times)
+    }
+
+def summarize_samples(name: str, samples: list[float]) -> dict:
+    if not samples:
+        return {f"{name}_count": 0, f"{name}_total": 0, f"{name}_mean": None, f"{name}_p95": None, f"{name}_max": None}
+    ordered = sorted(samples)
+    return {
+        f"{name}_count": len(samples),
+        f"{name}_total": sum(samples),
+        f"{name}_mean": statistics.fmean(samples),
+        f"{name}_p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        f"{name}_max": ordered[-1]
+    }
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    baseline_rows = {row_key(row): row for row in baseline}
+    regressions = []
+    for row in results:
+        baseline_row = baseline_rows.get(row_key(row))
+        if baseline_row is None:
+            continue
+        for metric in COMPARED_METRICS:
+            curr_value, baseline_value = row.get(metric), baseline_row.get(metric)
+            if curr_value is None or not baseline_value:
+                continue
+            if curr_value > baseline_value * (1 + tolerance):
+                regressions.append(f"{row_key(row)} {metric}: {baseline_value:.6g} -> {curr_value:.6g} (+{curr_value / baseline_value - 1:.0%})")
+    return regressions
+
+def row_key(row: dict) -> tuple:
+    return (row["algorithm"], row["agents"], row["rate"], row["seed"])
+
+def parse_list(value: str, cast) -> list:
+    return [cast(item) for item in value.split(",") if item]
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="Benchmark the MAPD planners across fleet sizes and task frequencies")
+    parser.add_argument("--algorithms", type=lambda value: parse_list(value, str), default=list(AGENT_CLASSES.keys()), help="comma separated agent algorithms")
+    parser.add_argument("--agents", type=lambda value: parse_list(value, int), default=[5, 25, 50, 100, 150], help="comma separated agent counts")
+    parser.add_argument("--rates", type=lambda value: parse_list(value, float), default=[0.5, 1.0, 2.0], help="comma separated tasks released per timestep")
+    parser.add_argument("--seeds", type=lambda value: parse_list(value, int), default=[0], help="comma separated seeds")
+    parser.add_argument("--max-timestep", type=int, default=200, help="timesteps simulated per run")
+    parser.add_argument("--output", default=None, help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=None, help="compare against results previously written with --output")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="relative slowdown allowed before a metric counts as a regression")
+    return parser.parse_args(argv)
+
+def main(argv: list[str] = None) -> int:
+    args = parse_args(argv)
+    unknown = [algorithm for algorithm in args.algorithms if algorithm not in AGENT_CLASSES]
+    if unknown:
+        raise ValueError(f"Unknown algorithms: {', '.join(unknown)}")
+    results = []
+    for algorithm, num_agents, rate, seed in product(args.algorithms, args.agents, args.rates, args.seeds):
+        row = run_benchmark(algorithm, num_agents, rate, seed, args.max_timestep)
+        results.append(row)
+        print(f"{algorithm:8} agents={num_agents:<4} rate={rate:<5} seed={seed:<3} iterate={row['iterate_mean'] * 1000:8.2f}ms "
+              f"search={(row['search_mean'] or 0) * 1000:7.2f}ms expansions={row['expansions_mean'] or 0:8.1f} "
+              f"assign={(row['assign_mean'] or 0) * 1000:7.2f}ms delivered={row['tasks_delivered']}", flush=True)
+    report = {"config": {"max_timestep": args.max_timestep}, "results": results}
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline["config"] != report["config"]:
+            print(f"Warning: baseline was recorded with {baseline['config']}, this run used {report['config']}")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
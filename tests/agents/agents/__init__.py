@@ -1 +1,3 @@
-from .test_agent_tp import *
\ No newline at end of file
+from .test_agent_tp import *
+from .test_agent_central import *
+from .test_agent_tpts import *
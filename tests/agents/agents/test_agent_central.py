@@ -0,0 +1,113 @@
+import unittest
+from unittest.mock import patch
+from app.agents import Agent_Central, AgentState
+from app.components import Map, Node, Task
+from app.components.environment.node_state import NodeStatus, NODE_STATUS_CODES
+from app.components.system import System
+
+class TestAgentCentral(unittest.TestCase):
+
+    def setUp(self):
+        Agent_Central.reset_id_counter()
+        Task.reset_id_counter()
+        self.task = Task(Node(4, 0), Node(2, 0), 0)
+        self.agents = [Agent_Central(AgentState(Node(0, 0), 90)), Agent_Central(AgentState(Node(6, 0), 270))]
+
+    def create_system(self, second_row: list[str]) -> System:
+        map = Map.from_status_grid([
+            ["NON_TASK_ENDPOINT", "FREE", "TASK_ENDPOINT", "FREE", "TASK_ENDPOINT", "FREE", "NON_TASK_ENDPOINT"],
+            second_row
+        ])
+        system = System(map, [self.task], self.agents)
+        system.timestep = 1
+        return system
+
+    def test_window_settings(self):
+        agent = Agent_Central(AgentState(Node(0, 0), 90), window=4)
+        self.assertEqual(agent.replan_interval, 4)
+        with self.assertRaises(ValueError):
+            Agent_Central(AgentState(Node(0, 0), 90), window=0)
+        with self.assertRaises(ValueError):
+            Agent_Central(AgentState(Node(0, 0), 90), window=2, replan_interval=3)
+        with self.assertRaises(ValueError):
+            Agent_Central(AgentState(Node(0, 0), 90), replan_interval=3)
+
+    def test_get_distances(self):
+        system = self.create_system(["FREE"] * 7)
+        distances = self.agents[0].get_distances(system, [0, 1], [Node(4, 0), Node(0, 0)])
+        self.assertEqual(distances.tolist(), [[4, 2], [0, 6]])
+
+    def test_nearest_agent_assigned_to_task(self):
+        system = self.create_system(["NON_TASK_ENDPOINT"] + ["FREE"] * 6)
+        assignment = self.agents[0].assign_tasks(system)
+        self.assertEqual(assignment[1], ("Task", self.task))
+        self.assertEqual(assignment[0], ("Idle", Node(0, 1)))
+
+    def test_unreachable_task_left_unassigned(self):
+        system = self.create_system(["FREE"] * 7)
+        system.map.grid[0, 3] = system.map.grid[1, 3] = NODE_STATUS_CODES[NodeStatus.OBSTACLE]
+        system.map.refresh()
+        self.agents[0].plan_path_for_task(self.task, system)
+        self.assertIsNone(self.task.assigned_agent)
+        self.assertIsNone(self.task.delivery_time)
+        self.assertEqual(self.agents[0].path.get_state(1), self.agents[0].state)
+
+    def test_unreachable_task_not_assigned(self):
+        map = Map.from_status_grid([
+            ["NON_TASK_ENDPOINT", "FREE", "FREE", "FREE", "FREE", "OBSTACLE", "TASK_ENDPOINT"],
+            ["FREE", "FREE", "FREE", "FREE", "NON_TASK_ENDPOINT", "OBSTACLE", "TASK_ENDPOINT"]
+        ])
+        task = Task(Node(6, 0), Node(6, 1), 0)
+        agents = [Agent_Central(AgentState(Node(2, 0), 270)), Agent_Central(AgentState(Node(1, 0), 90))]
+        system = System(map, [task], agents)
+        system.timestep = 1
+        assignment = agents[0].assign_tasks(system)
+        # Both agents are 5 timesteps from Node(4, 1), so the agent nearer to Node(0, 0) takes it
+        self.assertEqual(assignment, {agents[0].id: ("Idle", Node(0, 0)), agents[1].id: ("Idle", Node(4, 1))})
+
+    def test_replanned_agent_gives_up_its_task(self):
+        system = self.create_system(["NON_TASK_ENDPOINT"] + ["FREE"] * 6)
+        self.agents[0].plan_path_for_task(self.task, system)
+        self.assertEqual(self.task.assigned_agent, 0)
+        self.agents[0].plan_paths({0: ("Idle", Node(0, 1))}, system)
+        self.assertIsNone(self.task.assigned_agent)
+        self.assertEqual(system.get_not_assigned_tasks(), [self.task])
+        self.assertEqual(self.agents[0].path.last_state.node, Node(0, 1))
+
+    def test_agent_waits_without_free_endpoint(self):
+        system = self.create_system(["FREE"] * 7)
+        assignment = self.agents[0].assign_tasks(system)
+        self.assertEqual(assignment[1], ("Task", self.task))
+        self.assertEqual(assignment[0], ("Idle", Node(0, 0)))
+
+class TestAgentCentralIncremental(unittest.TestCase):
+
+    def setUp(self):
+        Agent_Central.reset_id_counter()
+        Task.reset_id_counter()
+        map = Map.from_status_grid([
+            ["NON_TASK_ENDPOINT", "FREE", "TASK_ENDPOINT", "FREE", "TASK_ENDPOINT", "FREE", "NON_TASK_ENDPOINT"],
+            ["NON_TASK_ENDPOINT"] + ["FREE"] * 6
+        ])
+        self.task = Task(Node(4, 0), Node(2, 0), 3)
+        self.agents = [Agent_Central(AgentState(Node(0, 0), 90), incremental=True), Agent_Central(AgentState(Node(6, 0), 270), incremental=True)]
+        self.system = System(map, [self.task], self.agents)
+
+    def test_reassigns_only_on_changes(self):
+        with patch.object(Agent_Central, "assign_tasks", autospec=True, side_effect=Agent_Central.assign_tasks) as assign_tasks:
+            for _ in range(3):
+                self.system.iterate()
+            self.assertEqual(assign_tasks.call_count, 1)
+            self.system.iterate()
+            self.assertEqual(assign_tasks.call_count, 2)
+        self.assertEqual(self.task.assigned_agent, 1)
+
+    def test_idle_agents_keep_their_endpoints(self):
+        for _ in range(2):
+            self.system.iterate()
+        self.assertEqual(self.agents[0].path.path[2].node, Node(0, 0))
+        self.assertEqual(self.agents[1].path.path[2].node, Node(6, 0))
+        self.assertTrue(self.system.reservations.is_vertex_reserved(Node(0, 0), 2))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,15 @@
 import unittest
 from app.agents import Agent_TP, AgentState
-from app.components import Node
+from app.components import Map, Node, Task
+from app.components.system import System
 
 class TestAgentTP(unittest.TestCase):
 
     def setUp(self):
-        node = Node(4, 9)
+        Agent_TP.reset_id_counter()
+        Task.reset_id_counter()
+        self.map = Map.from_status_grid([["NON_TASK_ENDPOINT", "FREE", "TASK_ENDPOINT", "FREE", "TASK_ENDPOINT"]])
+        node = Node(0, 0)
         rot = 90
         self.starting_state = AgentState(node, rot)
 
@@ -13,16 +17,51 @@ class TestAgentTP(unittest.TestCase):
         agent = Agent_TP(self.starting_state)
         self.assertEqual(agent.state, self.starting_state)
 
-    def test_move_valid_timestamp(self):
+    def test_idle_agent_waits_in_place(self):
         agent = Agent_TP(self.starting_state)
-        agent.move(1)
-        self.assertEqual(agent.state, self.starting_state)
+        system = System(self.map, [], [agent])
+        system.iterate()
+        self.assertEqual(agent.path.end_timestep, 1)
+        self.assertEqual(agent.path.get_state(1), self.starting_state)
+
+    def test_agent_takes_nearest_task(self):
+        agent = Agent_TP(self.starting_state)
+        task = Task(Node(2, 0), Node(4, 0), 0)
+        system = System(self.map, [task], [agent])
+        system.iterate()
+        self.assertEqual(task.assigned_agent, agent.id)
+        self.assertEqual(task.pickup_time, 2)
+        self.assertEqual(task.delivery_time, 4)
+        self.assertEqual(agent.path.get_state(task.pickup_time).node, task.pickup_node)
+        self.assertEqual(agent.path.last_state.node, task.delivery_node)
+        while not system.is_completed():
+            system.iterate()
+        self.assertEqual(system.timestep, 4)
+
+    def test_unreachable_task_left_unassigned(self):
+        map = Map.from_status_grid([["NON_TASK_ENDPOINT", "FREE", "OBSTACLE", "TASK_ENDPOINT", "TASK_ENDPOINT"]])
+        agent = Agent_TP(self.starting_state)
+        task = Task(Node(3, 0), Node(4, 0), 0)
+        system = System(map, [task], [agent])
+        system.iterate()
+        self.assertIsNone(task.assigned_agent)
+        self.assertIsNone(task.delivery_time)
+        self.assertEqual(agent.path.get_state(1), self.starting_state)
 
-    def test_move_invalid_timestamp(self):
+    def test_agent_takes_next_task_when_nearest_fails(self):
+        map = Map.from_status_grid([
+            ["NON_TASK_ENDPOINT", "FREE", "TASK_ENDPOINT", "OBSTACLE", "TASK_ENDPOINT"],
+            ["TASK_ENDPOINT", "FREE", "TASK_ENDPOINT", "OBSTACLE", "OBSTACLE"]
+        ])
         agent = Agent_TP(self.starting_state)
-        next_timestamp = 2
-        with self.assertRaises(NotImplementedError):
-            agent.move(next_timestamp)
+        # The nearest pickup is reachable, but its delivery is not
+        nearest_task = Task(Node(2, 0), Node(4, 0), 0)
+        next_task = Task(Node(2, 1), Node(0, 1), 0)
+        system = System(map, [nearest_task, next_task], [agent])
+        system.iterate()
+        self.assertIsNone(nearest_task.assigned_agent)
+        self.assertEqual(next_task.assigned_agent, agent.id)
+        self.assertEqual(agent.path.last_state.node, next_task.delivery_node)
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from app.agents import Agent_TPTS, AgentState
+from app.components import Map, Node, Task
+from app.components.system import System
+
+class TestAgentTPTS(unittest.TestCase):
+
+    def setUp(self):
+        Agent_TPTS.reset_id_counter()
+        Task.reset_id_counter()
+        self.map = Map.from_status_grid([["NON_TASK_ENDPOINT", "FREE", "FREE", "FREE", "FREE", "TASK_ENDPOINT", "FREE", "TASK_ENDPOINT", "NON_TASK_ENDPOINT"]])
+        self.task = Task(Node(7, 0), Node(5, 0), 0)
+
+    def test_closer_agent_steals_task(self):
+        # The far agent moves first and takes the task, then the closer agent takes it over
+        agents = [Agent_TPTS(AgentState(Node(0, 0), 90)), Agent_TPTS(AgentState(Node(8, 0), 270))]
+        system = System(self.map, [self.task], agents)
+        system.iterate()
+        self.assertEqual(self.task.assigned_agent, 1)
+        self.assertIs(agents[1].task, self.task)
+        self.assertEqual(self.task.delivery_time, agents[1].path.end_timestep)
+        self.assertEqual(agents[1].path.get_state(self.task.pickup_time).node, self.task.pickup_node)
+        # The robbed agent does not take the task back, and waits as there is nothing else to do
+        self.assertEqual(agents[0].path.end_timestep, 1)
+        self.assertEqual(agents[0].path.last_state.node, Node(0, 0))
+        while not system.is_completed():
+            system.iterate()
+        self.assertEqual(system.timestep, self.task.delivery_time)
+
+    def test_slower_agent_does_not_steal(self):
+        agents = [Agent_TPTS(AgentState(Node(8, 0), 270)), Agent_TPTS(AgentState(Node(0, 0), 90))]
+        system = System(self.map, [self.task], agents)
+        system.iterate()
+        self.assertEqual(self.task.assigned_agent, 0)
+        self.assertEqual(agents[1].path.end_timestep, 1)
+
+if __name__ == '__main__':
+    unittest.main()
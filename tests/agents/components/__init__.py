@@ -1 +1,3 @@
 from .test_state import *
+from .test_agent_path import *
+from .search import *
@@ -0,0 +1 @@
+from .test_a_star_search import *
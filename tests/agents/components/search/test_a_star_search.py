@@ -0,0 +1,66 @@
+import unittest
+from app.components import Map, Node
+from app.components.system import System
+from app.agents import AgentPath, AgentState
+from app.agents.components.search.a_star_search import A_Star_Search
+
+class TestAStarSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.map = Map.from_status_grid([
+            ["FREE", "FREE", "FREE", "FREE"],
+            ["FREE", "OBSTACLE", "OBSTACLE", "FREE"],
+            ["FREE", "FREE", "FREE", "FREE"]
+        ])
+        self.system = System(self.map, [], [])
+        self.a_star = A_Star_Search(self.system)
+
+    def test_straight_path(self):
+        path = self.a_star.search(1, AgentState(Node(0, 0), 90), Node(3, 0))
+        self.assertEqual(sorted(path.path.keys()), [0, 1, 2, 3])
+        self.assertEqual(path.path[3], AgentState(Node(3, 0), 90))
+
+    def test_path_includes_turns(self):
+        path = self.a_star.search(1, AgentState(Node(0, 0), 0), Node(0, 2))
+        self.assertEqual(max(path.path.keys()), 4)
+        self.assertEqual(path.path[4].node, Node(0, 2))
+
+    def test_waits_for_reserved_cell(self):
+        other_path = AgentPath({1: AgentState(Node(1, 0), 0), 2: AgentState(Node(1, 0), 0)})
+        self.system.reservations.reserve_path(1, other_path, 1)
+        path = self.a_star.search(1, AgentState(Node(0, 0), 90), Node(2, 0))
+        for timestep, agent_state in path.path.items():
+            self.assertFalse(timestep in other_path.path and agent_state.node == other_path.path[timestep].node)
+        self.assertEqual(path.path[max(path.path.keys())].node, Node(2, 0))
+
+    def test_window_ignores_later_conflicts(self):
+        other_path = AgentPath({2: AgentState(Node(2, 0), 0)})
+        self.system.reservations.reserve_path(1, other_path, 2)
+        self.system.timestep = 1
+        path = A_Star_Search(self.system, window=1).search(1, AgentState(Node(0, 0), 90), Node(3, 0))
+        self.assertEqual(path.path[2].node, Node(2, 0))
+        path = A_Star_Search(self.system, window=2).search(1, AgentState(Node(0, 0), 90), Node(3, 0))
+        self.assertNotEqual(path.path[2].node, Node(2, 0))
+
+    def test_search_counters(self):
+        self.a_star.search(1, AgentState(Node(0, 0), 90), Node(3, 0))
+        self.assertEqual(self.a_star.expansions, 3)
+        self.assertGreaterEqual(self.a_star.generated, self.a_star.expansions)
+
+    def test_unreachable_goal(self):
+        self.assertIsNone(self.a_star.search(1, AgentState(Node(0, 0), 90), Node(1, 1)))
+
+    def test_no_path_through_conflicts(self):
+        # Both the agent's cell and the cell ahead of it are taken at the next timestep
+        self.system.reservations.reserve_path(1, AgentPath({1: AgentState(Node(0, 0), 0)}), 1)
+        self.system.reservations.reserve_path(2, AgentPath({1: AgentState(Node(1, 0), 0)}), 1)
+        self.assertIsNone(self.a_star.search(1, AgentState(Node(0, 0), 90), Node(3, 0)))
+        self.assertTrue(self.a_star.conflict_fallback)
+        self.assertIsNone(self.a_star.search(1, AgentState(Node(0, 0), 90), Node(3, 0)))
+        self.assertTrue(self.a_star.cached)
+        self.assertEqual(self.system.conflict_fallbacks, 2)
+        self.assertIsNotNone(self.a_star.search(2, AgentState(Node(0, 0), 90), Node(3, 0)))
+        self.assertFalse(self.a_star.conflict_fallback)
+
+if __name__ == '__main__':
+    unittest.main()
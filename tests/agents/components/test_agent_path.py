@@ -0,0 +1,94 @@
+import gc
+import tracemalloc
+import unittest
+from app.components import Map, Node
+from app.agents import AgentPath, AgentState
+
+class TestAgentPath(unittest.TestCase):
+
+    def setUp(self):
+        self.states = [AgentState(Node(x_coord, 2), 90) for x_coord in range(4)]
+        self.path = AgentPath({timestep + 3: state for timestep, state in enumerate(self.states)})
+
+    def test_path_creation(self):
+        self.assertEqual(self.path.start_timestep, 3)
+        self.assertEqual(self.path.end_timestep, 6)
+        self.assertEqual(self.path.last_state, self.states[-1])
+        self.assertEqual(list(self.path.path.keys()), [3, 4, 5, 6])
+        self.assertEqual(self.path.path[4], self.states[1])
+        self.assertNotIn(7, self.path.path)
+
+    def test_states_use_map_nodes(self):
+        map = Map.from_status_grid([["FREE"] * 4] * 3)
+        path = AgentPath(map=map)
+        path += self.path
+        self.assertIs(path.get_state(4).node, map.get_node(1, 2))
+        self.assertIs(path.clone().get_state(5).node, map.get_node(2, 2))
+        self.assertIsNot(self.path.get_state(4).node, self.path.get_state(4).node)
+
+    def test_reading_states_keeps_memory_flat(self):
+        # Nothing read from the paths of a map outlives the map and its paths
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        for width in (50, 80):
+            map = Map.from_status_grid([["FREE"] * width] * width)
+            path = AgentPath.from_states(0, [AgentState(Node(timestep % width, timestep // width), 0) for timestep in range(width * width)], map)
+            states = [path.get_state(timestep) for timestep in path.path]
+            del map, path, states
+            gc.collect()
+            retained = tracemalloc.get_traced_memory()[0] - baseline
+            self.assertLess(retained, 64 * 1024)
+        tracemalloc.stop()
+
+    def test_non_contiguous_path(self):
+        with self.assertRaises(ValueError):
+            AgentPath({0: self.states[0], 2: self.states[1]})
+
+    def test_concatenation_overwrites_overlap(self):
+        other = AgentPath({6: AgentState(Node(3, 2), 180), 7: AgentState(Node(3, 3), 180)})
+        self.path += other
+        self.assertEqual(self.path.end_timestep, 7)
+        self.assertEqual(self.path.path[6].rot, 180)
+        self.assertEqual(self.path.path[5], self.states[2])
+
+    def test_concatenation_with_gap(self):
+        with self.assertRaises(ValueError):
+            self.path += AgentPath({8: self.states[0]})
+
+    def test_concatenation_requires_path(self):
+        with self.assertRaises(TypeError):
+            self.path += None
+
+    def test_truncate(self):
+        self.path.truncate(5)
+        self.assertEqual(self.path.end_timestep, 4)
+        del self.path.path[4]
+        self.assertEqual(self.path.end_timestep, 3)
+        with self.assertRaises(ValueError):
+            self.path.path[5] = self.states[0]
+
+    def test_clone_is_independent(self):
+        clone = self.path.clone()
+        clone += AgentPath({7: AgentState(Node(4, 2), 90)})
+        self.path += AgentPath({7: AgentState(Node(3, 3), 180)})
+        clone.path[3] = AgentState(Node(0, 3), 0)
+        self.assertEqual(clone.path[7].node, Node(4, 2))
+        self.assertEqual(self.path.path[7].node, Node(3, 3))
+        self.assertEqual(self.path.path[3], self.states[0])
+        self.path.truncate(4)
+        self.assertEqual(clone.end_timestep, 7)
+        self.assertEqual(clone.path[5], self.states[2])
+
+    def test_addition_leaves_original_unchanged(self):
+        new_path = self.path + AgentPath({7: AgentState(Node(4, 2), 90)})
+        self.assertEqual(new_path.end_timestep, 7)
+        self.assertEqual(self.path.end_timestep, 6)
+
+    def test_discard_before(self):
+        self.path.discard_before(5)
+        self.assertEqual(self.path.start_timestep, 5)
+        self.assertEqual(self.path.path[5], self.states[2])
+        self.assertNotIn(4, self.path.path)
+
+if __name__ == '__main__':
+    unittest.main()
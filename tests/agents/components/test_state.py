@@ -13,5 +13,13 @@ class TestState(unittest.TestCase):
         self.assertEqual(state.node, self.test_node)
         self.assertEqual(state.rot, rot)
 
+    def test_state_ordering(self):
+        states = [AgentState(Node(4, 9), 180), AgentState(Node(5, 2), 0), AgentState(Node(4, 9), 90)]
+        self.assertEqual(sorted(states), [AgentState(Node(5, 2), 0), AgentState(Node(4, 9), 90), AgentState(Node(4, 9), 180)])
+        self.assertLess(AgentState(Node(4, 9), 90), AgentState(Node(4, 9), 180))
+        self.assertGreaterEqual(AgentState(Node(4, 9), 90), AgentState(Node(4, 9), 90))
+        with self.assertRaises(TypeError):
+            AgentState(self.test_node, 90) < self.test_node
+
 if __name__ == '__main__':
     unittest.main()
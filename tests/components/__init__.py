@@ -1,2 +1,3 @@
 from .environment import *
+from .system import *
 from .task import *
@@ -1 +1,6 @@
 from .test_node import *
+from .test_map import *
+from .test_distance_oracle import *
+from .test_warehouse import *
+from .test_map_loader import *
+from .test_spatial_index import *
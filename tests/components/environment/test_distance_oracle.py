@@ -0,0 +1,39 @@
+import unittest
+from app.components import Map, Node, UNREACHABLE
+from app.agents import AgentState
+
+class TestDistanceOracle(unittest.TestCase):
+
+    def setUp(self):
+        self.map = Map.from_status_grid([
+            ["FREE", "FREE", "FREE", "FREE"],
+            ["FREE", "OBSTACLE", "OBSTACLE", "FREE"],
+            ["TASK_ENDPOINT", "FREE", "FREE", "NON_TASK_ENDPOINT"],
+            ["OBSTACLE", "OBSTACLE", "OBSTACLE", "OBSTACLE"]
+        ])
+        self.map.create_node(x_coord=5, y_coord=0, node_status="FREE")
+        self.oracle = self.map.distance_oracle
+
+    def test_distance_at_target(self):
+        self.assertEqual(self.oracle.distance(AgentState(Node(0, 2), 270), Node(0, 2)), 0)
+
+    def test_distance_counts_turns(self):
+        self.assertEqual(self.oracle.distance(AgentState(Node(0, 0), 90), Node(3, 0)), 3)
+        self.assertEqual(self.oracle.distance(AgentState(Node(0, 0), 270), Node(3, 0)), 5)
+
+    def test_distance_around_obstacles(self):
+        # Down the left column, turn, then along the bottom row
+        self.assertEqual(self.oracle.distance(AgentState(Node(0, 0), 180), Node(3, 2)), 6)
+
+    def test_unreachable_target(self):
+        self.assertEqual(self.oracle.distance(AgentState(Node(0, 0), 90), Node(5, 0)), UNREACHABLE)
+        self.assertEqual(self.oracle.distance(AgentState(Node(0, 0), 90), Node(1, 1)), UNREACHABLE)
+
+    def test_precompute_endpoints(self):
+        self.oracle.precompute()
+        table = self.oracle.get_table(Node(3, 2))
+        self.assertEqual(table.shape, (4, self.map.height, self.map.width))
+        self.assertIs(self.oracle.get_table(Node(3, 2)), table)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from app.components import Map, Node, NodeStatus
+
+class TestMap(unittest.TestCase):
+
+    def setUp(self):
+        self.map = Map.from_status_grid([
+            ["FREE", "TASK_ENDPOINT", "OBSTACLE"],
+            ["NON_TASK_ENDPOINT", "FREE", "TASK_ENDPOINT"]
+        ])
+
+    def test_map_dimensions(self):
+        self.assertEqual(self.map.width, 3)
+        self.assertEqual(self.map.height, 2)
+
+    def test_passable_cells(self):
+        self.assertTrue(self.map.is_passable(0, 0))
+        self.assertFalse(self.map.is_passable(2, 0))
+        self.assertFalse(self.map.is_passable(3, 0))
+        self.assertFalse(self.map.is_passable(0, -1))
+
+    def test_endpoints(self):
+        self.assertEqual(self.map.get_task_endpoints(), [Node(1, 0), Node(2, 1)])
+        self.assertEqual(self.map.get_non_task_endpoints(), [Node(0, 1)])
+        self.assertEqual(self.map.task_endpoints.tolist(), [[1, 0], [2, 1]])
+
+    def test_cell_ids(self):
+        self.assertEqual(self.map.cell_id(2, 1), 5)
+        node = self.map.get_node(2, 1)
+        self.assertEqual(node, Node(2, 1))
+        self.assertIs(self.map.get_node_by_id(5), node)
+        self.assertIs(self.map.get_task_endpoints()[1], node)
+        with self.assertRaises(ValueError):
+            self.map.get_node(3, 0)
+
+    def test_env_view(self):
+        node_state = self.map.env[(2, 0)]
+        self.assertEqual(node_state.node, Node(2, 0))
+        self.assertEqual(node_state.node_status, NodeStatus.OBSTACLE.value)
+        self.assertEqual(len(self.map.env), 6)
+        self.assertNotIn((3, 0), self.map.env)
+
+    def test_create_node_grows_map(self):
+        map = Map()
+        map.create_node(x_coord=2, y_coord=1, node_status="TASK_ENDPOINT")
+        self.assertEqual((map.width, map.height), (3, 2))
+        self.assertFalse(map.is_passable(0, 0))
+        self.assertEqual(map.get_task_endpoints(), [Node(2, 1)])
+
+    def test_create_existing_node(self):
+        with self.assertRaises(ValueError) as context:
+            self.map.create_node(x_coord=0, y_coord=0, node_status="FREE")
+        self.assertEqual(str(context.exception), "Node at coordinates (0, 0) already exists!")
+
+if __name__ == '__main__':
+    unittest.main()
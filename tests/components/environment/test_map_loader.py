@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from random import Random
+from app.components import Map, Node, load_movingai_map, parse_movingai_map, annotate_endpoints
+
+MAP_CONTENT = """type octile
+height 3
+width 4
+map
+.e@r
+..@.
+T...
+"""
+
+class TestMapLoader(unittest.TestCase):
+
+    def test_parse_map(self):
+        map = parse_movingai_map(MAP_CONTENT)
+        self.assertEqual((map.width, map.height), (4, 3))
+        self.assertEqual(map.get_task_endpoints(), [Node(1, 0)])
+        self.assertEqual(map.get_non_task_endpoints(), [Node(3, 0)])
+        self.assertFalse(map.is_passable(2, 1))
+        self.assertFalse(map.is_passable(0, 2))
+        self.assertTrue(map.is_passable(3, 2))
+
+    def test_load_map_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "test.map")
+            with open(file_path, "w") as map_file:
+                map_file.write(MAP_CONTENT)
+            map = load_movingai_map(file_path)
+        self.assertEqual(map.grid.tolist(), parse_movingai_map(MAP_CONTENT).grid.tolist())
+
+    def test_invalid_maps(self):
+        with self.assertRaises(ValueError):
+            parse_movingai_map("type octile\nmap\n....\n")
+        with self.assertRaises(ValueError):
+            parse_movingai_map("type octile\nheight 2\nwidth 4\nmap\n....\n")
+        with self.assertRaises(ValueError):
+            parse_movingai_map("type octile\nheight 1\nwidth 4\nmap\n..x.\n")
+
+    def test_annotate_endpoints(self):
+        map = parse_movingai_map(MAP_CONTENT, num_task_endpoints=3, num_non_task_endpoints=2, random=Random(1))
+        self.assertEqual(len(map.get_task_endpoints()), 4)
+        self.assertEqual(len(map.get_non_task_endpoints()), 3)
+        same_map = parse_movingai_map(MAP_CONTENT, num_task_endpoints=3, num_non_task_endpoints=2, random=Random(1))
+        self.assertEqual(map.grid.tolist(), same_map.grid.tolist())
+
+    def test_annotate_endpoints_in_largest_area(self):
+        map = Map.from_status_grid([
+            ["FREE", "OBSTACLE", "FREE", "FREE"],
+            ["OBSTACLE", "OBSTACLE", "FREE", "FREE"]
+        ])
+        annotate_endpoints(map, 2, 2, Random(0))
+        self.assertTrue(all(node.x_coord >= 2 for node in map.get_task_endpoints() + map.get_non_task_endpoints()))
+        with self.assertRaises(ValueError):
+            annotate_endpoints(map, 1, 0)
@@ -21,9 +21,25 @@ class TestNode(unittest.TestCase):
     def test_node_equality_with_non_node(self):
         node = Node(10, 20)
         non_node = (10, 20)
-        with self.assertRaises(TypeError) as context:
-            node == non_node
-        self.assertEqual(str(context.exception), "Cannot compare 'Node' with 'tuple'")
+        self.assertNotEqual(node, non_node)
+        self.assertIn(node, [non_node, None, Node(10, 20)])
+        with self.assertRaises(TypeError):
+            node < non_node
+
+    def test_node_ordering(self):
+        self.assertEqual(sorted([Node(1, 1), Node(2, 0), Node(0, 1)]), [Node(2, 0), Node(0, 1), Node(1, 1)])
+        self.assertLessEqual(Node(3, 4), Node(3, 4))
+
+    def test_node_has_no_instance_dict(self):
+        with self.assertRaises(AttributeError):
+            Node(10, 20).z_coord = 0
+
+    def test_node_hash(self):
+        self.assertEqual(hash(Node(10, 20)), hash(Node(10, 20)))
+        self.assertEqual(len({Node(0, y_coord) for y_coord in range(50)} | {Node(x_coord, 0) for x_coord in range(50)}), 99)
+        # Wider than 65536 cells, and negative coordinates of nodes just outside the map
+        self.assertNotEqual(hash(Node(70000, 0)), hash(Node(70000 - 65536, 1)))
+        self.assertNotEqual(hash(Node(-1, 1)), hash(Node(65535, 0)))
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from random import Random
+from app.components import SpatialIndex
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def manhattan(self, x_coord: int, y_coord: int):
+        return lambda value: abs(value[0] - x_coord) + abs(value[1] - y_coord)
+
+    def test_behaves_like_dict(self):
+        index = SpatialIndex(bucket_size=2)
+        index.add("a", (0, 0), 0, 0)
+        index.add("b", (5, 5), 5, 5)
+        index.add("a", (9, 9), 9, 9)
+        self.assertEqual(index.values(), [(0, 0), (5, 5)])
+        self.assertIn("a", index)
+        self.assertEqual(index.pop("a"), (0, 0))
+        self.assertIsNone(index.pop("a"))
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.get("b"), (5, 5))
+
+    def test_nearest_matches_linear_scan(self):
+        random = Random(0)
+        index = SpatialIndex(bucket_size=4)
+        locations = {}
+        for key in range(200):
+            location = (random.randrange(40), random.randrange(30))
+            locations[key] = location
+            index.add(key, location, *location)
+        for key in range(0, 200, 3):
+            index.pop(key)
+            del locations[key]
+        for _ in range(50):
+            x_coord, y_coord = random.randrange(40), random.randrange(30)
+            # Twice the Manhattan distance, so that many values are tied and a bucket's bound is not exact
+            distance = lambda value: 2 * self.manhattan(x_coord, y_coord)(value)
+            expected = sorted(locations, key=lambda key: (distance(locations[key]), key))[:5]
+            self.assertEqual(index.nearest(x_coord, y_coord, distance, k=5), [locations[key] for key in expected])
+
+    def test_ties_go_to_lowest_order(self):
+        index = SpatialIndex()
+        index.add("late", (2, 0), 2, 0, order=5)
+        index.add("early", (0, 2), 0, 2, order=1)
+        self.assertEqual(index.nearest(0, 0, self.manhattan(0, 0)), [(0, 2)])
+
+    def test_nearest_excluding_keys(self):
+        index = SpatialIndex()
+        index.add("a", (1, 0), 1, 0)
+        index.add("b", (3, 0), 3, 0)
+        self.assertEqual(index.nearest(0, 0, self.manhattan(0, 0), exclude={"a"}), [(3, 0)])
+        self.assertEqual(index.nearest(0, 0, self.manhattan(0, 0), exclude={"a", "b"}), [])
+        self.assertEqual(index.nearest(0, 0, self.manhattan(0, 0), k=3), [(1, 0), (3, 0)])
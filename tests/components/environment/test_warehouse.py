@@ -0,0 +1,31 @@
+import unittest
+from app.components import Map, Node, generate_warehouse
+
+class TestWarehouse(unittest.TestCase):
+
+    def test_default_layout(self):
+        # Same layout as the map the App used to hardcode
+        node_status = []
+        for y_coord in range(21):
+            if y_coord in [0, 20]:
+                node_status.append(["FREE"] * 35)
+            else:
+                shelf_status = {1: "TASK_ENDPOINT", 2: "OBSTACLE", 3: "TASK_ENDPOINT", 0: "FREE"}[y_coord % 4]
+                node_status.append(["FREE", "NON_TASK_ENDPOINT", "NON_TASK_ENDPOINT"] * 2 + (["FREE"] + [shelf_status] * 10) * 2 + ["FREE", "NON_TASK_ENDPOINT", "NON_TASK_ENDPOINT"] * 2 + ["FREE"])
+        expected_map = Map.from_status_grid(node_status)
+        map = generate_warehouse()
+        self.assertEqual((map.width, map.height), (35, 21))
+        self.assertEqual(map.grid.tolist(), expected_map.grid.tolist())
+        self.assertEqual(map.get_non_task_endpoints(), expected_map.get_non_task_endpoints())
+
+    def test_dimensions(self):
+        map = generate_warehouse(shelf_rows=3, shelf_blocks=3, shelf_length=4, aisle_width=2, station_groups=1, station_width=1)
+        self.assertEqual((map.width, map.height), (2 + 1 + 2 + 3 * (4 + 2) + 1 + 2, 2 * 2 + 3 * 3 + 2 * 2))
+        self.assertEqual(len(map.get_task_endpoints()), 3 * 3 * 4 * 2)
+        self.assertEqual(len(map.get_non_task_endpoints()), 2 * (map.height - 4))
+        self.assertIn(Node(2, 2), map.get_non_task_endpoints())
+        self.assertFalse(map.is_passable(5, 3))
+
+    def test_invalid_dimensions(self):
+        with self.assertRaises(ValueError):
+            generate_warehouse(shelf_rows=0)
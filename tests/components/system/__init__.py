@@ -0,0 +1,5 @@
+from .test_reservation_table import *
+from .test_search_cache import *
+from .test_system import *
+from .test_checkpoint import *
+from .test_stats import *
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from app.start import App
+from app.agents.agents.agent_tp import Agent_TP
+from app.agents.agents.agent_central import Agent_Central
+from app.components import Task
+from app.components.system import System, snapshot_system, restore_system, fork_system, save_checkpoint, load_checkpoint
+
+def get_history(system: System) -> tuple:
+    # Agent paths and task times by position, as task ids depend on the shared ID counter
+    paths = tuple(tuple(agent.path.get_coords(timestep) for timestep in range(agent.path.start_timestep, agent.path.end_timestep + 1)) for agent in system.agents)
+    tasks = tuple((task.add_time, task.assigned_agent, task.pickup_time, task.delivery_time) for task in system.tasks)
+    return paths, tasks
+
+def run(system: System, max_timestep: int = 300) -> System:
+    while not system.is_completed() and system.timestep < max_timestep:
+        system.iterate()
+    return system
+
+class TestCheckpoint(unittest.TestCase):
+
+    def create_system(self, agent_class: type = Agent_TP, agent_kwargs: dict = None) -> System:
+        app = App(agent_class=agent_class, num_agents=6, num_tasks=20, num_tasks_per_timestep=0.5, seed=3, agent_kwargs=agent_kwargs)
+        system = app.system
+        while system.timestep < 15:
+            system.iterate()
+        return system
+
+    def test_restored_system_continues_as_original(self):
+        for agent_class, agent_kwargs in [(Agent_TP, None), (Agent_Central, {"incremental": True})]:
+            with self.subTest(agent_class=agent_class.__name__):
+                system = self.create_system(agent_class, agent_kwargs)
+                snapshot = snapshot_system(system)
+                task_id_counter = Task._id_counter
+                expected = get_history(run(system))
+                restored = restore_system(snapshot)
+                self.assertEqual(Task._id_counter, task_id_counter)
+                self.assertEqual(restored.timestep, 15)
+                self.assertEqual(get_history(run(restored)), expected)
+                self.assertTrue(restored.is_completed())
+
+    def test_save_and_load_checkpoint(self):
+        system = self.create_system()
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "checkpoint.pkl")
+            save_checkpoint(system, file_path)
+            expected = get_history(run(system))
+            self.assertEqual(get_history(run(load_checkpoint(file_path))), expected)
+
+    def test_fork_is_independent(self):
+        system = self.create_system()
+        fork = fork_system(system)
+        self.assertIsNot(fork.agents[0], system.agents[0])
+        self.assertIsNot(fork.active_tasks, system.active_tasks)
+        fork_history = get_history(run(fork))
+        self.assertEqual(system.timestep, 15)
+        self.assertEqual(get_history(run(system)), fork_history)
+
+    def test_fork_with_other_agent_class(self):
+        system = self.create_system()
+        fork = fork_system(system, Agent_Central)
+        self.assertTrue(all(isinstance(agent, Agent_Central) for agent in fork.agents))
+        self.assertEqual([agent.id for agent in fork.agents], [agent.id for agent in system.agents])
+        self.assertEqual([agent.path.get_coords(15) for agent in fork.agents], [agent.path.get_coords(15) for agent in system.agents])
+        self.assertTrue(run(fork).is_completed())
+        self.assertTrue(all(isinstance(agent, Agent_TP) for agent in system.agents))
@@ -0,0 +1,102 @@
+import unittest
+from app.components import Node
+from app.components.system import ReservationTable
+from app.agents import AgentPath, AgentState
+
+class TestReservationTable(unittest.TestCase):
+
+    def setUp(self):
+        self.reservations = ReservationTable(width=4)
+        self.path = AgentPath({
+            0: AgentState(Node(1, 1), 90),
+            1: AgentState(Node(2, 1), 90),
+            2: AgentState(Node(2, 1), 180),
+            3: AgentState(Node(2, 2), 180)
+        })
+        self.reservations.reserve_path(0, self.path)
+
+    def test_vertex_reserved(self):
+        self.assertTrue(self.reservations.is_vertex_reserved(Node(2, 1), 2))
+        self.assertFalse(self.reservations.is_vertex_reserved(Node(2, 1), 3))
+
+    def test_edge_reserved(self):
+        self.assertTrue(self.reservations.is_edge_reserved(Node(1, 1), Node(2, 1), 1))
+        self.assertFalse(self.reservations.is_edge_reserved(Node(2, 1), Node(1, 1), 1))
+        self.assertFalse(self.reservations.is_edge_reserved(Node(2, 1), Node(2, 1), 2))
+
+    def test_release_truncates_reservations(self):
+        self.reservations.release_path(0, 2)
+        self.assertTrue(self.reservations.is_vertex_reserved(Node(2, 1), 1))
+        self.assertFalse(self.reservations.is_vertex_reserved(Node(2, 1), 2))
+        self.assertFalse(self.reservations.is_edge_reserved(Node(2, 1), Node(2, 2), 3))
+
+    def test_reserve_replaces_future_reservations(self):
+        new_path = AgentPath({
+            1: AgentState(Node(2, 1), 90),
+            2: AgentState(Node(3, 1), 90)
+        })
+        self.reservations.reserve_path(0, new_path, 2)
+        self.assertTrue(self.reservations.is_vertex_reserved(Node(3, 1), 2))
+        self.assertFalse(self.reservations.is_vertex_reserved(Node(2, 1), 2))
+        self.assertFalse(self.reservations.is_vertex_reserved(Node(2, 2), 3))
+
+    def test_discard_before_drops_past_reservations(self):
+        self.reservations.discard_before(2)
+        self.assertFalse(self.reservations.is_vertex_reserved(Node(2, 1), 1))
+        self.assertFalse(self.reservations.is_edge_reserved(Node(1, 1), Node(2, 1), 1))
+        self.assertTrue(self.reservations.is_vertex_reserved(Node(2, 1), 2))
+        self.reservations.release_path(0)
+        self.assertEqual(self.reservations.vertex_reservations, {})
+
+    def test_changes_tracked_per_timestep(self):
+        version = self.reservations.version
+        self.reservations.reserve_path(0, self.path, 2)
+        self.assertTrue(self.reservations.is_unchanged_since(version, 0, 3))
+        new_path = AgentPath({2: AgentState(Node(2, 1), 180), 3: AgentState(Node(3, 1), 90)})
+        self.reservations.reserve_path(0, new_path, 3)
+        self.assertTrue(self.reservations.is_unchanged_since(version, 0, 2))
+        self.assertFalse(self.reservations.is_unchanged_since(version, 0, 3))
+
+    def test_shared_cell_stays_reserved_for_other_agent(self):
+        other_path = AgentPath({0: AgentState(Node(1, 1), 0)})
+        self.reservations.reserve_path(1, other_path)
+        self.reservations.release_path(0)
+        self.assertTrue(self.reservations.is_vertex_reserved(Node(1, 1), 0))
+
+    def test_resting_cells(self):
+        self.assertEqual(self.reservations.resting_cells, {0: 10})
+        self.reservations.release_path(0, 2)
+        self.assertEqual(self.reservations.resting_cells, {0: 6})
+        self.assertEqual(self.reservations.resting_agents, {6: {0}})
+        self.reservations.discard_before(5)
+        self.assertEqual(self.reservations.resting_cells, {0: 6})
+        self.reservations.release_path(0)
+        self.assertEqual(self.reservations.resting_cells, {})
+        self.assertEqual(self.reservations.resting_agents, {})
+
+    def test_future_reservations(self):
+        self.assertEqual(self.reservations.future_intervals, {5: {(0, 0): 0}, 6: {(0, 1): 2}, 10: {(0, 3): 3}})
+        self.reservations.advance(2)
+        self.assertEqual(self.reservations.future_intervals, {6: {(0, 1): 2}, 10: {(0, 3): 3}})
+        self.assertTrue(self.reservations.is_reserved_from_now(Node(2, 1)))
+        self.assertFalse(self.reservations.is_reserved_from_now(Node(1, 1)))
+        self.reservations.release_path(0, 3)
+        self.assertFalse(self.reservations.is_reserved_from_now(Node(2, 2)))
+        self.reservations.discard_before(2)
+        self.assertEqual(self.reservations.future_intervals, {6: {(0, 1): 2}})
+
+    def test_future_intervals(self):
+        self.reservations.reserve_path(1, AgentPath({
+            1: AgentState(Node(2, 1), 0),
+            2: AgentState(Node(3, 1), 0),
+            3: AgentState(Node(2, 1), 180)
+        }), 1)
+        self.assertEqual(self.reservations.get_future_intervals(Node(2, 1)), [(0, 1, 2), (1, 1, 1), (1, 3, 3)])
+        self.assertEqual(self.reservations.get_future_intervals(Node(0, 0)), [])
+        self.reservations.advance(2)
+        self.assertEqual(self.reservations.get_future_intervals(Node(2, 1)), [(0, 2, 2), (1, 3, 3)])
+        self.reservations.release_path(0, 2)
+        self.assertEqual(self.reservations.get_future_intervals(Node(2, 1)), [(1, 3, 3)])
+
+if __name__ == '__main__':
+    unittest.main()
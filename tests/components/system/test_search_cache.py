@@ -0,0 +1,49 @@
+import unittest
+from app.components import Map, Node
+from app.components.system import System, SearchCache
+from app.agents import AgentPath, AgentState
+from app.agents.components.search.a_star_search import A_Star_Search
+
+class TestSearchCache(unittest.TestCase):
+
+    def setUp(self):
+        map = Map.from_status_grid([["FREE"] * 5, ["FREE"] * 5])
+        self.system = System(map, [], [])
+        self.a_star = A_Star_Search(self.system)
+        self.start_state = AgentState(Node(0, 0), 90)
+
+    def test_repeated_search_hits(self):
+        path = self.a_star.search(1, self.start_state, Node(4, 0))
+        cached_path = self.a_star.search(1, self.start_state, Node(4, 0))
+        self.assertEqual(self.system.search_cache.hits, 1)
+        self.assertEqual(self.system.search_cache.misses, 1)
+        self.assertEqual(list(cached_path.path.items()), list(path.path.items()))
+
+    def test_cached_path_is_a_copy(self):
+        self.a_star.search(1, self.start_state, Node(4, 0))
+        self.a_star.search(1, self.start_state, Node(4, 0)).truncate(2)
+        self.assertEqual(self.a_star.search(1, self.start_state, Node(4, 0)).end_timestep, 4)
+
+    def test_invalidated_by_reservation_in_searched_range(self):
+        self.a_star.search(1, self.start_state, Node(4, 0))
+        self.system.reservations.reserve_path(1, AgentPath({3: AgentState(Node(3, 0), 0)}), 3)
+        path = self.a_star.search(1, self.start_state, Node(4, 0))
+        self.assertEqual(self.system.search_cache.hits, 0)
+        self.assertNotEqual(path.path[3].node, Node(3, 0))
+
+    def test_kept_after_reservation_outside_searched_range(self):
+        self.a_star.search(1, self.start_state, Node(4, 0))
+        self.system.reservations.reserve_path(1, AgentPath({8: AgentState(Node(3, 0), 0)}), 8)
+        self.a_star.search(1, self.start_state, Node(4, 0))
+        self.assertEqual(self.system.search_cache.hits, 1)
+
+    def test_least_recently_used_evicted(self):
+        search_cache = SearchCache(max_size=2)
+        for key in ["a", "b", "c"]:
+            search_cache.put(key, 0, 0, 0, None, False)
+        self.assertEqual(len(search_cache), 2)
+        self.assertIsNone(search_cache.get("a", self.system.reservations))
+        self.assertEqual(search_cache.get("c", self.system.reservations), (None, False))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from app.start import App
+from app.agents.agents.agent_tpts import Agent_TPTS
+from app.agents.agents.agent_central import Agent_Central
+from app.components.system import Stats
+
+class TestStats(unittest.TestCase):
+
+    def test_metrics_per_timestep(self):
+        stats = Stats()
+        stats.start_timestep(1)
+        stats.add("searches")
+        stats.add("searches")
+        stats.set_max("search_time_max", 2)
+        stats.set_max("search_time_max", 1)
+        stats.start_timestep(2)
+        stats.add("searches", 4)
+        self.assertEqual(stats.get_timestep(1), {"searches": 2, "search_time_max": 2})
+        self.assertEqual(stats.get_series("searches"), [0, 2, 4])
+        summary = stats.summary()
+        # The empty timestep 0 is not part of the mean
+        self.assertEqual(summary["searches"], {"total": 6, "mean": 3, "max": 4})
+        self.assertEqual(summary["search_time_max"]["total"], 2)
+
+    def test_nested_sections(self):
+        stats = Stats()
+        stats.enter("steal")
+        stats.enter("steal")
+        stats.leave("steal")
+        stats.leave("steal")
+        stats.enter("steal")
+        stats.leave("steal")
+        self.assertEqual(stats.get_timestep(0), {"steal": 3, "steal_depth_max": 2})
+
+    def test_disabled_by_default(self):
+        app = App(agent_class=Agent_TPTS, num_agents=4, num_tasks=8, num_tasks_per_timestep=0.5, seed=1)
+        app.system.iterate()
+        self.assertIsNone(app.system.stats)
+
+    def test_system_stats(self):
+        app = App(agent_class=Agent_TPTS, num_agents=6, num_tasks=20, num_tasks_per_timestep=1, seed=2)
+        system = app.system
+        stats = system.enable_stats()
+        while not system.is_completed() and system.timestep < 300:
+            system.iterate()
+        self.assertEqual(sorted(stats.timesteps)[1:], list(range(1, system.timestep + 1)))
+        summary = stats.summary()
+        for metric in ["iterate_time", "agent_moves_time", "check_tasks_time", "searches", "expansions", "generated", "collision_checks", "path_length"]:
+            self.assertIn(metric, summary)
+        self.assertEqual(summary["searches"]["total"], len(stats.searches))
+        self.assertEqual(summary["expansions"]["total"], sum(search[2] for search in stats.searches))
+        self.assertGreaterEqual(summary["iterate_time"]["total"], summary["agent_moves_time"]["total"])
+
+    def test_central_stats(self):
+        app = App(agent_class=Agent_Central, num_agents=4, num_tasks=8, num_tasks_per_timestep=1, seed=1)
+        system = app.system
+        stats = system.enable_stats()
+        for _ in range(5):
+            system.iterate()
+        self.assertTrue(all(stats.get_timestep(timestep)["assign_tasks_time"] > 0 for timestep in range(1, 6)))
+        self.assertTrue(all("plan_paths_time" in stats.get_timestep(timestep) for timestep in range(1, 6)))
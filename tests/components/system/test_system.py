@@ -0,0 +1,160 @@
+import os
+import tempfile
+import unittest
+from app.components import Map, Node, Task, QueueTaskSource
+from app.components.system import System, TrajectoryWriter
+from app.agents import AgentPath, AgentState
+
+class IdleAgent:
+
+    def __init__(self, agent_id: int, starting_state: AgentState):
+        self.id = agent_id
+        self.state = starting_state
+        self.path = None
+
+    def move(self, system: System) -> System:
+        return system
+
+class WaitingAgent(IdleAgent):
+
+    def move(self, system: System) -> System:
+        self.path.append(self.state)
+        return system
+
+class TestSystem(unittest.TestCase):
+
+    def setUp(self):
+        map = Map.from_status_grid([["TASK_ENDPOINT", "FREE", "TASK_ENDPOINT", "NON_TASK_ENDPOINT"]])
+        self.first_task = Task(Node(0, 0), Node(2, 0), 0)
+        self.second_task = Task(Node(2, 0), Node(0, 0), 2)
+        self.agents = [IdleAgent(0, AgentState(Node(3, 0), 0)), IdleAgent(1, AgentState(Node(1, 0), 0))]
+        self.system = System(map, [self.first_task, self.second_task], self.agents)
+
+    def test_get_agent(self):
+        self.assertIs(self.system.get_agent(1), self.agents[1])
+        self.assertIsNone(self.system.get_agent(2))
+
+    def test_tasks_released_at_add_time(self):
+        self.assertEqual(self.system.get_not_assigned_tasks(), [self.first_task])
+        self.system.iterate()
+        self.assertEqual(self.system.get_not_assigned_tasks(), [self.first_task])
+        self.system.iterate()
+        self.assertEqual(self.system.get_not_assigned_tasks(), [self.first_task, self.second_task])
+
+    def test_task_lifecycle(self):
+        self.first_task.assign(0).pickup(2, 0).deliver(4, 0)
+        self.assertEqual(self.system.get_not_assigned_tasks(), [])
+        self.assertEqual(self.system.get_unexecuted_tasks(), [self.first_task])
+        self.system.iterate()
+        self.assertEqual(self.system.get_executed_tasks(), [])
+        self.system.iterate()
+        self.assertEqual(self.system.get_executed_tasks(), [self.first_task])
+        self.assertEqual(self.system.get_available_tasks(), [self.second_task])
+        self.assertTrue(self.first_task.has_been_picked_up)
+        self.system.iterate()
+        self.system.iterate()
+        self.assertNotIn(self.first_task.id, self.system.active_tasks)
+        self.assertEqual(self.system.get_executed_tasks(), [])
+
+    def test_replanned_task_uses_latest_times(self):
+        self.first_task.assign(0).pickup(1, 0).deliver(2, 0)
+        self.first_task.assign(1).pickup(3, 1).deliver(5, 1)
+        self.system.iterate()
+        self.system.iterate()
+        self.assertIn(self.first_task.id, self.system.active_tasks)
+        self.assertEqual(self.system.get_executed_tasks(), [])
+        self.system.iterate()
+        self.assertEqual(self.system.get_executed_tasks(), [self.first_task])
+
+    def test_unassigned_task_is_available_again(self):
+        self.first_task.assign(0).pickup(3, 0).deliver(5, 0)
+        self.first_task.unassign()
+        self.assertEqual(self.system.get_not_assigned_tasks(), [self.first_task])
+        for _ in range(5):
+            self.system.iterate()
+        self.assertIn(self.first_task.id, self.system.active_tasks)
+
+    def test_nearest_tasks(self):
+        self.system.iterate()
+        self.system.iterate()
+        agent_state = AgentState(Node(3, 0), 270)
+        self.assertEqual(self.system.get_nearest_not_assigned_tasks(agent_state, k=2), [self.second_task, self.first_task])
+        self.assertEqual(self.system.get_nearest_available_tasks(agent_state, exclude={self.second_task.id}), [self.first_task])
+        self.second_task.assign(1)
+        self.assertEqual(self.system.get_nearest_not_assigned_tasks(agent_state), [self.first_task])
+        self.assertEqual(self.system.get_nearest_available_tasks(agent_state), [self.second_task])
+
+    def test_free_non_task_endpoints(self):
+        agent_state = AgentState(Node(1, 0), 90)
+        self.assertEqual(self.system.get_free_non_task_endpoints(), [])
+        self.assertEqual(self.system.get_nearest_free_non_task_endpoints(agent_state), [])
+        self.system.reservations.reserve_path(0, AgentPath({0: AgentState(Node(2, 0), 0)}))
+        self.assertEqual(self.system.get_free_non_task_endpoints(), [Node(3, 0)])
+        self.assertEqual(self.system.get_nearest_free_non_task_endpoints(agent_state), [Node(3, 0)])
+
+    def test_cell_occupancy(self):
+        self.assertTrue(self.system.check_is_task_loc(Node(2, 0)))
+        self.assertFalse(self.system.check_is_task_loc(Node(1, 0)))
+        self.assertEqual(self.system.get_cell_occupancy(Node(3, 0)), ([(0, 0, 0)], {0}, 0))
+        self.system.reservations.reserve_path(1, AgentPath({0: AgentState(Node(1, 0), 0), 1: AgentState(Node(2, 0), 0)}))
+        self.system.iterate()
+        self.assertFalse(self.system.check_in_other_agent_path(Node(1, 0)))
+        self.assertTrue(self.system.check_in_other_agent_path(Node(2, 0)))
+        self.assertEqual(self.system.get_cell_occupancy(Node(2, 0)), ([(1, 1, 1)], {1}, 1))
+        self.first_task.assign(0).pickup(2, 0).deliver(3, 0)
+        for _ in range(3):
+            self.system.iterate()
+        self.assertEqual(self.system.get_cell_occupancy(Node(0, 0)), ([], set(), 1))
+        self.assertEqual(self.system.get_cell_occupancy(Node(2, 0)), ([], {1}, 1))
+
+class TestTaskSource(unittest.TestCase):
+
+    def test_tasks_pulled_from_source(self):
+        map = Map.from_status_grid([["TASK_ENDPOINT", "FREE", "TASK_ENDPOINT"]])
+        task_source = QueueTaskSource()
+        system = System(map, task_source, [IdleAgent(0, AgentState(Node(1, 0), 0))])
+        self.assertEqual(system.tasks, [])
+        task = task_source.add_task(Node(0, 0), Node(2, 0))
+        system.iterate()
+        self.assertEqual(system.tasks, [task])
+        self.assertEqual(system.get_not_assigned_tasks(), [task])
+        task.assign(0).pickup(1, 0).deliver(2, 0)
+        task_source.close()
+        self.assertFalse(system.is_completed())
+        system.iterate()
+        self.assertTrue(system.is_completed())
+
+class TestPathRetention(unittest.TestCase):
+
+    def setUp(self):
+        self.map = Map.from_status_grid([["NON_TASK_ENDPOINT", "FREE", "NON_TASK_ENDPOINT"]])
+        self.agents = [WaitingAgent(0, AgentState(Node(0, 0), 0)), IdleAgent(1, AgentState(Node(2, 0), 90))]
+
+    def test_history_discarded_outside_window(self):
+        system = System(self.map, [], self.agents, path_retention=2)
+        for _ in range(5):
+            system.iterate()
+        self.assertEqual(self.agents[0].path.start_timestep, 3)
+        self.assertEqual(self.agents[0].path.end_timestep, 5)
+        self.assertFalse(system.reservations.is_vertex_reserved(Node(0, 0), 2))
+        self.assertEqual(self.agents[1].path.last_state.node, Node(2, 0))
+        self.assertEqual(system.get_free_non_task_endpoints(), [])
+
+    def test_discarded_history_streamed_to_trajectory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "trajectory.csv")
+            system = System(self.map, [], self.agents, path_retention=0, trajectory_writer=TrajectoryWriter(file_path))
+            for _ in range(3):
+                system.iterate()
+            system.close()
+            with open(file_path) as trajectory_file:
+                lines = trajectory_file.read().splitlines()
+        self.assertEqual(lines[0], "timestep,agent_id,x,y,rot")
+        self.assertEqual(sorted(lines[1:]), ["0,0,0,0,0", "0,1,2,0,90", "1,0,0,0,0", "2,0,0,0,0", "3,0,0,0,0"])
+
+    def test_negative_retention(self):
+        with self.assertRaises(ValueError):
+            System(self.map, [], self.agents, path_retention=-1)
+
+if __name__ == '__main__':
+    unittest.main()
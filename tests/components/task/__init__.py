@@ -1 +1,2 @@
 from .test_task import *
+from .test_task_source import *
@@ -4,41 +4,51 @@ from app.components import Node, Task
 class TestTask(unittest.TestCase):
     
     def setUp(self):
-        self.node = Node(4, 9)
+        self.pickup_node = Node(4, 9)
+        self.delivery_node = Node(7, 2)
 
     def test_task_creation(self):
-        task = Task(self.node, 16)
-        self.assertEqual(task.node, self.node)
+        task = Task(self.pickup_node, self.delivery_node, 16)
+        self.assertEqual(task.pickup_node, self.pickup_node)
+        self.assertEqual(task.delivery_node, self.delivery_node)
         self.assertEqual(task.add_time, 16)
         self.assertIsNone(task.pickup_time)
         self.assertIsNone(task.delivery_time)
         self.assertIsNone(task.assigned_agent)
 
     def test_task_pickup(self):
-        task = Task(self.node, 16)
-        task.pickup(25, 1)
+        task = Task(self.pickup_node, self.delivery_node, 16)
+        task.assign(1).pickup(25, 1)
         self.assertEqual(task.pickup_time, 25)
         self.assertEqual(task.assigned_agent, 1)
     
     def test_task_delivery(self):
-        task = Task(self.node, 16)
-        task.pickup(25, 1)
+        task = Task(self.pickup_node, self.delivery_node, 16)
+        task.assign(1).pickup(25, 1)
         task.deliver(49, 1)
         self.assertEqual(task.delivery_time, 49)
 
-    def test_task_delivery_without_pickup(self):
-        task = Task(self.node, 16)
+    def test_task_delivery_without_assignment(self):
+        task = Task(self.pickup_node, self.delivery_node, 16)
         with self.assertRaises(ValueError) as context:
             task.deliver(49, 1)
         self.assertEqual(str(context.exception), f"Agent 1 is not the assigned agent for task {task.id}")
     
     def test_task_delivery_wrong_agent(self):
-        task = Task(self.node, 16)
-        task.pickup(25, 1)
+        task = Task(self.pickup_node, self.delivery_node, 16)
+        task.assign(1).pickup(25, 1)
         with self.assertRaises(ValueError) as context:
             task.deliver(49, 2)
         self.assertEqual(str(context.exception), f"Agent 2 is not the assigned agent for task {task.id}")
 
+    def test_unassign_clears_times(self):
+        task = Task(self.pickup_node, self.delivery_node, 16)
+        task.assign(1).pickup(25, 1).deliver(49, 1)
+        task.unassign()
+        self.assertIsNone(task.assigned_agent)
+        self.assertIsNone(task.pickup_time)
+        self.assertIsNone(task.delivery_time)
+
 
 if __name__ == '__main__':
     unittest.main()
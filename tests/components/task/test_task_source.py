@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+from random import Random
+from app.components import Map, Node, Task, TaskListSource, RandomTaskSource, ReplayTaskSource, QueueTaskSource
+
+class TestTaskListSource(unittest.TestCase):
+
+    def test_released_in_order(self):
+        later_task = Task(Node(0, 0), Node(1, 0), 3)
+        first_task = Task(Node(1, 0), Node(0, 0), 1)
+        task_source = TaskListSource([later_task, first_task])
+        self.assertEqual(task_source.get_tasks(0), [])
+        self.assertEqual(task_source.get_tasks(2), [first_task])
+        self.assertFalse(task_source.is_exhausted())
+        self.assertEqual(task_source.get_tasks(5), [later_task])
+        self.assertTrue(task_source.is_exhausted())
+
+class TestRandomTaskSource(unittest.TestCase):
+
+    def setUp(self):
+        self.task_endpoints = [Node(x_coord, 0) for x_coord in range(4)]
+
+    def test_uniform_release(self):
+        task_source = RandomTaskSource(self.task_endpoints, 0.5, num_tasks=3, random=Random(1))
+        self.assertEqual([task.add_time for task in task_source.get_tasks(3)], [0, 2])
+        self.assertEqual([task.add_time for task in task_source.get_tasks(10)], [4])
+        self.assertTrue(task_source.is_exhausted())
+
+    def test_tasks_between_different_endpoints(self):
+        task_source = RandomTaskSource(self.task_endpoints, 2, num_tasks=20, random=Random(1))
+        for task in task_source.get_tasks(20):
+            self.assertIn(task.pickup_node, self.task_endpoints)
+            self.assertNotEqual(task.pickup_node, task.delivery_node)
+
+    def test_open_ended_poisson(self):
+        task_source = RandomTaskSource(self.task_endpoints, 2, random=Random(1), distribution="poisson")
+        tasks = task_source.get_tasks(499)
+        self.assertFalse(task_source.is_exhausted())
+        self.assertAlmostEqual(len(tasks) / 500, 2, delta=0.3)
+        self.assertEqual([task.add_time for task in tasks], sorted(task.add_time for task in tasks))
+
+    def test_same_seed_same_tasks(self):
+        first_tasks = RandomTaskSource(self.task_endpoints, 1, num_tasks=10, random=Random(5)).get_tasks(10)
+        second_tasks = RandomTaskSource(self.task_endpoints, 1, num_tasks=10, random=Random(5)).get_tasks(10)
+        self.assertEqual([(task.pickup_node, task.delivery_node) for task in first_tasks], [(task.pickup_node, task.delivery_node) for task in second_tasks])
+
+class TestReplayTaskSource(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_file(self, file_name: str, content: str) -> str:
+        file_path = os.path.join(self.directory.name, file_name)
+        with open(file_path, "w") as task_file:
+            task_file.write(content)
+        return file_path
+
+    def test_csv_replay(self):
+        file_path = self.write_file("tasks.csv", "add_time,pickup_x,pickup_y,delivery_x,delivery_y\n0,1,2,3,4\n2,3,4,1,2\n")
+        task_source = ReplayTaskSource(file_path)
+        tasks = task_source.get_tasks(1)
+        self.assertEqual([(task.pickup_node, task.delivery_node, task.add_time) for task in tasks], [(Node(1, 2), Node(3, 4), 0)])
+        self.assertFalse(task_source.is_exhausted())
+        self.assertEqual(len(task_source.get_tasks(2)), 1)
+        self.assertTrue(task_source.is_exhausted())
+
+    def test_jsonl_replay(self):
+        file_path = self.write_file("tasks.jsonl", '{"add_time": 1, "pickup_x": 0, "pickup_y": 0, "delivery_x": 2, "delivery_y": 1}\n')
+        tasks = ReplayTaskSource(file_path).get_tasks(1)
+        self.assertEqual(tasks[0].delivery_node, Node(2, 1))
+
+    def test_unordered_file(self):
+        file_path = self.write_file("tasks.csv", "add_time,pickup_x,pickup_y,delivery_x,delivery_y\n2,1,2,3,4\n1,3,4,1,2\n")
+        with self.assertRaises(ValueError):
+            ReplayTaskSource(file_path).get_tasks(5)
+
+    def test_endpoints_checked_against_map(self):
+        map = Map.from_status_grid([["TASK_ENDPOINT", "FREE", "TASK_ENDPOINT", "OBSTACLE"]])
+        file_path = self.write_file("tasks.csv", "add_time,pickup_x,pickup_y,delivery_x,delivery_y\n0,0,0,2,0\n1,2,0,0,0\n2,3,0,0,0\n")
+        task_source = ReplayTaskSource(file_path, map)
+        self.assertEqual(len(task_source.get_tasks(0)), 1)
+        with self.assertRaises(ValueError):
+            task_source.get_tasks(1)
+        task_source.close()
+        file_path = self.write_file("free.csv", "add_time,pickup_x,pickup_y,delivery_x,delivery_y\n0,0,0,1,0\n")
+        with self.assertRaises(ValueError):
+            ReplayTaskSource(file_path, map).get_tasks(0)
+
+class TestQueueTaskSource(unittest.TestCase):
+
+    def test_injected_tasks(self):
+        task_source = QueueTaskSource()
+        self.assertEqual(task_source.get_tasks(0), [])
+        late_task = task_source.add_task(Node(0, 0), Node(1, 0), add_time=4)
+        task = task_source.add_task(Node(1, 0), Node(0, 0))
+        self.assertEqual(task.add_time, 1)
+        self.assertEqual(task_source.get_tasks(1), [task])
+        task_source.close()
+        self.assertFalse(task_source.is_exhausted())
+        self.assertEqual(task_source.get_tasks(4), [late_task])
+        self.assertTrue(task_source.is_exhausted())
+        with self.assertRaises(ValueError):
+            task_source.add_task(Node(0, 0), Node(1, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,2 @@
+from .test_simulation_worker import *
+from .test_recording import *
@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from app.start import App
+from app.agents.agents.agent_tpts import Agent_TPTS
+from app.agents import AgentState
+from app.components import Map, Node, Task
+from app.components.system import System, Recorder
+from app.graphics.frame import Frame
+from app.graphics.recording import Recording
+
+class WaitingAgent:
+
+    def __init__(self, agent_id: int, starting_state: AgentState):
+        self.id = agent_id
+        self.state = starting_state
+        self.path = None
+
+    def move(self, system: System) -> System:
+        self.path.append(self.state)
+        return system
+
+class TestRecording(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def sort_markers(self, frame: Frame) -> Frame:
+        return frame._replace(task_markers=tuple(sorted(frame.task_markers)))
+
+    def test_replay_matches_simulation(self):
+        app = App(agent_class=Agent_TPTS, num_agents=4, num_tasks=12, num_tasks_per_timestep=0.5, seed=2, path_retention=3, recording_path=self.directory.name)
+        system = app.system
+        frames = [Frame.from_system(system)]
+        while not system.is_completed() and system.timestep < 300:
+            system.iterate()
+            frames.append(Frame.from_system(system))
+        system.close()
+        recording = Recording(self.directory.name)
+        self.assertEqual(len(recording), len(frames))
+        self.assertEqual(recording.map.grid.tolist(), app.map.grid.tolist())
+        for frame in frames:
+            self.assertEqual(self.sort_markers(recording.get_frame(frame.timestep)), self.sort_markers(frame))
+
+    def test_task_chunks_loaded_lazily(self):
+        with patch("app.start.Recorder", lambda directory: Recorder(directory, chunk_size=8)):
+            app = App(agent_class=Agent_TPTS, num_agents=4, num_tasks=20, num_tasks_per_timestep=0.5, seed=3, recording_path=self.directory.name)
+        system = app.system
+        frames = [Frame.from_system(system)]
+        while not system.is_completed() and system.timestep < 300:
+            system.iterate()
+            frames.append(Frame.from_system(system))
+        system.close()
+        with patch("app.graphics.recording.np.load", wraps=np.load) as load:
+            recording = Recording(self.directory.name)
+            # Only the map and the state chunks are opened up front
+            self.assertEqual(load.call_count, 1 + (len(frames) + 7) // 8)
+            self.assertEqual(self.sort_markers(recording.get_frame(0)), self.sort_markers(frames[0]))
+            self.assertLess(load.call_count, 1 + (len(frames) + 7) // 8 + 2)
+        for frame in reversed(frames):
+            self.assertEqual(self.sort_markers(recording.get_frame(frame.timestep)), self.sort_markers(frame))
+
+    def test_chunks_and_partial_recordings(self):
+        map = Map.from_status_grid([["TASK_ENDPOINT", "FREE", "TASK_ENDPOINT", "NON_TASK_ENDPOINT"]])
+        task = Task(Node(0, 0), Node(2, 0), 1)
+        recorder = Recorder(self.directory.name, chunk_size=2)
+        system = System(map, [task], [WaitingAgent(0, AgentState(Node(3, 0), 90))], recorder=recorder)
+        for _ in range(4):
+            system.iterate()
+        # Four full chunks have been written, the fifth timestep is still buffered
+        recording = Recording(self.directory.name)
+        self.assertEqual(len(recording), 4)
+        self.assertEqual(recording.get_states(3).tolist(), [[3, 0, 90]])
+        system.close()
+        recording = Recording(self.directory.name)
+        self.assertEqual(len(recording), 5)
+        self.assertEqual(recording.get_frame(4).task_markers, ((task.id, (0, 0), (2, 0)),))
+        self.assertEqual(recording.get_frame(0).task_markers, ())
+        self.assertFalse(recording.get_frame(4).completed)
+        with self.assertRaises(IndexError):
+            recording.get_states(5)
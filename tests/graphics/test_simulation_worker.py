@@ -0,0 +1,49 @@
+import time
+import unittest
+from app.start import App
+from app.agents.agents.agent_tp import Agent_TP
+from app.graphics.frame import Frame
+from app.graphics.simulation_worker import SimulationWorker
+
+class TestSimulationWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.app = App(agent_class=Agent_TP, num_agents=3, num_tasks=5, num_tasks_per_timestep=1, seed=3)
+
+    def get_frames(self, worker: SimulationWorker, timeout: float = 30) -> list[Frame]:
+        frames = []
+        deadline = time.monotonic() + timeout
+        while not worker.is_finished() and time.monotonic() < deadline:
+            frame = worker.get_frame()
+            if frame is None:
+                time.sleep(0.001)
+            else:
+                frames.append(frame)
+        return frames
+
+    def test_frames_of_every_timestep(self):
+        worker = SimulationWorker(self.app.system, max_frames=2)
+        worker.start()
+        frames = self.get_frames(worker)
+        self.assertEqual([frame.timestep for frame in frames], list(range(1, len(frames) + 1)))
+        self.assertTrue(frames[-1].completed)
+        self.assertEqual(frames[-1].task_markers, ())
+        last_agent_states = tuple((agent.id, *agent.path.get_coords(frames[-1].timestep)) for agent in self.app.agents)
+        self.assertEqual(frames[-1].agent_states, last_agent_states)
+
+    def test_worker_waits_for_full_queue(self):
+        worker = SimulationWorker(self.app.system, max_frames=1)
+        worker.start()
+        time.sleep(0.2)
+        self.assertEqual(self.app.system.timestep, 2)
+        worker.stop(timeout=5)
+        self.assertFalse(worker.is_alive())
+
+    def test_frame_from_system(self):
+        frame = Frame.from_system(self.app.system)
+        self.assertEqual(frame.timestep, 0)
+        self.assertEqual(len(frame.agent_states), 3)
+        task_id, pickup_loc, delivery_loc = frame.task_markers[0]
+        task = self.app.system.active_tasks[task_id]
+        self.assertEqual(pickup_loc, (task.pickup_node.x_coord, task.pickup_node.y_coord))
+        self.assertEqual(delivery_loc, (task.delivery_node.x_coord, task.delivery_node.y_coord))
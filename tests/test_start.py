@@ -0,0 +1,35 @@
+import unittest
+from app.start import App
+from app.agents.agents.agent_tp import Agent_TP
+
+def get_tasks(app: App) -> list:
+    return app.system.tasks + app.task_source.get_tasks(app.num_tasks)
+
+class TestApp(unittest.TestCase):
+
+    def test_same_seed_same_simulation(self):
+        first_app = App(agent_class=Agent_TP, num_agents=5, num_tasks=10, num_tasks_per_timestep=1, seed=3)
+        second_app = App(agent_class=Agent_TP, num_agents=5, num_tasks=10, num_tasks_per_timestep=1, seed=3)
+        self.assertEqual([agent.state for agent in first_app.agents], [agent.state for agent in second_app.agents])
+        self.assertEqual([(task.pickup_node, task.delivery_node) for task in get_tasks(first_app)], [(task.pickup_node, task.delivery_node) for task in get_tasks(second_app)])
+
+    def test_task_stream_independent_of_agents(self):
+        first_app = App(agent_class=Agent_TP, num_agents=2, num_tasks=10, num_tasks_per_timestep=1, seed=3)
+        second_app = App(agent_class=Agent_TP, num_agents=8, num_tasks=10, num_tasks_per_timestep=1, seed=3)
+        self.assertEqual([(task.pickup_node, task.delivery_node) for task in get_tasks(first_app)], [(task.pickup_node, task.delivery_node) for task in get_tasks(second_app)])
+
+    def test_ids_restart_for_each_app(self):
+        App(agent_class=Agent_TP, num_agents=3, num_tasks=5, num_tasks_per_timestep=1, seed=3)
+        app = App(agent_class=Agent_TP, num_agents=3, num_tasks=5, num_tasks_per_timestep=1, seed=3)
+        self.assertEqual([agent.id for agent in app.agents], [0, 1, 2])
+        self.assertEqual([task.id for task in get_tasks(app)], list(range(5)))
+
+    def test_tasks_generated_as_released(self):
+        app = App(agent_class=Agent_TP, num_agents=3, num_tasks=10, num_tasks_per_timestep=0.5, seed=3)
+        self.assertEqual(len(app.system.tasks), 1)
+        app.system.iterate()
+        app.system.iterate()
+        self.assertEqual([task.add_time for task in app.system.tasks], [0, 2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import json
+import os
+import tempfile
+import unittest
+from app.sweep import build_configs, config_key, load_recorded_keys, run_config, run_sweep
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.temp_dir.name, "sweep.jsonl")
+        self.configs = build_configs(["TP"], [2, 3], [1.0], [0], num_tasks=3, max_timestep=100)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_build_configs(self):
+        configs = build_configs(["TP", "Central"], [2, 3], [0.5, 1.0], [0, 1, 2], num_tasks=3, max_timestep=100)
+        self.assertEqual(len(configs), 24)
+        self.assertEqual(len({config_key(config) for config in configs}), 24)
+
+    def test_repeated_runs_in_one_process(self):
+        first_row = run_config(self.configs[0])
+        second_row = run_config(self.configs[0])
+        self.assertNotIn("error", first_row)
+        self.assertEqual(first_row["makespan"], second_row["makespan"])
+        self.assertEqual(first_row["average_service_time"], second_row["average_service_time"])
+
+    def test_resume_skips_recorded_rows(self):
+        with open(self.output_path, "w") as output_file:
+            output_file.write(json.dumps({**self.configs[0], "makespan": 1}) + "\n")
+            output_file.write(json.dumps({**self.configs[1], "error": "Traceback"}) + "\n")
+            output_file.write('{"agent": "TP", "age')
+        self.assertEqual(load_recorded_keys(self.output_path), {config_key(self.configs[0])})
+        self.assertEqual(run_sweep(self.configs, self.output_path, max_workers=1), 1)
+        self.assertEqual(load_recorded_keys(self.output_path), {config_key(config) for config in self.configs})
+        self.assertEqual(run_sweep(self.configs, self.output_path, max_workers=1), 0)
+
+if __name__ == '__main__':
+    unittest.main()